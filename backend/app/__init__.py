@@ -3,18 +3,46 @@ Flask application factory.
 """
 
 import os
+import atexit
 import logging
+import importlib
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from flask import Flask, send_from_directory, abort
 
 from app.config import config
-from app.extensions import mongo, limiter, cors, scheduler
+
+# Largest GeoIP database read fully into memory by the pure Python reader
+GEOIP_MEMORY_MAX_BYTES = 128 * 1024 * 1024
+
+# How long startup waits for MongoDB before skipping index creation
+INDEX_PING_TIMEOUT_SECONDS = 5.0
 
 # Socket.IO instance (will be initialized in create_app)
 socketio = None
 
-
-def create_app(config_name: str = None) -> Flask:
-    """Create and configure the Flask application."""
+# Blueprint registry: (module, attribute, url_prefix)
+# Modules are imported on demand by register_blueprints() so that importing the
+# ``app`` package (CLI tools, migration scripts) doesn't load every blueprint.
+BLUEPRINTS = [
+    ("app.blueprints.auth", "auth_bp", "/api/auth"),
+    ("app.blueprints.user", "user_bp", "/api/user"),
+    # No prefix - handles /lists/ and /u/ file serving
+    ("app.blueprints.lists", "lists_public_bp", None),
+    # /api prefix - handles /api/lists and /api/browse
+    ("app.blueprints.lists", "lists_api_bp", "/api"),
+    ("app.blueprints.admin", "admin_bp", "/api/admin"),
+    ("app.blueprints.analytics", "analytics_bp", "/api/analytics"),
+]
+
+
+def create_app(config_name: str = None, start_scheduler: bool = True) -> Flask:
+    """
+    Create and configure the Flask application.
+
+    One-off scripts pass start_scheduler=False so they neither import
+    APScheduler nor run the periodic tasks while they work.
+    """
     global socketio
 
     if config_name is None:
@@ -23,11 +51,16 @@ def create_app(config_name: str = None) -> Flask:
     app = Flask(__name__)
     app.config.from_object(config[config_name])
 
+    from app.utils.json_provider import ORJSONProvider
+
+    app.json = ORJSONProvider(app)
+
     # Configure logging
     configure_logging(app)
 
     # Initialize extensions
     init_extensions(app)
+    init_geoip(app)
 
     # Initialize Socket.IO
     from app.socketio import init_socketio
@@ -48,9 +81,16 @@ def create_app(config_name: str = None) -> Flask:
         # Immutable caching for Vite's hashed assets
         app.wsgi_app.add_files(os.path.join(frontend_dist, "assets"), prefix="assets/")
 
-    # Initialize scheduler (not in testing)
+    # Outermost layer so health probes never reach Flask
+    from app.middleware import HealthCheckMiddleware
+
+    app.wsgi_app = HealthCheckMiddleware(app.wsgi_app)
+
+    # Initialize indexes and scheduler (not in testing)
     if not app.config.get("TESTING"):
-        init_scheduler(app)
+        init_indexes(app)
+        if start_scheduler:
+            init_scheduler(app)
 
     app.logger.info(f"Application initialized in {config_name} mode")
 
@@ -58,19 +98,36 @@ def create_app(config_name: str = None) -> Flask:
 
 
 def configure_logging(app: Flask) -> None:
-    """Configure application logging."""
+    """Configure application logging.
+
+    Records are handed to a queue and written to stderr by a listener thread,
+    so request handlers never block on the stream.
+    """
     log_level = logging.DEBUG if app.debug else logging.INFO
+    root = logging.getLogger()
+    if root.handlers:
+        # Already configured (e.g. create_app called more than once)
+        root.setLevel(log_level)
+        return
+
+    # QueueHandler formats the record before enqueueing it, so the stream
+    # handler only writes the finished message
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, logging.StreamHandler())
+    listener.start()
+    atexit.register(listener.stop)
+
     logging.basicConfig(
         level=log_level,
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.StreamHandler(),
-        ],
+        handlers=[QueueHandler(log_queue)],
     )
 
 
 def init_extensions(app: Flask) -> None:
     """Initialize Flask extensions."""
+    from app.extensions import mongo, limiter, cors
+
     mongo.init_app(app)
     limiter.init_app(app)
     cors.init_app(
@@ -82,24 +139,45 @@ def init_extensions(app: Flask) -> None:
     )
 
 
+def init_geoip(app: Flask) -> None:
+    """Open the GeoLite2 database once; list requests reuse the reader."""
+    db_path = app.config.get("GEOIP_DATABASE_PATH")
+    if not db_path or not os.path.exists(db_path):
+        return
+
+    try:
+        import maxminddb
+
+        try:
+            # libmaxminddb C extension: lookups run in C over the mapped file
+            reader = maxminddb.open_database(db_path, maxminddb.MODE_MMAP_EXT)
+        except ValueError:
+            # Pure Python reader; hold small databases in memory to avoid
+            # page faults during lookups
+            if os.path.getsize(db_path) <= GEOIP_MEMORY_MAX_BYTES:
+                mode = maxminddb.MODE_MEMORY
+            else:
+                mode = maxminddb.MODE_MMAP
+            reader = maxminddb.open_database(db_path, mode)
+    except Exception as e:
+        app.logger.warning(f"Failed to open GeoIP database {db_path}: {e}")
+        return
+
+    app.extensions["geoip_reader"] = reader
+    atexit.register(reader.close)
+
+
 def register_blueprints(app: Flask) -> None:
     """Register Flask blueprints."""
-    from app.blueprints.auth import auth_bp
-    from app.blueprints.user import user_bp
-    from app.blueprints.lists import lists_public_bp, lists_api_bp
-    from app.blueprints.admin import admin_bp
-    from app.blueprints.analytics import analytics_bp
-
-    app.register_blueprint(auth_bp, url_prefix="/api/auth")
-    app.register_blueprint(user_bp, url_prefix="/api/user")
-    app.register_blueprint(
-        lists_public_bp
-    )  # No prefix - handles /lists/ and /u/ file serving
-    app.register_blueprint(
-        lists_api_bp, url_prefix="/api"
-    )  # /api prefix - handles /api/lists and /api/browse
-    app.register_blueprint(admin_bp, url_prefix="/api/admin")
-    app.register_blueprint(analytics_bp, url_prefix="/api/analytics")
+    from app.extensions import limiter
+    from app.utils.converters import ObjectIdConverter
+
+    # Must be registered before any rule using <objectid:...> is added
+    app.url_map.converters["objectid"] = ObjectIdConverter
+
+    for module_name, attr, url_prefix in BLUEPRINTS:
+        blueprint = getattr(importlib.import_module(module_name), attr)
+        app.register_blueprint(blueprint, url_prefix=url_prefix)
 
     # Health check endpoint
     @app.route("/health")
@@ -119,8 +197,56 @@ def register_blueprints(app: Flask) -> None:
         return send_from_directory(frontend_dist, "index.html")
 
 
+def init_indexes(app: Flask) -> None:
+    """
+    Ensure MongoDB indexes exist (create_index is idempotent).
+
+    The database is pinged with a short deadline first, so an unreachable
+    server delays startup by INDEX_PING_TIMEOUT_SECONDS instead of the full
+    server selection timeout. The builds themselves have no deadline.
+    """
+    import pymongo
+    from app.extensions import mongo
+    from app.models.user import User
+    from app.models.job import Job
+    from app.models.limit_request import LimitRequest
+    from app.models.blocklist_library import BlocklistLibrary
+    from app.models.analytics import Analytics
+
+    try:
+        with pymongo.timeout(INDEX_PING_TIMEOUT_SECONDS):
+            mongo.db.command("ping")
+    except Exception as e:
+        app.logger.warning(
+            f"Skipping MongoDB index creation, database unreachable: {e}"
+        )
+        return
+
+    def ensure_other_indexes():
+        mongo.db.featured_lists.create_index([("order", 1)])
+        # One validation token per user; Mongo removes expired ones
+        mongo.db.validation_tokens.create_index("user_id", unique=True)
+        mongo.db.validation_tokens.create_index("expires_at", expireAfterSeconds=0)
+
+    # Each model is tried separately, so a unique index failing on existing
+    # duplicates doesn't stop the others from being created
+    for name, ensure_indexes in [
+        ("users", User.ensure_indexes),
+        ("jobs", Job.ensure_indexes),
+        ("limit_requests", LimitRequest.ensure_indexes),
+        ("featured_lists/validation_tokens", ensure_other_indexes),
+        ("blocklist_library", BlocklistLibrary.ensure_indexes),
+        ("analytics", Analytics.ensure_indexes),
+    ]:
+        try:
+            ensure_indexes()
+        except Exception as e:
+            app.logger.error(f"Failed to ensure {name} indexes: {e}")
+
+
 def init_scheduler(app: Flask) -> None:
     """Initialize APScheduler for background tasks."""
+    from app.extensions import scheduler
     from app.scheduled_tasks.tasks import register_scheduled_tasks
 
     scheduler.start()
@@ -2,11 +2,17 @@
 Admin blueprint - user management, system stats, default list management.
 """
 
-import os
-from flask import Blueprint, request, jsonify, current_app
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from flask import Blueprint, Response, request, jsonify, current_app
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
 from app.blueprints.auth import admin_required
+from app.extensions import mongo
 from app.models.user import User
 from app.models.job import Job
 from app.models.cache import CacheMetadata
@@ -14,9 +20,75 @@ from app.models.analytics import Analytics
 from app.models.system_config import SystemConfig
 from app.models.blocklist_library import BlocklistLibrary
 from app.models.announcement import Announcement
+from app.models.limit_request import LimitRequest
+from app.services.job_queue import JobQueue
+from app.utils.filesystem import get_directory_size
+from app.utils.http_cache import (
+    bump_collection_version,
+    collection_version,
+    conditional_response,
+)
+from app.utils.json_provider import json_array_response
+from app.utils.validators import validate_url
 
 admin_bp = Blueprint("admin", __name__)
 
+# Ban durations accepted by ban_user
+BAN_DURATIONS = {
+    "1d": timedelta(days=1),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30),
+    "permanent": timedelta(days=36500),  # ~100 years
+}
+
+# Library categories never change at runtime, so sort and format them once
+LIBRARY_CATEGORIES = sorted(BlocklistLibrary.VALID_CATEGORIES)
+INVALID_CATEGORY_MSG = (
+    f"Invalid category. Must be one of: {', '.join(LIBRARY_CATEGORIES)}"
+)
+
+# Serialized get_library responses keyed by (collection version, category
+# filter or None for all). A body built while a write bumps the version is
+# stored under the old version, so it is never served with the new ETag.
+_library_cache = {}
+
+
+# Dashboard endpoints are polled continuously, so their results are cached
+# in-process for a few seconds: {key: (expires_at, value)}
+STATS_CACHE_TTL = 10.0
+CHART_CACHE_TTL = 60.0
+# Disk usage changes slowly and walking the data dir is the costliest part
+DISK_USAGE_CACHE_TTL = 300.0
+# Chart windows are clamped to this many days, which also bounds the number
+# of cache keys (and their locks) the day-based charts can create
+CHART_MAX_DAYS = 365
+_stats_cache = {}
+# One lock per key, so a cached computation can itself use other cached keys
+_stats_cache_locks = {}
+# Shared pool for the stats queries, so recomputes don't spawn fresh threads
+_stats_executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="admin-stats")
+
+
+def _cached(key, ttl: float, compute):
+    """Return the cached value for key, recomputing it at most once per ttl."""
+    entry = _stats_cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+
+    # Only one request recomputes; concurrent pollers wait and reuse its result
+    with _stats_cache_locks.setdefault(key, threading.Lock()):
+        now = time.monotonic()
+        entry = _stats_cache.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+
+        value = compute()
+        for stale_key, (expires_at, _) in list(_stats_cache.items()):
+            if expires_at <= now:
+                _stats_cache.pop(stale_key, None)
+        _stats_cache[key] = (time.monotonic() + ttl, value)
+        return value
+
 
 @admin_bp.route("/users", methods=["GET"])
 @admin_required
@@ -45,23 +117,26 @@ def list_users(user: User):
         show_regular=show_regular,
         show_enabled=show_enabled,
         show_disabled=show_disabled,
-        exclude_user_id=ObjectId(user.id),
+        exclude_user_id=user._id,
+        projection=User.ADMIN_LIST_PROJECTION,
     )
 
-    return jsonify(
+    return json_array_response(
+        "users",
+        users,
+        User.to_admin_list_dict,
         {
-            "users": [u.to_admin_dict() for u in users],
             "page": page,
             "per_page": per_page,
             "total": total,
             "pages": (total + per_page - 1) // per_page if total > 0 else 1,
-        }
+        },
     )
 
 
-@admin_bp.route("/users/<user_id>", methods=["GET"])
+@admin_bp.route("/users/<objectid:user_id>", methods=["GET"])
 @admin_required
-def get_user(admin: User, user_id: str):
+def get_user(admin: User, user_id: ObjectId):
     """Get user details."""
     target_user = User.get_by_id(user_id)
     if not target_user:
@@ -70,9 +145,9 @@ def get_user(admin: User, user_id: str):
     return jsonify(target_user.to_admin_dict())
 
 
-@admin_bp.route("/users/<user_id>", methods=["PUT"])
+@admin_bp.route("/users/<objectid:user_id>", methods=["PUT"])
 @admin_required
-def update_user(admin: User, user_id: str):
+def update_user(admin: User, user_id: ObjectId):
     """Update user settings."""
     target_user = User.get_by_id(user_id)
     if not target_user:
@@ -92,24 +167,25 @@ def update_user(admin: User, user_id: str):
     if "is_enabled" in data:
         target_user.set_enabled(data["is_enabled"])
         current_app.logger.info(
-            f"Admin {admin.username} set user {target_user.username} enabled={data['is_enabled']}"
+            "Admin %s set user %s enabled=%s",
+            admin.username,
+            target_user.username,
+            data["is_enabled"],
         )
 
     # Update limits
     if "limits" in data:
         target_user.set_limits(data["limits"])
         current_app.logger.info(
-            f"Admin {admin.username} updated limits for user {target_user.username}"
+            "Admin %s updated limits for user %s", admin.username, target_user.username
         )
 
-    # Refresh user data
-    target_user = User.get_by_id(user_id)
     return jsonify(target_user.to_admin_dict())
 
 
-@admin_bp.route("/users/<user_id>", methods=["DELETE"])
+@admin_bp.route("/users/<objectid:user_id>", methods=["DELETE"])
 @admin_required
-def delete_user(admin: User, user_id: str):
+def delete_user(admin: User, user_id: ObjectId):
     """Delete user and their data."""
     target_user = User.get_by_id(user_id)
     if not target_user:
@@ -126,17 +202,15 @@ def delete_user(admin: User, user_id: str):
     username = target_user.username
     target_user.delete_with_data()
 
-    current_app.logger.info(f"Admin {admin.username} deleted user {username}")
+    current_app.logger.info("Admin %s deleted user %s", admin.username, username)
 
     return jsonify({"success": True, "message": f"User {username} deleted"})
 
 
-@admin_bp.route("/users/<user_id>/ban", methods=["POST"])
+@admin_bp.route("/users/<objectid:user_id>/ban", methods=["POST"])
 @admin_required
-def ban_user(admin: User, user_id: str):
+def ban_user(admin: User, user_id: ObjectId):
     """Ban a user."""
-    from datetime import datetime, timedelta
-
     target_user = User.get_by_id(user_id)
     if not target_user:
         return jsonify({"error": "User not found"}), 404
@@ -153,25 +227,21 @@ def ban_user(admin: User, user_id: str):
     duration = data.get("duration")  # "1d", "7d", "30d", "permanent"
     reason = data.get("reason")
 
-    # Calculate ban expiration
-    duration_map = {
-        "1d": timedelta(days=1),
-        "7d": timedelta(days=7),
-        "30d": timedelta(days=30),
-        "permanent": timedelta(days=36500),  # ~100 years
-    }
-
-    if duration not in duration_map:
+    if duration not in BAN_DURATIONS:
         return (
             jsonify({"error": "Invalid duration. Use: 1d, 7d, 30d, or permanent"}),
             400,
         )
 
-    ban_until = datetime.utcnow() + duration_map[duration]
+    ban_until = datetime.utcnow() + BAN_DURATIONS[duration]
     target_user.ban(until=ban_until, reason=reason)
 
     current_app.logger.info(
-        f"Admin {admin.username} banned user {target_user.username} until {ban_until} (reason: {reason})"
+        "Admin %s banned user %s until %s (reason: %s)",
+        admin.username,
+        target_user.username,
+        ban_until,
+        reason,
     )
 
     return jsonify(
@@ -183,9 +253,9 @@ def ban_user(admin: User, user_id: str):
     )
 
 
-@admin_bp.route("/users/<user_id>/unban", methods=["POST"])
+@admin_bp.route("/users/<objectid:user_id>/unban", methods=["POST"])
 @admin_required
-def unban_user(admin: User, user_id: str):
+def unban_user(admin: User, user_id: ObjectId):
     """Unban a user."""
     target_user = User.get_by_id(user_id)
     if not target_user:
@@ -197,7 +267,7 @@ def unban_user(admin: User, user_id: str):
     target_user.unban()
 
     current_app.logger.info(
-        f"Admin {admin.username} unbanned user {target_user.username}"
+        "Admin %s unbanned user %s", admin.username, target_user.username
     )
 
     return jsonify(
@@ -205,9 +275,9 @@ def unban_user(admin: User, user_id: str):
     )
 
 
-@admin_bp.route("/users/<user_id>/admin", methods=["PUT"])
+@admin_bp.route("/users/<objectid:user_id>/admin", methods=["PUT"])
 @admin_required
-def toggle_user_admin(admin: User, user_id: str):
+def toggle_user_admin(admin: User, user_id: ObjectId):
     """Toggle admin status for a user. Only root can do this."""
     # Only root can change admin status
     if not admin.is_root:
@@ -227,49 +297,47 @@ def toggle_user_admin(admin: User, user_id: str):
     target_user.set_admin(is_admin)
 
     current_app.logger.info(
-        f"Root {admin.username} set admin status for {target_user.username} to {is_admin}"
+        "Root %s set admin status for %s to %s",
+        admin.username,
+        target_user.username,
+        is_admin,
     )
 
-    # Refresh and return updated user
-    target_user = User.get_by_id(user_id)
     return jsonify(target_user.to_admin_dict())
 
 
-@admin_bp.route("/users/<user_id>/ips", methods=["GET"])
+@admin_bp.route("/users/<objectid:user_id>/ips", methods=["GET"])
 @admin_required
-def get_user_ips(admin: User, user_id: str):
+def get_user_ips(admin: User, user_id: ObjectId):
     """Get user's IP access log."""
-    target_user = User.get_by_id(user_id)
+    # Only the log and username are needed, not the user's lists and config
+    target_user = User.get_by_id(user_id, projection=User.IP_LOG_PROJECTION)
     if not target_user:
         return jsonify({"error": "User not found"}), 404
 
-    # Serialize IP log with proper datetime formatting
-    ip_log = [
-        {
-            "ip_hash": entry.get("ip_hash"),
-            "first_seen": (
-                entry["first_seen"].isoformat() if entry.get("first_seen") else None
-            ),
-            "last_seen": (
-                entry["last_seen"].isoformat() if entry.get("last_seen") else None
-            ),
-            "access_count": entry.get("access_count", 0),
-        }
-        for entry in target_user.ip_log
-    ]
+    # Full log by default; ?page=&per_page= returns a single window of it
+    ip_count = len(target_user.ip_log)
+    page = request.args.get("page", type=int)
+    if page is None:
+        ip_log = target_user.serialize_ip_log()
+    else:
+        page = max(1, page)
+        per_page = min(max(1, request.args.get("per_page", 50, type=int)), 500)
+        start = (page - 1) * per_page
+        ip_log = target_user.serialize_ip_log(start, start + per_page)
 
     return jsonify(
         {
             "username": target_user.username,
-            "ip_count": len(ip_log),
+            "ip_count": ip_count,
             "ip_log": ip_log,
         }
     )
 
 
-@admin_bp.route("/rebuild/<user_id>", methods=["POST"])
+@admin_bp.route("/rebuild/<objectid:user_id>", methods=["POST"])
 @admin_required
-def trigger_rebuild(admin: User, user_id: str):
+def trigger_rebuild(admin: User, user_id: ObjectId):
     """Trigger rebuild for user (bypasses limits)."""
     target_user = User.get_by_id(user_id)
     if not target_user:
@@ -288,12 +356,13 @@ def trigger_rebuild(admin: User, user_id: str):
     if not config:
         return jsonify({"error": "User has no blocklist configuration"}), 400
 
-    from app.services.job_queue import JobQueue
-
     job = JobQueue.queue_job(target_user, job_type=Job.TYPE_ADMIN, force_rebuild=True)
 
     current_app.logger.info(
-        f"Admin {admin.username} triggered rebuild for user {target_user.username}: {job.job_id}"
+        "Admin %s triggered rebuild for user %s: %s",
+        admin.username,
+        target_user.username,
+        job.job_id,
     )
 
     return jsonify({"job_id": job.job_id, "status": job.status})
@@ -303,12 +372,10 @@ def trigger_rebuild(admin: User, user_id: str):
 @admin_required
 def trigger_default_rebuild(admin: User):
     """Trigger rebuild for default lists."""
-    from app.services.job_queue import JobQueue
-
     job = JobQueue.queue_default_job(job_type=Job.TYPE_ADMIN, force_rebuild=True)
 
     current_app.logger.info(
-        f"Admin {admin.username} triggered default lists rebuild: {job.job_id}"
+        "Admin %s triggered default lists rebuild: %s", admin.username, job.job_id
     )
 
     return jsonify({"job_id": job.job_id, "status": job.status})
@@ -319,9 +386,7 @@ def trigger_default_rebuild(admin: User):
 def list_all_jobs(admin: User):
     """List all jobs."""
     limit = request.args.get("limit", 50, type=int)
-    jobs = Job.get_recent(limit=limit)
-
-    return jsonify({"jobs": [j.to_dict() for j in jobs]})
+    return json_array_response("jobs", Job.iter_recent_raw(limit), Job.serialize)
 
 
 @admin_bp.route("/jobs/<job_id>", methods=["GET"])
@@ -339,64 +404,94 @@ def get_admin_job(admin: User, job_id: str):
 @admin_required
 def get_stats(admin: User):
     """Get system-wide statistics."""
-    from app.services.job_queue import JobQueue
-
-    # User stats
-    total_users = User.count()
-    active_users = User.count(is_enabled=True)
+    data_dir = current_app.config["DATA_DIR"]
+    return jsonify(_cached("stats", STATS_CACHE_TTL, lambda: _compute_stats(data_dir)))
+
+
+def _disk_usage(data_dir: str) -> int:
+    """Get data directory size, preferring the figure the scheduler records."""
+    recorded = SystemConfig.get_disk_usage(max_age=DISK_USAGE_CACHE_TTL * 2)
+    if recorded is not None:
+        return recorded
+    return _cached(
+        ("disk_usage", data_dir),
+        DISK_USAGE_CACHE_TTL,
+        lambda: get_directory_size(data_dir),
+    )
 
-    # Job stats
-    jobs_today = Job.count_today()
-    jobs_processing = Job.count_processing()
-    queue_length = JobQueue.queue_length()
 
-    # Cache stats
-    cache_size = CacheMetadata.get_total_size()
+def _compute_stats(data_dir: str) -> dict:
+    """Build the payload for the system statistics endpoint."""
+    # The five sources are independent and mostly wait on I/O, so they run
+    # side by side and the recompute takes as long as the slowest one
+    futures = [
+        _stats_executor.submit(User.aggregate_stats),
+        _stats_executor.submit(Job.aggregate_stats),
+        _stats_executor.submit(CacheMetadata.get_total_size),
+        _stats_executor.submit(Analytics.get_default_list_totals),
+        _stats_executor.submit(_disk_usage, data_dir),
+    ]
+    user_stats, job_stats, cache_size, analytics, disk_usage = (
+        f.result() for f in futures
+    )
 
-    # Analytics stats
-    analytics = Analytics.get_default_list_totals()
+    return {
+        "users": {
+            "total": user_stats["total"],
+            "active": user_stats["active"],
+        },
+        "jobs": {
+            "today": job_stats["today"],
+            "processing": job_stats["processing"],
+            "queued": job_stats["queued"],
+        },
+        "storage": {
+            "cache_bytes": cache_size,
+            "total_bytes": disk_usage,
+            "cache_mb": round(cache_size / (1024 * 1024), 2),
+            "total_mb": round(disk_usage / (1024 * 1024), 2),
+        },
+        "analytics": analytics,
+    }
 
-    # Disk usage
-    data_dir = current_app.config["DATA_DIR"]
-    disk_usage = get_directory_size(data_dir)
 
+@admin_bp.route("/stats/jobs-per-day", methods=["GET"])
+@admin_required
+def get_jobs_per_day(admin: User):
+    """Get jobs per day for the last N days."""
+    days = min(max(request.args.get("days", 30, type=int), 1), CHART_MAX_DAYS)
     return jsonify(
         {
-            "users": {
-                "total": total_users,
-                "active": active_users,
-            },
-            "jobs": {
-                "today": jobs_today,
-                "processing": jobs_processing,
-                "queued": queue_length,
-            },
-            "storage": {
-                "cache_bytes": cache_size,
-                "total_bytes": disk_usage,
-                "cache_mb": round(cache_size / (1024 * 1024), 2),
-                "total_mb": round(disk_usage / (1024 * 1024), 2),
-            },
-            "analytics": analytics,
+            "jobs_per_day": _cached(
+                ("jobs_per_day", days), CHART_CACHE_TTL, lambda: _jobs_per_day(days)
+            )
         }
     )
 
 
-@admin_bp.route("/stats/jobs-per-day", methods=["GET"])
-@admin_required
-def get_jobs_per_day(admin: User):
-    """Get jobs per day for the last N days."""
-    from datetime import datetime, timedelta
-    from app.extensions import mongo
+def _day_start(days_ago: int) -> datetime:
+    """Get midnight UTC of the day N days ago.
+
+    Chart windows start on a day boundary so the first bucket is a full day
+    and every request for the same window sends an identical query.
+    """
+    today = datetime.now(timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    return today - timedelta(days=days_ago)
+
 
-    days = request.args.get("days", 30, type=int)
-    start_date = datetime.utcnow() - timedelta(days=days)
+def _jobs_per_day(days: int) -> list:
+    """Aggregate job counts per day for the last N days."""
+    start_date = _day_start(days)
 
+    # Only created_at and status are read, so the (created_at, status) index
+    # covers the scan; dates are truncated per job and formatted per day
     pipeline = [
         {"$match": {"created_at": {"$gte": start_date}}},
         {
             "$group": {
-                "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+                "_id": {"$dateTrunc": {"date": "$created_at", "unit": "day"}},
                 "count": {"$sum": 1},
                 "completed": {
                     "$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}
@@ -405,73 +500,93 @@ def get_jobs_per_day(admin: User):
             }
         },
         {"$sort": {"_id": 1}},
+        {
+            "$project": {
+                "_id": 0,
+                "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$_id"}},
+                "total": "$count",
+                "completed": 1,
+                "failed": 1,
+            }
+        },
     ]
 
-    results = list(mongo.db.jobs.aggregate(pipeline))
-
-    return jsonify(
-        {
-            "jobs_per_day": [
-                {
-                    "date": r["_id"],
-                    "total": r["count"],
-                    "completed": r["completed"],
-                    "failed": r["failed"],
-                }
-                for r in results
-            ]
-        }
-    )
+    return list(mongo.db.jobs.aggregate(pipeline, batchSize=max(days, 1) + 1))
 
 
 @admin_bp.route("/stats/user-growth", methods=["GET"])
 @admin_required
 def get_user_growth(admin: User):
     """Get user signup growth over time."""
-    from datetime import datetime, timedelta
-    from app.extensions import mongo
+    days = min(max(request.args.get("days", 30, type=int), 1), CHART_MAX_DAYS)
+    return jsonify(
+        {
+            "user_growth": _cached(
+                ("user_growth", days), CHART_CACHE_TTL, lambda: _user_growth(days)
+            )
+        }
+    )
 
-    days = request.args.get("days", 30, type=int)
-    start_date = datetime.utcnow() - timedelta(days=days)
 
+def _user_growth(days: int) -> list:
+    """Aggregate signups per day with a running total for the last N days."""
+    start_date = _day_start(days)
+    total_before = mongo.db.users.count_documents({"created_at": {"$lt": start_date}})
+
+    # The running total is computed server-side with a window function
     pipeline = [
         {"$match": {"created_at": {"$gte": start_date}}},
         {
             "$group": {
-                "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+                "_id": {"$dateTrunc": {"date": "$created_at", "unit": "day"}},
                 "count": {"$sum": 1},
             }
         },
-        {"$sort": {"_id": 1}},
+        {
+            "$setWindowFields": {
+                "sortBy": {"_id": 1},
+                "output": {
+                    "cumulative": {
+                        "$sum": "$count",
+                        "window": {"documents": ["unbounded", "current"]},
+                    }
+                },
+            }
+        },
+        {
+            "$project": {
+                "_id": 0,
+                "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$_id"}},
+                "new_users": "$count",
+                "total_users": {"$add": ["$cumulative", total_before]},
+            }
+        },
     ]
 
-    results = list(mongo.db.users.aggregate(pipeline))
-
-    # Also get cumulative total over time
-    total_before = mongo.db.users.count_documents({"created_at": {"$lt": start_date}})
-    cumulative = total_before
-
-    growth_data = []
-    for r in results:
-        cumulative += r["count"]
-        growth_data.append(
-            {"date": r["_id"], "new_users": r["count"], "total_users": cumulative}
-        )
-
-    return jsonify({"user_growth": growth_data})
+    # One row per day, so a single batch covers the whole range
+    return list(mongo.db.users.aggregate(pipeline, batchSize=max(days, 1) + 1))
 
 
 @admin_bp.route("/default/config", methods=["GET"])
 @admin_required
 def get_default_config(admin: User):
     """Get default lists configuration from MongoDB."""
-    config_data = SystemConfig.get_default_config()
-    return jsonify(
-        {
-            "config": config_data["blocklists"],
-            "whitelist": config_data["whitelist"],
-        }
-    )
+    # The config can be several MB; check the version before loading it so
+    # unchanged configs are answered with 304 Not Modified
+    updated_at = SystemConfig.get_default_config_updated_at()
+
+    def build():
+        config_data = SystemConfig.get_default_config()
+        return jsonify(
+            {
+                "config": config_data["blocklists"],
+                "whitelist": config_data["whitelist"],
+            }
+        )
+
+    if not updated_at:
+        return build()
+    return conditional_response(f"default-config-{updated_at.timestamp()}", build)
 
 
 @admin_bp.route("/default/config", methods=["PUT"])
@@ -480,15 +595,22 @@ def update_default_config(admin: User):
     """Update default lists configuration in MongoDB."""
     data = request.get_json()
 
+    if "config" not in data and "whitelist" not in data:
+        return jsonify({"success": True})
+
+    # Single upsert so readers never observe blocklists and whitelist out of step
+    SystemConfig.update_default_config(
+        blocklists=data.get("config"),
+        whitelist=data.get("whitelist"),
+        updated_by=admin.username,
+    )
+
     if "config" in data:
-        SystemConfig.update_default_blocklists(data["config"], admin.username)
         current_app.logger.info(
-            f"Admin {admin.username} updated default blocklist config"
+            "Admin %s updated default blocklist config", admin.username
         )
-
     if "whitelist" in data:
-        SystemConfig.update_default_whitelist(data["whitelist"], admin.username)
-        current_app.logger.info(f"Admin {admin.username} updated default whitelist")
+        current_app.logger.info("Admin %s updated default whitelist", admin.username)
 
     return jsonify({"success": True})
 
@@ -497,33 +619,32 @@ def update_default_config(admin: User):
 @admin_required
 def get_featured_lists(admin: User):
     """Get featured community lists."""
-    from app.extensions import mongo
 
-    featured = list(mongo.db.featured_lists.find().sort("order", 1))
+    def build():
+        featured = mongo.db.featured_lists.find().sort("order", 1)
+        return jsonify(
+            {
+                "featured": [
+                    {
+                        "id": str(f["_id"]),
+                        "username": f["username"],
+                        "list_name": f["list_name"],
+                        "description": f.get("description", ""),
+                        "order": f.get("order", 0),
+                    }
+                    for f in featured
+                ]
+            }
+        )
 
-    return jsonify(
-        {
-            "featured": [
-                {
-                    "id": str(f["_id"]),
-                    "username": f["username"],
-                    "list_name": f["list_name"],
-                    "description": f.get("description", ""),
-                    "order": f.get("order", 0),
-                }
-                for f in featured
-            ]
-        }
-    )
+    version = collection_version("featured_lists")
+    return conditional_response(f"featured-{version}", build)
 
 
 @admin_bp.route("/featured", methods=["POST"])
 @admin_required
 def add_featured_list(admin: User):
     """Add a list to featured."""
-    from app.extensions import mongo
-    from datetime import datetime
-
     data = request.get_json()
     username = data.get("username")
     list_name = data.get("list_name")
@@ -538,9 +659,7 @@ def add_featured_list(admin: User):
     if not list_info:
         return jsonify({"error": "List not found"}), 404
 
-    # Get next order number
-    max_order = mongo.db.featured_lists.find_one(sort=[("order", -1)])
-    next_order = (max_order.get("order", 0) + 1) if max_order else 1
+    next_order = _next_featured_order()
 
     # Insert
     result = mongo.db.featured_lists.insert_one(
@@ -553,48 +672,63 @@ def add_featured_list(admin: User):
             "created_by": admin.username,
         }
     )
+    bump_collection_version("featured_lists")
 
     current_app.logger.info(
-        f"Admin {admin.username} added featured list: {username}/{list_name}"
+        "Admin %s added featured list: %s/%s", admin.username, username, list_name
     )
 
     return jsonify({"success": True, "id": str(result.inserted_id)})
 
 
-@admin_bp.route("/featured/<featured_id>", methods=["DELETE"])
+def _next_featured_order() -> int:
+    """Atomically allocate the next featured list order number.
+
+    Uses a counter document so concurrent adds never share an order. The
+    counter is seeded from the current maximum the first time it is used.
+    """
+    counters = mongo.db.counters
+    counter = counters.find_one_and_update(
+        {"_id": "featured_order"},
+        {"$inc": {"seq": 1}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if counter:
+        return counter["seq"]
+
+    max_order = mongo.db.featured_lists.find_one(
+        sort=[("order", -1)], projection={"order": 1}
+    )
+    counters.update_one(
+        {"_id": "featured_order"},
+        {"$max": {"seq": max_order.get("order", 0) if max_order else 0}},
+        upsert=True,
+    )
+    counter = counters.find_one_and_update(
+        {"_id": "featured_order"},
+        {"$inc": {"seq": 1}},
+        return_document=ReturnDocument.AFTER,
+    )
+    return counter["seq"]
+
+
+@admin_bp.route("/featured/<objectid:featured_id>", methods=["DELETE"])
 @admin_required
-def remove_featured_list(admin: User, featured_id: str):
+def remove_featured_list(admin: User, featured_id: ObjectId):
     """Remove a list from featured."""
-    from app.extensions import mongo
-
-    result = mongo.db.featured_lists.delete_one({"_id": ObjectId(featured_id)})
+    result = mongo.db.featured_lists.delete_one({"_id": featured_id})
 
     if result.deleted_count == 0:
         return jsonify({"error": "Featured list not found"}), 404
+    bump_collection_version("featured_lists")
 
     current_app.logger.info(
-        f"Admin {admin.username} removed featured list: {featured_id}"
+        "Admin %s removed featured list: %s", admin.username, featured_id
     )
 
     return jsonify({"success": True})
 
 
-def get_directory_size(path: str) -> int:
-    """Get total size of a directory."""
-    total = 0
-    try:
-        for dirpath, dirnames, filenames in os.walk(path):
-            for filename in filenames:
-                filepath = os.path.join(dirpath, filename)
-                try:
-                    total += os.path.getsize(filepath)
-                except OSError:
-                    pass
-    except Exception:
-        pass
-    return total
-
-
 # Limit Request Management
 
 
@@ -602,23 +736,17 @@ def get_directory_size(path: str) -> int:
 @admin_required
 def get_limit_requests(admin: User):
     """Get all limit requests (optionally filtered by status)."""
-    from app.models.limit_request import LimitRequest
-
     status = request.args.get("status")  # pending, approved, denied
 
-    if status:
-        if status == "pending":
-            requests = LimitRequest.get_pending()
-        else:
-            requests = LimitRequest.get_by_status(status)
+    if status == LimitRequest.STATUS_PENDING:
+        requests = LimitRequest.get_pending()
+        pending_count = len(requests)
+    elif status:
+        requests = LimitRequest.get_by_status(status)
+        pending_count = LimitRequest.count_pending()
     else:
-        # Get all pending first, then recent approved/denied
-        pending = LimitRequest.get_pending()
-        approved = LimitRequest.get_by_status(LimitRequest.STATUS_APPROVED, limit=20)
-        denied = LimitRequest.get_by_status(LimitRequest.STATUS_DENIED, limit=20)
-        requests = pending + approved + denied
-
-    pending_count = LimitRequest.count_pending()
+        # All pending first, then recent approved/denied
+        requests, pending_count = LimitRequest.get_dashboard()
 
     return jsonify(
         {
@@ -628,12 +756,10 @@ def get_limit_requests(admin: User):
     )
 
 
-@admin_bp.route("/limit-requests/<request_id>/approve", methods=["POST"])
+@admin_bp.route("/limit-requests/<objectid:request_id>/approve", methods=["POST"])
 @admin_required
-def approve_limit_request(admin: User, request_id: str):
+def approve_limit_request(admin: User, request_id: ObjectId):
     """Approve a limit request."""
-    from app.models.limit_request import LimitRequest
-
     limit_request = LimitRequest.get_by_id(request_id)
     if not limit_request:
         return jsonify({"error": "Request not found"}), 404
@@ -664,12 +790,12 @@ def approve_limit_request(admin: User, request_id: str):
     )
 
     current_app.logger.info(
-        f"Admin {admin.username} approved limit request {request_id} "
-        f"(limit: {custom_limit or limit_request.requested_tier:,})"
+        "Admin %s approved limit request %s (limit: %s)",
+        admin.username,
+        request_id,
+        format(custom_limit or limit_request.requested_tier, ","),
     )
 
-    # Return updated request
-    limit_request = LimitRequest.get_by_id(request_id)
     return jsonify(
         {
             "success": True,
@@ -678,12 +804,10 @@ def approve_limit_request(admin: User, request_id: str):
     )
 
 
-@admin_bp.route("/limit-requests/<request_id>/deny", methods=["POST"])
+@admin_bp.route("/limit-requests/<objectid:request_id>/deny", methods=["POST"])
 @admin_required
-def deny_limit_request(admin: User, request_id: str):
+def deny_limit_request(admin: User, request_id: ObjectId):
     """Deny a limit request."""
-    from app.models.limit_request import LimitRequest
-
     limit_request = LimitRequest.get_by_id(request_id)
     if not limit_request:
         return jsonify({"error": "Request not found"}), 404
@@ -700,10 +824,10 @@ def deny_limit_request(admin: User, request_id: str):
         response=response_message,
     )
 
-    current_app.logger.info(f"Admin {admin.username} denied limit request {request_id}")
+    current_app.logger.info(
+        "Admin %s denied limit request %s", admin.username, request_id
+    )
 
-    # Return updated request
-    limit_request = LimitRequest.get_by_id(request_id)
     return jsonify(
         {
             "success": True,
@@ -719,19 +843,31 @@ def deny_limit_request(admin: User, request_id: str):
 @admin_required
 def get_library(admin: User):
     """Get all blocklist library entries."""
-    category = request.args.get("category")
-
-    if category:
-        entries = BlocklistLibrary.get_all(category=category)
-    else:
-        entries = BlocklistLibrary.get_all()
+    category = request.args.get("category") or None
+    if category is not None and category not in BlocklistLibrary.VALID_CATEGORIES:
+        return jsonify({"error": INVALID_CATEGORY_MSG}), 400
+
+    # Read before building, so the body is cached under the version it reflects
+    version = collection_version("blocklist_library")
+
+    def build():
+        key = (version, category)
+        body = _library_cache.get(key)
+        if body is None:
+            entries = BlocklistLibrary.get_all(category=category)
+            body = current_app.json.dumps(
+                {
+                    "library": [e.to_dict() for e in entries],
+                    "categories": LIBRARY_CATEGORIES,
+                }
+            )
+            # Bodies for older versions are never read again
+            if any(cached_version != version for cached_version, _ in _library_cache):
+                _library_cache.clear()
+            _library_cache[key] = body
+        return Response(body, mimetype="application/json")
 
-    return jsonify(
-        {
-            "library": [e.to_dict() for e in entries],
-            "categories": sorted(BlocklistLibrary.VALID_CATEGORIES),
-        }
-    )
+    return conditional_response(f"library-{version}-{category or 'all'}", build)
 
 
 @admin_bp.route("/library", methods=["POST"])
@@ -758,39 +894,31 @@ def add_library_entry(admin: User):
 
     # Validate category
     if category not in BlocklistLibrary.VALID_CATEGORIES:
-        return (
-            jsonify(
-                {
-                    "error": f"Invalid category. Must be one of: {', '.join(sorted(BlocklistLibrary.VALID_CATEGORIES))}"
-                }
-            ),
-            400,
-        )
+        return jsonify({"error": INVALID_CATEGORY_MSG}), 400
 
     # Validate URL format
-    from app.utils.validators import validate_url
-
     if not validate_url(url):
         return jsonify({"error": "Invalid or unsafe URL"}), 400
 
-    # Check for duplicate URL
-    if BlocklistLibrary.url_exists(url):
+    # Create entry; the unique url index (ensured at startup) rejects duplicates
+    try:
+        entry = BlocklistLibrary.create(
+            url=url,
+            name=name,
+            category=category,
+            description=description,
+            recommended=recommended,
+            aggressiveness=aggressiveness,
+            domain_count=domain_count,
+            added_by=admin.username,
+        )
+    except DuplicateKeyError:
         return jsonify({"error": "URL already exists in library"}), 409
-
-    # Create entry
-    entry = BlocklistLibrary.create(
-        url=url,
-        name=name,
-        category=category,
-        description=description,
-        recommended=recommended,
-        aggressiveness=aggressiveness,
-        domain_count=domain_count,
-        added_by=admin.username,
-    )
+    _library_cache.clear()
+    bump_collection_version("blocklist_library")
 
     current_app.logger.info(
-        f"Admin {admin.username} added library entry: {name} ({category})"
+        "Admin %s added library entry: %s (%s)", admin.username, name, category
     )
 
     return (
@@ -804,9 +932,9 @@ def add_library_entry(admin: User):
     )
 
 
-@admin_bp.route("/library/<entry_id>", methods=["GET"])
+@admin_bp.route("/library/<objectid:entry_id>", methods=["GET"])
 @admin_required
-def get_library_entry(admin: User, entry_id: str):
+def get_library_entry(admin: User, entry_id: ObjectId):
     """Get a specific library entry."""
     entry = BlocklistLibrary.get_by_id(entry_id)
     if not entry:
@@ -815,9 +943,9 @@ def get_library_entry(admin: User, entry_id: str):
     return jsonify(entry.to_dict())
 
 
-@admin_bp.route("/library/<entry_id>", methods=["PUT"])
+@admin_bp.route("/library/<objectid:entry_id>", methods=["PUT"])
 @admin_required
-def update_library_entry(admin: User, entry_id: str):
+def update_library_entry(admin: User, entry_id: ObjectId):
     """Update a library entry."""
     entry = BlocklistLibrary.get_by_id(entry_id)
     if not entry:
@@ -827,40 +955,32 @@ def update_library_entry(admin: User, entry_id: str):
 
     # Validate category if provided
     if "category" in data and data["category"] not in BlocklistLibrary.VALID_CATEGORIES:
-        return (
-            jsonify(
-                {
-                    "error": f"Invalid category. Must be one of: {', '.join(sorted(BlocklistLibrary.VALID_CATEGORIES))}"
-                }
-            ),
-            400,
-        )
+        return jsonify({"error": INVALID_CATEGORY_MSG}), 400
 
     # Validate URL if provided
-    if "url" in data:
-        from app.utils.validators import validate_url
+    if "url" in data and not validate_url(data["url"]):
+        return jsonify({"error": "Invalid or unsafe URL"}), 400
 
-        if not validate_url(data["url"]):
-            return jsonify({"error": "Invalid or unsafe URL"}), 400
-        # Check for duplicate URL (excluding current entry)
-        if BlocklistLibrary.url_exists(data["url"], exclude_id=entry_id):
-            return jsonify({"error": "URL already exists in library"}), 409
+    # Update entry; the unique url index rejects another entry's URL
+    try:
+        entry.update(
+            url=data.get("url"),
+            name=data.get("name"),
+            category=data.get("category"),
+            description=data.get("description"),
+            recommended=data.get("recommended"),
+            aggressiveness=data.get("aggressiveness"),
+            domain_count=data.get("domain_count"),
+        )
+    except DuplicateKeyError:
+        return jsonify({"error": "URL already exists in library"}), 409
+    _library_cache.clear()
+    bump_collection_version("blocklist_library")
 
-    # Update entry
-    entry.update(
-        url=data.get("url"),
-        name=data.get("name"),
-        category=data.get("category"),
-        description=data.get("description"),
-        recommended=data.get("recommended"),
-        aggressiveness=data.get("aggressiveness"),
-        domain_count=data.get("domain_count"),
+    current_app.logger.info(
+        "Admin %s updated library entry: %s", admin.username, entry_id
     )
 
-    current_app.logger.info(f"Admin {admin.username} updated library entry: {entry_id}")
-
-    # Return updated entry
-    entry = BlocklistLibrary.get_by_id(entry_id)
     return jsonify(
         {
             "success": True,
@@ -869,9 +989,9 @@ def update_library_entry(admin: User, entry_id: str):
     )
 
 
-@admin_bp.route("/library/<entry_id>", methods=["DELETE"])
+@admin_bp.route("/library/<objectid:entry_id>", methods=["DELETE"])
 @admin_required
-def delete_library_entry(admin: User, entry_id: str):
+def delete_library_entry(admin: User, entry_id: ObjectId):
     """Delete a library entry."""
     entry = BlocklistLibrary.get_by_id(entry_id)
     if not entry:
@@ -879,9 +999,11 @@ def delete_library_entry(admin: User, entry_id: str):
 
     name = entry.name
     entry.delete()
+    _library_cache.clear()
+    bump_collection_version("blocklist_library")
 
     current_app.logger.info(
-        f"Admin {admin.username} deleted library entry: {name} ({entry_id})"
+        "Admin %s deleted library entry: %s (%s)", admin.username, name, entry_id
     )
 
     return jsonify({"success": True})
@@ -903,8 +1025,6 @@ def list_announcements(admin: User):
 @admin_required
 def create_announcement(admin: User):
     """Create a new announcement."""
-    from datetime import datetime
-
     data = request.get_json()
     title = data.get("title", "").strip()
     message = data.get("message", "").strip()
@@ -942,17 +1062,15 @@ def create_announcement(admin: User):
         created_by=admin.username,
     )
 
-    current_app.logger.info(f"Admin {admin.username} created announcement: {title}")
+    current_app.logger.info("Admin %s created announcement: %s", admin.username, title)
 
     return jsonify({"success": True, "announcement": announcement.to_dict()}), 201
 
 
-@admin_bp.route("/announcements/<announcement_id>", methods=["PUT"])
+@admin_bp.route("/announcements/<objectid:announcement_id>", methods=["PUT"])
 @admin_required
-def update_announcement(admin: User, announcement_id: str):
+def update_announcement(admin: User, announcement_id: ObjectId):
     """Update an announcement."""
-    from datetime import datetime
-
     announcement = Announcement.get_by_id(announcement_id)
     if not announcement:
         return jsonify({"error": "Announcement not found"}), 404
@@ -991,16 +1109,15 @@ def update_announcement(admin: User, announcement_id: str):
     announcement.update(**update_kwargs)
 
     current_app.logger.info(
-        f"Admin {admin.username} updated announcement {announcement_id}"
+        "Admin %s updated announcement %s", admin.username, announcement_id
     )
 
-    announcement = Announcement.get_by_id(announcement_id)
     return jsonify({"success": True, "announcement": announcement.to_dict()})
 
 
-@admin_bp.route("/announcements/<announcement_id>", methods=["DELETE"])
+@admin_bp.route("/announcements/<objectid:announcement_id>", methods=["DELETE"])
 @admin_required
-def delete_announcement(admin: User, announcement_id: str):
+def delete_announcement(admin: User, announcement_id: ObjectId):
     """Delete an announcement."""
     announcement = Announcement.get_by_id(announcement_id)
     if not announcement:
@@ -1010,7 +1127,7 @@ def delete_announcement(admin: User, announcement_id: str):
     announcement.delete()
 
     current_app.logger.info(
-        f"Admin {admin.username} deleted announcement: {title} ({announcement_id})"
+        "Admin %s deleted announcement: %s (%s)", admin.username, title, announcement_id
     )
 
     return jsonify({"success": True})
@@ -7,9 +7,23 @@ from flask import Blueprint, request, jsonify, current_app
 from app.blueprints.auth import login_required, admin_required
 from app.models.user import User
 from app.models.analytics import Analytics
+from app.services.lists_manifest import lists_manifest
 
 analytics_bp = Blueprint("analytics", __name__)
 
+# Slices returned by the public default-list analytics endpoint
+DEFAULT_LIST_FACETS = {
+    "stats": ("stats", Analytics.TYPE_DEFAULT),
+    "daily": ("daily", Analytics.TYPE_DEFAULT),
+}
+
+# Slices returned by the user and user-list analytics endpoints
+USER_LIST_FACETS = {
+    "stats": ("stats", Analytics.TYPE_USER),
+    "daily": ("daily", Analytics.TYPE_USER),
+    "geo": ("geo", Analytics.TYPE_USER),
+}
+
 
 @analytics_bp.route("/default", methods=["GET"])
 def get_default_analytics():
@@ -17,11 +31,9 @@ def get_default_analytics():
     days = request.args.get("days", 30, type=int)
     days = min(days, 90)  # Max 90 days
 
-    # Get aggregated stats
-    stats = Analytics.get_stats(list_type=Analytics.TYPE_DEFAULT, days=days)
-
-    # Get daily breakdown for charts
-    daily = Analytics.get_daily_stats(list_type=Analytics.TYPE_DEFAULT, days=days)
+    # Aggregated stats and daily breakdown for charts in one query
+    bundle = Analytics.get_bundle(DEFAULT_LIST_FACETS, days=days)
+    stats, daily = bundle["stats"], bundle["daily"]
 
     # Get totals
     totals = Analytics.get_default_list_totals()
@@ -43,20 +55,9 @@ def get_user_analytics(user: User):
     days = request.args.get("days", 30, type=int)
     days = min(days, 90)
 
-    # Get aggregated stats
-    stats = Analytics.get_stats(
-        list_type=Analytics.TYPE_USER, username=user.username, days=days
-    )
-
-    # Get daily breakdown
-    daily = Analytics.get_daily_stats(
-        list_type=Analytics.TYPE_USER, username=user.username, days=days
-    )
-
-    # Get geo stats
-    geo = Analytics.get_geo_stats(
-        list_type=Analytics.TYPE_USER, username=user.username, days=days
-    )
+    # Aggregated stats, daily breakdown and geo stats in one query
+    bundle = Analytics.get_bundle(USER_LIST_FACETS, username=user.username, days=days)
+    stats, daily, geo = bundle["stats"], bundle["daily"], bundle["geo"]
 
     return jsonify(
         {
@@ -80,29 +81,11 @@ def get_user_list_analytics(user: User, list_name: str):
     if not list_info:
         return jsonify({"error": "List not found"}), 404
 
-    # Get aggregated stats
-    stats = Analytics.get_stats(
-        list_type=Analytics.TYPE_USER,
-        list_name=list_name,
-        username=user.username,
-        days=days,
-    )
-
-    # Get daily breakdown
-    daily = Analytics.get_daily_stats(
-        list_type=Analytics.TYPE_USER,
-        list_name=list_name,
-        username=user.username,
-        days=days,
-    )
-
-    # Get geo stats
-    geo = Analytics.get_geo_stats(
-        list_type=Analytics.TYPE_USER,
-        list_name=list_name,
-        username=user.username,
-        days=days,
+    # Aggregated stats, daily breakdown and geo stats in one query
+    bundle = Analytics.get_bundle(
+        USER_LIST_FACETS, list_name=list_name, username=user.username, days=days
     )
+    stats, daily, geo = bundle["stats"], bundle["daily"], bundle["geo"]
 
     return jsonify(
         {
@@ -122,16 +105,22 @@ def get_admin_analytics(admin: User):
     days = request.args.get("days", 30, type=int)
     days = min(days, 90)
 
-    # Get default list stats
-    default_stats = Analytics.get_stats(list_type=Analytics.TYPE_DEFAULT, days=days)
-    default_daily = Analytics.get_daily_stats(
-        list_type=Analytics.TYPE_DEFAULT, days=days
+    # Default and user list slices in one query
+    bundle = Analytics.get_bundle(
+        {
+            "default_stats": ("stats", Analytics.TYPE_DEFAULT),
+            "default_daily": ("daily", Analytics.TYPE_DEFAULT),
+            "default_geo": ("geo", Analytics.TYPE_DEFAULT),
+            "user_stats": ("stats", Analytics.TYPE_USER),
+            "user_daily": ("daily", Analytics.TYPE_USER),
+        },
+        days=days,
     )
-    default_geo = Analytics.get_geo_stats(list_type=Analytics.TYPE_DEFAULT, days=days)
-
-    # Get user list stats (all users combined)
-    user_stats = Analytics.get_stats(list_type=Analytics.TYPE_USER, days=days)
-    user_daily = Analytics.get_daily_stats(list_type=Analytics.TYPE_USER, days=days)
+    default_stats = bundle["default_stats"]
+    default_daily = bundle["default_daily"]
+    default_geo = bundle["default_geo"]
+    user_stats = bundle["user_stats"]
+    user_daily = bundle["user_daily"]
 
     # Combined stats
     combined_stats = {
@@ -169,25 +158,10 @@ def get_public_stats():
     # Get user count
     user_count = User.count(is_enabled=True)
 
-    # Get domain count from default lists
-    import os
-
-    default_dir = current_app.config["DEFAULT_DIR"]
-    output_dir = os.path.join(default_dir, "output")
-
-    total_domains = 0
-    if os.path.exists(output_dir):
-        all_domains_file = os.path.join(output_dir, "all_domains_hosts.txt")
-        if os.path.exists(all_domains_file):
-            # Read domain count from file header
-            try:
-                with open(all_domains_file, "r") as f:
-                    for line in f:
-                        if "Total domains:" in line:
-                            total_domains = int(line.split(":")[-1].strip())
-                            break
-            except Exception:
-                pass
+    # Get domain count of the combined default list from the output manifest
+    output_dir = current_app.config["DEFAULT_OUTPUT_DIR"]
+    all_domains = lists_manifest.get_list(output_dir, "all_domains")
+    total_domains = all_domains["domain_count"] if all_domains else 0
 
     return jsonify(
         {
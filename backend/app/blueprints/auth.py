@@ -4,41 +4,112 @@ Authentication blueprint - GitHub OAuth.
 
 import secrets
 from functools import wraps
-from flask import Blueprint, redirect, request, session, jsonify, current_app, url_for
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+from flask import (
+    Blueprint,
+    redirect,
+    request,
+    session,
+    jsonify,
+    current_app,
+    url_for,
+    g,
+)
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from app.models.user import User
 
 auth_bp = Blueprint("auth", __name__)
 
 
-def login_required(f):
-    """Decorator to require authentication."""
+def _create_github_session() -> requests.Session:
+    """
+    Create the session used for GitHub OAuth calls.
+
+    Connections to github.com and api.github.com are kept alive between
+    calls and logins, saving a TLS handshake per request. Only GETs are
+    retried; an OAuth code can be exchanged once.
+    """
+    session = requests.Session()
+    session.headers.update({"Accept": "application/json"})
+    retry = Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=["GET"],
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    session.mount("https://", adapter)
+    return session
+
+
+github_session = _create_github_session()
+
+
+# How long admin_required may reuse a fetched admin document. Dashboards fire
+# many admin requests at once; status changes evict the entry immediately.
+ADMIN_USER_CACHE_TTL = 5.0
+
+
+def _authenticate(admin: bool = False, projection: Optional[Dict[str, Any]] = None):
+    """
+    Resolve the session user, returning (user, None) or (None, error response).
+    The user is memoized on ``g`` so nested decorators share one lookup.
+    """
+    user_id = session.get("user_id")
+    if not user_id:
+        return None, (jsonify({"error": "Authentication required"}), 401)
+
+    user = g.get("current_user")
+    if user is None or user.id != user_id:
+        if admin:
+            # Admin endpoints only read the user's id, name and status
+            user = User.get_by_id_cached(
+                user_id, ADMIN_USER_CACHE_TTL, User.ADMIN_AUTH_PROJECTION
+            )
+        else:
+            user = User.get_by_id(user_id, projection=projection)
+        g.current_user = user
+
+    if not user:
+        session.clear()
+        return None, (jsonify({"error": "User not found"}), 401)
+
+    if not user.is_enabled:
+        session.clear()
+        return None, (jsonify({"error": "Account disabled"}), 403)
+
+    if user.is_banned:
+        session.clear()
+        ban_info = {"error": "Account banned"}
+        if user.ban_reason:
+            ban_info["reason"] = user.ban_reason
+        if user.banned_until:
+            ban_info["until"] = user.banned_until.isoformat()
+        return None, (jsonify(ban_info), 403)
+
+    return user, None
+
+
+def login_required(f=None, *, projection: Optional[Dict[str, Any]] = None):
+    """
+    Decorator to require authentication.
+
+    Endpoints that read only a few user fields can pass a projection, which
+    must include User.AUTH_PROJECTION, to skip loading the rest of the document.
+    """
+    if f is None:
+        return lambda f: login_required(f, projection=projection)
 
     @wraps(f)
     def decorated(*args, **kwargs):
-        user_id = session.get("user_id")
-        if not user_id:
-            return jsonify({"error": "Authentication required"}), 401
-
-        user = User.get_by_id(user_id)
-        if not user:
-            session.clear()
-            return jsonify({"error": "User not found"}), 401
-
-        if not user.is_enabled:
-            session.clear()
-            return jsonify({"error": "Account disabled"}), 403
-
-        if user.is_banned:
-            session.clear()
-            ban_info = {"error": "Account banned"}
-            if user.ban_reason:
-                ban_info["reason"] = user.ban_reason
-            if user.banned_until:
-                ban_info["until"] = user.banned_until.isoformat()
-            return jsonify(ban_info), 403
-
+        user, error = _authenticate(projection=projection)
+        if error:
+            return error
         return f(user, *args, **kwargs)
 
     return decorated
@@ -48,8 +119,10 @@ def admin_required(f):
     """Decorator to require admin access."""
 
     @wraps(f)
-    @login_required
-    def decorated(user, *args, **kwargs):
+    def decorated(*args, **kwargs):
+        user, error = _authenticate(admin=True)
+        if error:
+            return error
         if not user.is_admin:
             return jsonify({"error": "Admin access required"}), 403
         return f(user, *args, **kwargs)
@@ -57,6 +130,25 @@ def admin_required(f):
     return decorated
 
 
+def _github_authorize_prefix() -> str:
+    """
+    Get the GitHub authorize URL with the fixed OAuth parameters encoded.
+
+    Only the state changes between logins, so the rest of the query string
+    is built once per app.
+    """
+    prefix = current_app.extensions.get("github_authorize_prefix")
+    if prefix is None:
+        params = {
+            "client_id": current_app.config["GITHUB_CLIENT_ID"],
+            "redirect_uri": current_app.config["GITHUB_REDIRECT_URI"],
+            "scope": "read:user user:email",
+        }
+        prefix = f"{current_app.config['GITHUB_AUTHORIZE_URL']}?{urlencode(params)}"
+        current_app.extensions["github_authorize_prefix"] = prefix
+    return prefix
+
+
 @auth_bp.route("/github")
 def github_login():
     """Redirect to GitHub OAuth authorization page."""
@@ -64,19 +156,25 @@ def github_login():
     state = secrets.token_urlsafe(32)
     session["oauth_state"] = state
 
-    params = {
-        "client_id": current_app.config["GITHUB_CLIENT_ID"],
-        "redirect_uri": current_app.config["GITHUB_REDIRECT_URI"],
-        "scope": "read:user user:email",
-        "state": state,
-    }
-
-    query_string = "&".join(f"{k}={v}" for k, v in params.items())
-    auth_url = f"{current_app.config['GITHUB_AUTHORIZE_URL']}?{query_string}"
+    auth_url = f"{_github_authorize_prefix()}&{urlencode({'state': state})}"
 
     return redirect(auth_url)
 
 
+def _github_primary_email(access_token: str):
+    """Get the primary email of a GitHub user whose email is private."""
+    emails_response = github_session.get(
+        f"{current_app.config['GITHUB_API_URL']}/user/emails",
+        headers={"Authorization": f"token {access_token}"},
+        timeout=10,
+    )
+    emails = orjson.loads(emails_response.content)
+    # An error response is a dict rather than a list of emails
+    if not isinstance(emails, list):
+        return None
+    return next((e.get("email") for e in emails if e.get("primary")), None)
+
+
 @auth_bp.route("/callback")
 def github_callback():
     """Handle GitHub OAuth callback."""
@@ -102,7 +200,7 @@ def github_callback():
 
     # Exchange code for access token
     try:
-        token_response = requests.post(
+        token_response = github_session.post(
             current_app.config["GITHUB_TOKEN_URL"],
             data={
                 "client_id": current_app.config["GITHUB_CLIENT_ID"],
@@ -110,10 +208,9 @@ def github_callback():
                 "code": code,
                 "redirect_uri": current_app.config["GITHUB_REDIRECT_URI"],
             },
-            headers={"Accept": "application/json"},
             timeout=10,
         )
-        token_data = token_response.json()
+        token_data = orjson.loads(token_response.content)
 
         if "error" in token_data:
             current_app.logger.error(f"Token exchange error: {token_data}")
@@ -128,32 +225,15 @@ def github_callback():
             )
 
         # Get user info from GitHub
-        user_response = requests.get(
+        user_response = github_session.get(
             f"{current_app.config['GITHUB_API_URL']}/user",
-            headers={
-                "Authorization": f"token {access_token}",
-                "Accept": "application/json",
-            },
+            headers={"Authorization": f"token {access_token}"},
             timeout=10,
         )
-        user_data = user_response.json()
-
-        # Get user email if not public
-        email = user_data.get("email")
-        if not email:
-            emails_response = requests.get(
-                f"{current_app.config['GITHUB_API_URL']}/user/emails",
-                headers={
-                    "Authorization": f"token {access_token}",
-                    "Accept": "application/json",
-                },
-                timeout=10,
-            )
-            emails = emails_response.json()
-            for e in emails:
-                if e.get("primary"):
-                    email = e.get("email")
-                    break
+        user_data = orjson.loads(user_response.content)
+
+        # Only look up the primary email when there is no public one
+        email = user_data.get("email") or _github_primary_email(access_token)
 
         # Find or create user
         user = User.find_or_create_from_github(
@@ -172,7 +252,7 @@ def github_callback():
         current_app.logger.info(f"User {user.username} logged in")
         return redirect(f"{current_app.config['FRONTEND_URL']}/dashboard")
 
-    except requests.RequestException as e:
+    except (requests.RequestException, orjson.JSONDecodeError) as e:
         current_app.logger.error(f"GitHub API error: {e}")
         return redirect(f"{current_app.config['FRONTEND_URL']}/login?error=api_error")
 
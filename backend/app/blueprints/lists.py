@@ -3,14 +3,21 @@ Lists blueprint - serve public blocklists.
 """
 
 import os
+import re
 import gzip
 import hashlib
-from io import BytesIO
+import time
+from dataclasses import dataclass
 from datetime import datetime
-from flask import Blueprint, send_file, request, abort, jsonify, current_app
+from typing import BinaryIO, Optional
+from flask import Blueprint, request, abort, jsonify, current_app
+from werkzeug.wsgi import wrap_file
 
+from app.extensions import mongo
 from app.models.user import User
 from app.models.analytics import Analytics
+from app.services.analytics_writer import analytics_writer
+from app.services.lists_manifest import LIST_FORMATS, lists_manifest
 
 # Two blueprints: one for public file serving (no prefix), one for API metadata (with /api prefix)
 lists_public_bp = Blueprint(
@@ -20,6 +27,23 @@ lists_api_bp = Blueprint(
     "lists_api", __name__
 )  # Handles /api/lists and /api/browse metadata
 
+# Path segments accepted for list files (checked before touching the disk)
+_DEFAULT_LIST_NAME = re.compile(r"[A-Za-z0-9_]+").fullmatch
+_USER_LIST_NAME = re.compile(r"[A-Za-z0-9_-]+").fullmatch
+
+# Hashed IP and geo data for recent clients: {ip: (expires_at, ip_hash, country, city)}
+# Repeat downloads from the same address skip the hash and GeoIP lookup
+CLIENT_CACHE_TTL = 300.0
+_client_cache = {}
+_CLIENT_CACHE_MAX = 65536
+
+# Uncompressed list sizes: {gz_path: (mtime_ns, size)}
+_file_size_cache = {}
+_FILE_SIZE_CACHE_MAX = 4096
+
+# Largest offset accepted by the public community lists endpoint
+COMMUNITY_MAX_SKIP = 10_000
+
 
 def get_client_ip() -> str:
     """Get client IP address, prioritizing Cloudflare headers."""
@@ -36,26 +60,29 @@ def get_client_ip() -> str:
 
 
 def hash_ip(ip: str) -> str:
-    """Hash IP for privacy."""
-    return hashlib.sha256(ip.encode()).hexdigest()[:16]
+    """Hash IP for privacy (16 hex chars, as stored in the daily unique IP sets)."""
+    return hashlib.blake2b(ip.encode(), digest_size=8).hexdigest()
 
 
 def get_geo_data(ip: str) -> tuple:
     """Get geographic data for IP using GeoLite2."""
+    reader = current_app.extensions.get("geoip_reader")
+    if not reader:
+        return None, None
+
+    # Read the two fields we store straight from the raw record rather than
+    # building a full geoip2 City model per lookup
     try:
-        import geoip2.database
-
-        db_path = current_app.config.get("GEOIP_DATABASE_PATH")
-        if not db_path or not os.path.exists(db_path):
-            return None, None
-
-        with geoip2.database.Reader(db_path) as reader:
-            response = reader.city(ip)
-            country = response.country.iso_code
-            city = response.city.name
-            return country, city
-    except Exception:
+        record = reader.get(ip)
+    except ValueError:
+        # Malformed address
         return None, None
+    if not record:
+        return None, None
+
+    country = record.get("country", {}).get("iso_code")
+    city = record.get("city", {}).get("names", {}).get("en")
+    return country, city
 
 
 def record_analytics(
@@ -65,29 +92,84 @@ def record_analytics(
     format_type: str,
     file_size: int,
 ) -> None:
-    """Record analytics for a list request."""
+    """
+    Record analytics for a list request.
+
+    Request details are read here; the event is queued and written in a
+    batch by the analytics writer, so the download doesn't wait on Mongo.
+    """
     try:
         ip = get_client_ip()
-        ip_hash = hash_ip(ip)
-        country, city = get_geo_data(ip)
+        ip_hash, country, city = _client_info(ip)
         referrer = request.headers.get("Referer", "")
 
-        Analytics.record_request(
-            list_type=list_type,
-            list_name=list_name,
-            username=username,
-            format_type=format_type,
-            ip_hash=ip_hash,
-            country=country,
-            city=city,
-            referrer=referrer[:200] if referrer else None,  # Limit referrer length
-            size_bytes=file_size,
+        analytics_writer.submit(
+            {
+                "list_type": list_type,
+                "list_name": list_name,
+                "username": username,
+                "format_type": format_type,
+                "ip_hash": ip_hash,
+                "country": country,
+                "city": city,
+                # Limit referrer length
+                "referrer": referrer[:200] if referrer else None,
+                "size_bytes": file_size,
+                "timestamp": datetime.utcnow(),
+            }
         )
     except Exception as e:
         current_app.logger.error(f"Failed to record analytics: {e}")
 
 
-def serve_list_file(output_path: str) -> object:
+def _client_info(ip: str) -> tuple:
+    """Get (ip_hash, country, city) for a client IP, reusing recent lookups."""
+    now = time.monotonic()
+    entry = _client_cache.get(ip)
+    if entry and entry[0] > now:
+        return entry[1:]
+
+    country, city = get_geo_data(ip)
+    info = (hash_ip(ip), country, city)
+    if len(_client_cache) >= _CLIENT_CACHE_MAX:
+        _client_cache.clear()
+    _client_cache[ip] = (now + CLIENT_CACHE_TTL, *info)
+    return info
+
+
+@dataclass
+class ListFile:
+    """An open list file and the stat taken when it was opened."""
+
+    file: BinaryIO
+    path: str
+    stat: os.stat_result
+    is_gzip: bool
+
+
+def open_list_file(output_path: str) -> Optional[ListFile]:
+    """
+    Open a list file, preferring the .gz copy over a legacy plain file.
+
+    The open file is served as-is, so existence, size and modification time
+    all come from one open() and fstat() rather than separate path lookups.
+
+    Args:
+        output_path: Path to the file (without .gz extension)
+
+    Returns:
+        The open ListFile, or None if neither file exists
+    """
+    for path, is_gzip in ((output_path + ".gz", True), (output_path, False)):
+        try:
+            f = open(path, "rb")
+        except OSError:
+            continue
+        return ListFile(f, path, os.fstat(f.fileno()), is_gzip)
+    return None
+
+
+def serve_list_file(list_file: ListFile) -> object:
     """
     Serve a list file with gzip support.
 
@@ -96,101 +178,120 @@ def serve_list_file(output_path: str) -> object:
     - If client doesn't accept gzip: decompress on-the-fly and serve
 
     Args:
-        output_path: Path to the file (without .gz extension)
+        list_file: File returned by open_list_file (closed by the response)
     """
-    accept_encoding = request.headers.get("Accept-Encoding", "")
-    gz_path = output_path + ".gz"
-
-    # We now ONLY store .gz files - check if it exists
-    if not os.path.exists(gz_path):
-        # Fallback: check for legacy plain text file
-        if os.path.exists(output_path):
-            # Serve legacy plain file directly
-            response = send_file(
-                output_path, mimetype="text/plain; charset=utf-8", as_attachment=False
-            )
-            response.headers["Vary"] = "Accept-Encoding"
-            return response
-        abort(404)
+    stat = list_file.stat
 
-    # Client accepts gzip - serve compressed file directly (99% of requests)
-    if "gzip" in accept_encoding.lower():
-        response = send_file(
-            gz_path, mimetype="text/plain; charset=utf-8", as_attachment=False
-        )
-        response.headers["Content-Encoding"] = "gzip"
-    else:
+    if (
+        list_file.is_gzip
+        and "gzip" not in request.headers.get("Accept-Encoding", "").lower()
+    ):
         # Rare case: client doesn't support gzip - decompress on-the-fly
-        with gzip.open(gz_path, "rb") as f:
+        with gzip.GzipFile(fileobj=list_file.file) as f:
             content = f.read()
-        response = send_file(
-            BytesIO(content),
-            mimetype="text/plain; charset=utf-8",
-            as_attachment=False,
+        list_file.file.close()
+        response = current_app.response_class(
+            content, content_type="text/plain; charset=utf-8"
+        )
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+    xaccel_prefix = current_app.config.get("XACCEL_REDIRECT_PREFIX")
+    if list_file.is_gzip and xaccel_prefix:
+        # nginx sends the file from disk; the worker only returns headers
+        list_file.file.close()
+        relative_path = os.path.relpath(list_file.path, current_app.config["DATA_DIR"])
+        response = current_app.response_class(content_type="text/plain; charset=utf-8")
+        response.headers["X-Accel-Redirect"] = (
+            f"{xaccel_prefix.rstrip('/')}/{relative_path}"
+        )
+    else:
+        # Stream the already open file (99% of requests are the gzip case)
+        response = current_app.response_class(
+            wrap_file(request.environ, list_file.file),
+            content_type="text/plain; charset=utf-8",
+            direct_passthrough=True,
+        )
+        response.content_length = stat.st_size
+        response.last_modified = stat.st_mtime
+        response.set_etag(f"{stat.st_mtime_ns:x}-{stat.st_size:x}")
+        response.make_conditional(
+            request.environ, accept_ranges=True, complete_length=stat.st_size
         )
 
+    if list_file.is_gzip:
+        response.headers["Content-Encoding"] = "gzip"
     response.headers["Vary"] = "Accept-Encoding"
     return response
 
 
-def get_list_file_size(output_path: str) -> int:
+def get_list_file_size(list_file: ListFile) -> int:
     """
     Get the uncompressed size of a list file.
 
     For gzip-only storage, reads the uncompressed size from gzip footer.
     Falls back to actual file size for legacy plain text files.
     """
-    gz_path = output_path + ".gz"
-
-    if os.path.exists(gz_path):
-        # Read uncompressed size from gzip footer (last 4 bytes, little-endian)
-        # Note: This only works for files < 4GB, which is fine for blocklists
-        try:
-            with open(gz_path, "rb") as f:
-                f.seek(-4, 2)  # Seek to last 4 bytes
-                size_bytes = f.read(4)
-                return int.from_bytes(size_bytes, "little")
-        except Exception:
-            # Fallback to compressed size
-            return os.path.getsize(gz_path)
-    elif os.path.exists(output_path):
+    stat = list_file.stat
+    if not list_file.is_gzip:
         # Legacy plain text file
-        return os.path.getsize(output_path)
-    return 0
+        return stat.st_size
 
+    # Files are only replaced on regeneration, so the footer is read once
+    # per version of the file
+    cached = _file_size_cache.get(list_file.path)
+    if cached and cached[0] == stat.st_mtime_ns:
+        return cached[1]
 
-def list_file_exists(output_path: str) -> bool:
-    """Check if a list file exists (either .gz or legacy plain)."""
-    return os.path.exists(output_path + ".gz") or os.path.exists(output_path)
+    # Read uncompressed size from gzip footer (last 4 bytes, little-endian)
+    # Note: This only works for files < 4GB, which is fine for blocklists
+    # pread leaves the file position at the start for serving
+    try:
+        footer = os.pread(list_file.file.fileno(), 4, stat.st_size - 4)
+    except OSError:
+        footer = b""
+    if len(footer) == 4:
+        size = int.from_bytes(footer, "little")
+    else:
+        # Fallback to compressed size
+        size = stat.st_size
+    if len(_file_size_cache) >= _FILE_SIZE_CACHE_MAX:
+        _file_size_cache.clear()
+    _file_size_cache[list_file.path] = (stat.st_mtime_ns, size)
+    return size
 
 
 @lists_public_bp.route("/lists/<name>.txt")
 def serve_default_list(name: str):
     """Serve default/official blocklist files."""
     # Validate name
-    if not name or not name.replace("_", "").isalnum():
+    if not _DEFAULT_LIST_NAME(name):
         abort(404)
 
     # Get format
     format_type = request.args.get("format", "hosts")
-    if format_type not in ["hosts", "plain", "adblock"]:
+    if format_type not in LIST_FORMATS:
         format_type = "hosts"
 
     # Build file path
-    default_dir = current_app.config["DEFAULT_DIR"]
-    filename = f"{name}_{format_type}.txt"
-    output_path = os.path.join(default_dir, "output", filename)
-
-    if not list_file_exists(output_path):
-        # Try without format suffix for backwards compatibility
-        alt_path = os.path.join(default_dir, "output", f"{name}.txt")
-        if list_file_exists(alt_path):
-            output_path = alt_path
-        else:
-            abort(404)
+    output_dir = current_app.config["DEFAULT_OUTPUT_DIR"]
+    output_path = lists_manifest.resolve(output_dir, name, format_type)
+
+    if output_path is not None:
+        list_file = open_list_file(output_path)
+    else:
+        # Not in the manifest (yet) - check the filesystem directly
+        list_file = open_list_file(
+            os.path.join(output_dir, f"{name}_{format_type}.txt")
+        )
+        if list_file is None:
+            # Try without format suffix for backwards compatibility
+            list_file = open_list_file(os.path.join(output_dir, f"{name}.txt"))
+    if list_file is None:
+        abort(404)
 
     # Get file size (uncompressed for analytics)
-    file_size = get_list_file_size(output_path)
+    file_size = get_list_file_size(list_file)
 
     # Record analytics
     record_analytics(
@@ -202,7 +303,7 @@ def serve_default_list(name: str):
     )
 
     # Serve file with gzip support
-    response = serve_list_file(output_path)
+    response = serve_list_file(list_file)
 
     # Add headers
     response.headers["Cache-Control"] = "public, max-age=3600"  # 1 hour
@@ -217,11 +318,7 @@ def serve_default_list(name: str):
 def serve_user_list(username: str, name: str):
     """Serve user blocklist files."""
     # Validate inputs
-    if not username or not name:
-        abort(404)
-    if not username.replace("-", "").replace("_", "").isalnum():
-        abort(404)
-    if not name.replace("-", "").replace("_", "").isalnum():
+    if not _USER_LIST_NAME(username) or not _USER_LIST_NAME(name):
         abort(404)
 
     # Get user
@@ -238,16 +335,16 @@ def serve_user_list(username: str, name: str):
 
     # Get format
     format_type = request.args.get("format", "hosts")
-    if format_type not in ["hosts", "plain", "adblock"]:
+    if format_type not in LIST_FORMATS:
         format_type = "hosts"
 
     # Build file path
-    output_path = user.get_output_path(name, format_type)
-    if not list_file_exists(output_path):
+    list_file = open_list_file(user.get_output_path(name, format_type))
+    if list_file is None:
         abort(404)
 
     # Get file size (uncompressed for analytics)
-    file_size = get_list_file_size(output_path)
+    file_size = get_list_file_size(list_file)
 
     # Record analytics
     record_analytics(
@@ -259,7 +356,7 @@ def serve_user_list(username: str, name: str):
     )
 
     # Serve file with gzip support
-    response = serve_list_file(output_path)
+    response = serve_list_file(list_file)
 
     # Add headers
     response.headers["Cache-Control"] = "public, max-age=3600"
@@ -275,102 +372,62 @@ def serve_user_list(username: str, name: str):
 @lists_api_bp.route("/lists")
 def list_default_lists():
     """Get information about all default lists."""
-    default_dir = current_app.config["DEFAULT_DIR"]
-    output_dir = os.path.join(default_dir, "output")
-
-    if not os.path.exists(output_dir):
-        return jsonify([])
-
-    # Group files by base name
-    # Support both .txt.gz (new) and .txt (legacy) files
-    lists = {}
-    for filename in os.listdir(output_dir):
-        # Handle both .txt.gz and .txt files
-        if filename.endswith(".txt.gz"):
-            base_name = filename[:-7]  # Remove .txt.gz
-            is_gzip = True
-        elif filename.endswith(".txt"):
-            base_name = filename[:-4]  # Remove .txt
-            is_gzip = False
-        else:
-            continue
+    output_dir = current_app.config["DEFAULT_OUTPUT_DIR"]
+    return jsonify(lists_manifest.get_lists(output_dir))
 
-        # Parse filename (name_format)
-        parts = base_name.rsplit("_", 1)
-        if len(parts) == 2:
-            name, format_type = parts
-            if format_type not in ["hosts", "plain", "adblock"]:
-                name = base_name
-                format_type = "hosts"
-        else:
-            name = base_name
-            format_type = "hosts"
-
-        filepath = os.path.join(output_dir, filename)
-
-        if name not in lists:
-            mtime = os.path.getmtime(filepath)
-            lists[name] = {
-                "name": name,
-                "formats": set(),
-                "size_bytes": 0,
-                "last_updated": datetime.fromtimestamp(mtime).isoformat(),
-            }
 
-        lists[name]["formats"].add(format_type)
-
-        # Get uncompressed size
-        if is_gzip:
-            size = get_list_file_size(filepath[:-3])  # Remove .gz for helper
-        else:
-            size = os.path.getsize(filepath)
-        lists[name]["size_bytes"] = max(lists[name]["size_bytes"], size)
-
-        # Try to get domain count from file
-        if "domain_count" not in lists[name]:
-            try:
-                if is_gzip:
-                    with gzip.open(filepath, "rt", encoding="utf-8") as f:
-                        for line in f:
-                            if "Total domains:" in line:
-                                count = int(line.split(":")[-1].strip())
-                                lists[name]["domain_count"] = count
-                                break
-                else:
-                    with open(filepath, "r") as f:
-                        for line in f:
-                            if "Total domains:" in line:
-                                count = int(line.split(":")[-1].strip())
-                                lists[name]["domain_count"] = count
-                                break
-            except Exception:
-                lists[name]["domain_count"] = 0
-
-    # Convert sets to lists for JSON serialization
-    for name in lists:
-        lists[name]["formats"] = list(lists[name]["formats"])
-
-    return jsonify(list(lists.values()))
+def _isoformat_or_none(value):
+    """Format a datetime for JSON, passing missing values through as None."""
+    return value.isoformat() if value else None
 
 
 @lists_api_bp.route("/browse/featured")
 def get_featured_lists():
     """Get featured community lists."""
-    from app.extensions import mongo
-
-    featured = list(mongo.db.featured_lists.find().sort("display_order", 1))
+    # Join each featured entry to its owner in one query, bringing back only
+    # the enabled flag and the featured list rather than whole user documents
+    # (localField/foreignField together with a pipeline needs MongoDB 5.0+)
+    pipeline = [
+        # Admin endpoints store the position as "order", which is indexed
+        {"$sort": {"order": 1}},
+        {
+            "$lookup": {
+                "from": "users",
+                "localField": "username",
+                "foreignField": "username",
+                "let": {"list_name": "$list_name"},
+                "pipeline": [
+                    {
+                        "$project": {
+                            "_id": 0,
+                            "is_enabled": 1,
+                            "list": {
+                                "$arrayElemAt": [
+                                    {
+                                        "$filter": {
+                                            "input": {"$ifNull": ["$lists", []]},
+                                            "as": "l",
+                                            "cond": {
+                                                "$eq": ["$$l.name", "$$list_name"]
+                                            },
+                                        }
+                                    },
+                                    0,
+                                ]
+                            },
+                        }
+                    }
+                ],
+                "as": "user",
+            }
+        },
+        {"$unwind": "$user"},
+        {"$match": {"user.is_enabled": {"$ne": False}, "user.list": {"$ne": None}}},
+    ]
 
     result = []
-    for f in featured:
-        # Get list info
-        user = User.get_by_username(f.get("username"))
-        if not user or not user.is_enabled:
-            continue
-
-        list_info = user.get_list(f.get("list_name"))
-        if not list_info:
-            continue
-
+    for f in mongo.db.featured_lists.aggregate(pipeline):
+        list_info = f["user"]["list"]
         result.append(
             {
                 "id": str(f["_id"]),
@@ -378,12 +435,8 @@ def get_featured_lists():
                 "list_name": f.get("list_name"),
                 "description": f.get("description", ""),
                 "domain_count": list_info.get("domain_count", 0),
-                "last_updated": (
-                    list_info.get("last_updated", "").isoformat()
-                    if list_info.get("last_updated")
-                    else None
-                ),
-                "display_order": f.get("display_order", 0),
+                "last_updated": _isoformat_or_none(list_info.get("last_updated")),
+                "display_order": f.get("order", 0),
             }
         )
 
@@ -393,31 +446,41 @@ def get_featured_lists():
 @lists_api_bp.route("/browse/community")
 def get_community_lists():
     """Get all public community lists."""
-    from app.extensions import mongo
-
-    # Get all enabled users with lists
-    users = list(
-        mongo.db.users.find({"is_enabled": True, "lists": {"$exists": True, "$ne": []}})
-    )
+    # Optional offset for paging past the first 100, capped so a request
+    # can't make the server sort and skip an arbitrary number of rows
+    skip = min(max(request.args.get("skip", 0, type=int), 0), COMMUNITY_MAX_SKIP)
+
+    # Flatten every enabled user's lists server-side and keep one page ordered
+    # by domain count (most popular first)
+    pipeline = [
+        {"$match": {"is_enabled": True, "lists": {"$exists": True, "$ne": []}}},
+        {
+            "$project": {
+                "_id": 0,
+                "username": 1,
+                "lists.name": 1,
+                "lists.domain_count": 1,
+                "lists.last_updated": 1,
+            }
+        },
+        {"$unwind": "$lists"},
+        {
+            "$project": {
+                "username": 1,
+                "name": "$lists.name",
+                "domain_count": {"$ifNull": ["$lists.domain_count", 0]},
+                "last_updated": "$lists.last_updated",
+            }
+        },
+        # Username and name break ties, so pages never overlap or skip lists
+        {"$sort": {"domain_count": -1, "username": 1, "name": 1}},
+        {"$skip": skip},
+        {"$limit": 100},
+    ]
 
     result = []
-    for u in users:
-        username = u.get("username")
-        for list_info in u.get("lists", []):
-            result.append(
-                {
-                    "username": username,
-                    "name": list_info.get("name"),
-                    "domain_count": list_info.get("domain_count", 0),
-                    "last_updated": (
-                        list_info.get("last_updated", "").isoformat()
-                        if list_info.get("last_updated")
-                        else None
-                    ),
-                }
-            )
-
-    # Sort by domain count (most popular first)
-    result.sort(key=lambda x: x.get("domain_count", 0), reverse=True)
-
-    return jsonify(result[:100])  # Limit to 100
+    for row in mongo.db.users.aggregate(pipeline):
+        row["last_updated"] = _isoformat_or_none(row.get("last_updated"))
+        result.append(row)
+
+    return jsonify(result)
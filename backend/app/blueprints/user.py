@@ -4,14 +4,23 @@ User blueprint - config, whitelist, lists, jobs, build.
 
 import os
 import hashlib
+import time
+from bisect import bisect_right
 from datetime import datetime, timedelta
+from typing import List, Tuple
+from bson import ObjectId
 from flask import Blueprint, request, jsonify, current_app
 import gevent
+from blake3 import blake3
 
 from app.blueprints.auth import login_required
 from app.extensions import mongo
 from app.models.user import User
 from app.models.job import Job
+from app.models.limit_request import LimitRequest
+from app.models.announcement import Announcement
+from app.models.system_config import SystemConfig
+from app.services.job_queue import JobQueue
 from app.utils.validators import (
     validate_blocklist_config,
     validate_blocklist_config_strict,
@@ -22,21 +31,89 @@ from app.utils.validators import (
 from app.socketio import emit_validation_progress, emit_validation_complete
 from app.models.blocklist_library import BlocklistLibrary
 from app.models.cache import CacheMetadata
+from app.utils.http_cache import collection_version, conditional_response
 
 user_bp = Blueprint("user", __name__)
 
+# Most jobs returned by the job history endpoint
+MAX_JOB_HISTORY = 200
 
-def _generate_config_hash(config: str) -> str:
-    """Generate SHA256 hash of config content for validation token."""
-    return hashlib.sha256(config.encode("utf-8")).hexdigest()
+# Minimum seconds between config validation progress events
+VALIDATION_PROGRESS_INTERVAL = 0.25
+
+
+# Categories never change at runtime, so sort them and tag the response once
+CATEGORIES = sorted(VALID_CATEGORIES)
+CATEGORIES_ETAG = f"categories-{blake3(','.join(CATEGORIES).encode()).hexdigest(8)}"
+
+
+def _content_etag(prefix: str, text: str) -> str:
+    """Build an ETag for a response that only carries text."""
+    return f"{prefix}-{blake3(text.encode('utf-8')).hexdigest(16)}"
+
+
+# Hash used for new validation tokens; stored with each token
+CONFIG_HASH_ALGORITHM = "blake3"
+
+
+def _generate_config_hash(data: bytes, algorithm: str = CONFIG_HASH_ALGORITHM) -> str:
+    """Generate a hash of UTF-8 encoded config content for the validation token."""
+    if algorithm == "blake3":
+        return blake3(data).hexdigest()
+    # Tokens issued before the switch to BLAKE3 (they expire within minutes)
+    return hashlib.sha256(data).hexdigest()
+
+
+# Most JSON bytes one byte of UTF-8 text can take: control characters become
+# \u00XX, and ensure_ascii clients send a 2-byte "é" as 6-byte \u00e9
+JSON_ESCAPE_MAX_GROWTH = 6
+
+
+def _body_too_large(max_size: int) -> bool:
+    """
+    Check whether a JSON body is too big to hold text of at most max_size bytes.
+
+    Lets oversized uploads be rejected before the body is read and parsed.
+    Only bodies past the worst case escaping of max_size bytes of text are
+    turned away unseen; _text_too_large checks the exact size after parsing.
+    """
+    content_length = request.content_length
+    return (
+        content_length is not None
+        and content_length > JSON_ESCAPE_MAX_GROWTH * max_size + 1024
+    )
+
+
+def _text_too_large(text: str, max_size: int) -> bool:
+    """Check whether text exceeds max_size bytes once UTF-8 encoded."""
+    # The JSON body is never smaller than the text it carries, so a body
+    # within the limit saves encoding the text to measure it
+    content_length = request.content_length
+    if content_length is not None and content_length <= max_size:
+        return False
+    return len(text.encode("utf-8")) > max_size
+
+
+def _too_large_response(label: str, user: User):
+    """Error response for a config or whitelist over the user's size limit."""
+    return (
+        jsonify(
+            {
+                "error": f"{label} file too large. Maximum size: {user.limits['max_config_size_mb']}MB"
+            }
+        ),
+        400,
+    )
 
 
 @user_bp.route("/config", methods=["GET"])
 @login_required
 def get_config(user: User):
     """Get user's blocklist configuration."""
-    config = user.get_config("blocklists.conf")
-    return jsonify({"config": config or ""})
+    config = user.get_config("blocklists.conf") or ""
+    return conditional_response(
+        _content_etag("config", config), lambda: jsonify({"config": config})
+    )
 
 
 @user_bp.route("/config", methods=["PUT"])
@@ -48,7 +125,9 @@ def update_config(user: User):
     Requires a validation_token from a prior validation to ensure
     the config being saved is exactly what was validated.
     """
-    from bson import ObjectId
+    max_size = user.limits["max_config_size_mb"] * 1024 * 1024
+    if _body_too_large(max_size):
+        return _too_large_response("Config", user)
 
     data = request.get_json()
     config = data.get("config", "")
@@ -58,7 +137,8 @@ def update_config(user: User):
     if not validation_token:
         return jsonify({"error": "Validation required before saving"}), 400
 
-    # Look up the validation token
+    # Look up the validation token (the TTL index removes expired tokens
+    # within a minute; the expiry filter covers the gap)
     token_doc = mongo.db.validation_tokens.find_one(
         {"user_id": ObjectId(user.id), "expires_at": {"$gt": datetime.utcnow()}}
     )
@@ -66,8 +146,17 @@ def update_config(user: User):
     if not token_doc:
         return jsonify({"error": "Validation expired, please re-validate"}), 400
 
+    # Encoded once for both the size check and the hash
+    config_bytes = config.encode("utf-8")
+
+    # Validate size (double-check)
+    if len(config_bytes) > max_size:
+        return _too_large_response("Config", user)
+
     # Verify the config hasn't been modified since validation
-    config_hash = _generate_config_hash(config)
+    config_hash = _generate_config_hash(
+        config_bytes, token_doc.get("hash_algorithm", "sha256")
+    )
     if token_doc["config_hash"] != config_hash:
         return (
             jsonify(
@@ -80,18 +169,6 @@ def update_config(user: User):
     if token_doc.get("has_errors"):
         return jsonify({"error": "Cannot save config with validation errors"}), 400
 
-    # Validate size (double-check)
-    max_size = user.limits["max_config_size_mb"] * 1024 * 1024
-    if len(config.encode("utf-8")) > max_size:
-        return (
-            jsonify(
-                {
-                    "error": f"Config file too large. Maximum size: {user.limits['max_config_size_mb']}MB"
-                }
-            ),
-            400,
-        )
-
     # Save config
     user.save_config("blocklists.conf", config)
 
@@ -118,25 +195,31 @@ def validate_config(user: User):
     that must be provided when saving the config. This ensures the exact
     validated config is what gets saved.
     """
-    from bson import ObjectId
+    # Validate size first
+    max_size = user.limits["max_config_size_mb"] * 1024 * 1024
+    if _body_too_large(max_size):
+        return _too_large_response("Config", user)
 
     data = request.get_json()
     config = data.get("config", "")
 
-    # Validate size first
-    max_size = user.limits["max_config_size_mb"] * 1024 * 1024
-    if len(config.encode("utf-8")) > max_size:
-        return (
-            jsonify(
-                {
-                    "error": f"Config file too large. Maximum size: {user.limits['max_config_size_mb']}MB"
-                }
-            ),
-            400,
-        )
+    # Encoded once for both the size check and the token hash
+    config_bytes = config.encode("utf-8")
+    if len(config_bytes) > max_size:
+        return _too_large_response("Config", user)
+
+    # Progress callback that emits Socket.IO events, at most one every
+    # VALIDATION_PROGRESS_INTERVAL seconds; the final update always goes out
+    last_emit = [0.0]  # Use list for mutable reference in closure
 
-    # Progress callback that emits Socket.IO events
     def emit_progress(progress):
+        now = time.monotonic()
+        if (
+            progress["status"] != "complete"
+            and now - last_emit[0] < VALIDATION_PROGRESS_INTERVAL
+        ):
+            return
+        last_emit[0] = now
         emit_validation_progress(user.id, progress)
 
     # Run validation with HEAD requests
@@ -148,12 +231,13 @@ def validate_config(user: User):
 
     # Generate and store validation token
     # Token ties the exact config content to this validation result
-    config_hash = _generate_config_hash(config)
+    config_hash = _generate_config_hash(config_bytes)
     now = datetime.utcnow()
 
     token_doc = {
         "user_id": ObjectId(user.id),
         "config_hash": config_hash,
+        "hash_algorithm": CONFIG_HASH_ALGORITHM,
         "has_errors": result.has_errors,
         "created_at": now,
         "expires_at": now + timedelta(minutes=10),
@@ -178,11 +262,14 @@ def validate_config(user: User):
 @login_required
 def get_categories(user: User):
     """Get the list of valid categories."""
-    return jsonify(
-        {
-            "categories": sorted(VALID_CATEGORIES),
-            "nsfw_excluded_from_all_domains": True,
-        }
+    return conditional_response(
+        CATEGORIES_ETAG,
+        lambda: jsonify(
+            {
+                "categories": CATEGORIES,
+                "nsfw_excluded_from_all_domains": True,
+            }
+        ),
     )
 
 
@@ -220,45 +307,49 @@ def get_url_metadata(user: User):
 @login_required
 def get_library(user: User):
     """Get blocklist library grouped by category for visual editor."""
-    grouped = BlocklistLibrary.get_grouped_by_category()
 
-    return jsonify(
-        {
-            "library": {
-                category: [entry.to_dict() for entry in entries]
-                for category, entries in grouped.items()
-            },
-            "categories": sorted(VALID_CATEGORIES),
-        }
-    )
+    def build():
+        grouped = BlocklistLibrary.get_grouped_by_category()
+        return jsonify(
+            {
+                "library": {
+                    category: [entry.to_dict() for entry in entries]
+                    for category, entries in grouped.items()
+                },
+                "categories": CATEGORIES,
+            }
+        )
+
+    # The library is only written by admin endpoints, which bump its version
+    version = collection_version("blocklist_library")
+    return conditional_response(f"user-library-{version}", build)
 
 
 @user_bp.route("/whitelist", methods=["GET"])
 @login_required
 def get_whitelist(user: User):
     """Get user's whitelist."""
-    whitelist = user.get_config("whitelist.txt")
-    return jsonify({"whitelist": whitelist or ""})
+    whitelist = user.get_config("whitelist.txt") or ""
+    return conditional_response(
+        _content_etag("whitelist", whitelist),
+        lambda: jsonify({"whitelist": whitelist}),
+    )
 
 
 @user_bp.route("/whitelist", methods=["PUT"])
 @login_required
 def update_whitelist(user: User):
     """Update whitelist."""
+    # Validate size
+    max_size = user.limits["max_config_size_mb"] * 1024 * 1024
+    if _body_too_large(max_size):
+        return _too_large_response("Whitelist", user)
+
     data = request.get_json()
     whitelist = data.get("whitelist", "")
 
-    # Validate size
-    max_size = user.limits["max_config_size_mb"] * 1024 * 1024
-    if len(whitelist.encode("utf-8")) > max_size:
-        return (
-            jsonify(
-                {
-                    "error": f"Whitelist file too large. Maximum size: {user.limits['max_config_size_mb']}MB"
-                }
-            ),
-            400,
-        )
+    if _text_too_large(whitelist, max_size):
+        return _too_large_response("Whitelist", user)
 
     # Validate patterns
     errors = validate_whitelist(whitelist)
@@ -273,12 +364,9 @@ def update_whitelist(user: User):
 
 
 @user_bp.route("/lists", methods=["GET"])
-@login_required
+@login_required(projection=User.LISTS_PROJECTION)
 def get_lists(user: User):
     """Get user's output lists with stats."""
-    # Get fresh user data
-    user = User.get_by_id(user.id)
-
     return jsonify(
         {
             "lists": user.lists,
@@ -305,28 +393,18 @@ def get_lists(user: User):
 @login_required
 def trigger_build(user: User):
     """Trigger manual build."""
-    from bson import ObjectId
-
     # Check if user has a config
     config = user.get_config("blocklists.conf")
     if not config or not config.strip():
         return jsonify({"error": "No blocklist configuration found"}), 400
 
-    # Check manual update limit
-    if not user.can_do_manual_update():
-        return (
-            jsonify(
-                {
-                    "error": "Weekly manual update limit reached",
-                    "remaining": 0,
-                    "resets_at": user.stats["week_reset_at"].isoformat(),
-                }
-            ),
-            429,
-        )
+    # Active job and cooldown (5 minutes between manual builds) in one query
+    has_active_job, cooldown_remaining = Job.get_build_gate(
+        ObjectId(user.id), cooldown_minutes=5
+    )
 
     # Check if user already has an active job
-    if Job.has_active_job_for_user(ObjectId(user.id)):
+    if has_active_job:
         return (
             jsonify(
                 {
@@ -337,10 +415,7 @@ def trigger_build(user: User):
             429,
         )
 
-    # Check cooldown (5 minutes between manual builds)
-    cooldown_remaining = Job.get_cooldown_remaining(
-        ObjectId(user.id), cooldown_minutes=5
-    )
+    # Check cooldown
     if cooldown_remaining > 0:
         minutes = cooldown_remaining // 60
         seconds = cooldown_remaining % 60
@@ -355,11 +430,25 @@ def trigger_build(user: User):
             429,
         )
 
-    # Queue job
-    from app.services.job_queue import JobQueue
+    # Check and count the manual update in one step
+    if not user.reserve_manual_update():
+        return (
+            jsonify(
+                {
+                    "error": "Weekly manual update limit reached",
+                    "remaining": 0,
+                    "resets_at": user.stats["week_reset_at"].isoformat(),
+                }
+            ),
+            429,
+        )
 
-    job = JobQueue.queue_job(user, job_type=Job.TYPE_MANUAL)
-    user.increment_manual_updates()
+    # Queue job, giving the reserved update back if that fails
+    try:
+        job = JobQueue.queue_job(user, job_type=Job.TYPE_MANUAL)
+    except Exception:
+        user.release_manual_update()
+        raise
 
     current_app.logger.info(
         f"User {user.username} triggered manual build: {job.job_id}"
@@ -375,20 +464,20 @@ def trigger_build(user: User):
 
 
 @user_bp.route("/jobs", methods=["GET"])
-@login_required
+@login_required(projection=User.AUTH_PROJECTION)
 def get_jobs(user: User):
     """Get user's job history."""
-    from bson import ObjectId
-
-    limit = request.args.get("limit", 20, type=int)
-    jobs = Job.get_by_user(ObjectId(user.id), limit=limit)
+    # Capped so the combined $facet result stays well under Mongo's 16MB limit
+    limit = min(max(request.args.get("limit", 20, type=int), 1), MAX_JOB_HISTORY)
 
-    # Check for unread failures
-    has_unread_failures = Job.has_unread_failures(ObjectId(user.id))
+    # Job history and unread failure flag in one query
+    jobs, has_unread_failures = Job.get_history_with_unread(
+        ObjectId(user.id), limit=limit
+    )
 
     return jsonify(
         {
-            "jobs": [j.to_dict() for j in jobs],
+            "jobs": [Job.serialize(j) for j in jobs],
             "has_unread_failures": has_unread_failures,
         }
     )
@@ -413,8 +502,6 @@ def get_job(user: User, job_id: str):
 @login_required
 def mark_jobs_read(user: User):
     """Mark all failed jobs as read."""
-    from bson import ObjectId
-
     Job.mark_failures_read(ObjectId(user.id))
     return jsonify({"success": True})
 
@@ -423,10 +510,8 @@ def mark_jobs_read(user: User):
 @login_required
 def copy_default_template(user: User):
     """Copy default config as a template for user."""
-    from app.extensions import mongo
-
     # Get default config from MongoDB system_config collection
-    system_config = mongo.db["system_config"].find_one({"_id": "default_config"})
+    system_config = SystemConfig.get_default_config_doc()
 
     if not system_config:
         return jsonify({"error": "Default configuration not available"}), 404
@@ -473,25 +558,25 @@ def copy_default_template(user: User):
 # Limit Request Endpoints
 
 
+def _domain_tier_options(user: User) -> Tuple[int, List[int]]:
+    """Get the user's domain limit and the higher tiers they may request."""
+    # DOMAIN_TIERS is in ascending order, so the higher tiers are a slice
+    domain_tiers = current_app.config["DOMAIN_TIERS"]
+    current_limit = user.limits.get("max_domains", domain_tiers[0])
+    return current_limit, domain_tiers[bisect_right(domain_tiers, current_limit) :]
+
+
 @user_bp.route("/limit-request", methods=["POST"])
 @login_required
 def submit_limit_request(user: User):
     """Submit a request for a higher domain limit."""
-    from app.models.limit_request import LimitRequest
-
     data = request.get_json()
     requested_tier = data.get("requested_tier")
     reason = data.get("reason", "").strip()
     intended_use = data.get("intended_use", "personal")
 
     # Validate requested tier
-    domain_tiers = current_app.config.get(
-        "DOMAIN_TIERS", [2_000_000, 5_000_000, 10_000_000]
-    )
-    current_limit = user.limits.get("max_domains", domain_tiers[0])
-
-    # Filter to tiers higher than current limit
-    available_tiers = [t for t in domain_tiers if t > current_limit]
+    current_limit, available_tiers = _domain_tier_options(user)
 
     if not available_tiers:
         return jsonify({"error": "You are already at the maximum tier"}), 400
@@ -557,17 +642,12 @@ def submit_limit_request(user: User):
 @login_required
 def get_limit_requests(user: User):
     """Get user's limit requests."""
-    from app.models.limit_request import LimitRequest
-
     requests = LimitRequest.get_by_user(user.id)
 
     # Also get available tiers for the user
-    domain_tiers = current_app.config.get(
-        "DOMAIN_TIERS", [2_000_000, 5_000_000, 10_000_000]
-    )
-    current_limit = user.limits.get("max_domains", domain_tiers[0])
-    available_tiers = [t for t in domain_tiers if t > current_limit]
-    has_pending = LimitRequest.has_pending_request(user.id)
+    current_limit, available_tiers = _domain_tier_options(user)
+    # get_by_user returns every request, so no separate pending query is needed
+    has_pending = any(r.status == LimitRequest.STATUS_PENDING for r in requests)
 
     return jsonify(
         {
@@ -584,20 +664,11 @@ def get_limit_requests(user: User):
 
 
 @user_bp.route("/notifications", methods=["GET"])
-@login_required
+@login_required(projection=User.NOTIFICATIONS_PROJECTION)
 def get_notifications(user: User):
     """Get user's notifications."""
-    # Refresh user data
-    user = User.get_by_id(user.id)
-
-    # Get unread count
-    unread_count = len(user.get_unread_notifications())
-
-    return jsonify(
-        {
-            "notifications": user._serialize_notifications(),
-            "unread_count": unread_count,
-        }
+    return current_app.response_class(
+        user.get_notifications_json(), mimetype="application/json"
     )
 
 
@@ -620,8 +691,6 @@ def mark_notification_read(user: User, notification_id: str):
 @login_required
 def get_announcements(user: User):
     """Get active announcements excluding dismissed ones."""
-    from app.models.announcement import Announcement
-
     active = Announcement.get_active()
     dismissed = set(user.dismissed_announcements)
 
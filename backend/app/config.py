@@ -36,6 +36,12 @@ class Config:
     DATA_DIR = os.environ.get("DATA_DIR", "./data")
     USERS_DIR = os.path.join(DATA_DIR, "users")
     DEFAULT_DIR = os.path.join(DATA_DIR, "default")
+    # Read on every default list request
+    DEFAULT_OUTPUT_DIR = os.path.join(DEFAULT_DIR, "output")
+
+    # Internal nginx location mapped to DATA_DIR. When set, gzipped lists are
+    # handed to nginx with X-Accel-Redirect instead of streamed by the worker
+    XACCEL_REDIRECT_PREFIX = os.environ.get("XACCEL_REDIRECT_PREFIX", "")
 
     # Frontend
     FRONTEND_URL = os.environ.get("FRONTEND_URL", "http://localhost:5173")
@@ -1,25 +1,71 @@
 """
 Flask extensions initialization.
+
+Extensions are created on first access (PEP 562), so importing one of them
+doesn't pull in the dependencies of the others - models only need ``mongo``,
+and only the web app needs the limiter, CORS, and the scheduler.
 """
 
-from flask_pymongo import PyMongo
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
-from flask_cors import CORS
-from apscheduler.schedulers.background import BackgroundScheduler
+import threading
+
+__all__ = ["mongo", "limiter", "cors", "scheduler"]
+
+_instances = {}
+_lock = threading.Lock()
+
+
+def _create_mongo():
+    from flask_pymongo import PyMongo
+
+    # MongoDB
+    return PyMongo()
+
+
+def _create_limiter():
+    from flask_limiter import Limiter
+    from flask_limiter.util import get_remote_address
+
+    # Rate limiting
+    return Limiter(
+        key_func=get_remote_address,
+        default_limits=["100 per hour"],
+        storage_uri="memory://",
+    )
+
+
+def _create_cors():
+    from flask_cors import CORS
+
+    # CORS
+    return CORS()
+
+
+def _create_scheduler():
+    from apscheduler.schedulers.background import BackgroundScheduler
+
+    # Scheduler
+    return BackgroundScheduler(timezone="UTC")
+
+
+_FACTORIES = {
+    "mongo": _create_mongo,
+    "limiter": _create_limiter,
+    "cors": _create_cors,
+    "scheduler": _create_scheduler,
+}
+
 
-# MongoDB
-mongo = PyMongo()
+def __getattr__(name: str):
+    factory = _FACTORIES.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Rate limiting
-limiter = Limiter(
-    key_func=get_remote_address,
-    default_limits=["100 per hour"],
-    storage_uri="memory://",
-)
+    with _lock:
+        if name not in _instances:
+            # Cache on the module so later lookups bypass __getattr__
+            _instances[name] = globals()[name] = factory()
+    return _instances[name]
 
-# CORS
-cors = CORS()
 
-# Scheduler
-scheduler = BackgroundScheduler(timezone="UTC")
+def __dir__():
+    return sorted(list(globals()) + __all__)
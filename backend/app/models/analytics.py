@@ -2,18 +2,89 @@
 Analytics model for MongoDB.
 """
 
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
 from app.extensions import mongo
 
+# Server error code for a unique index violation
+DUPLICATE_KEY_ERROR = 11000
+
+# Aggregation stages applied after the $match for each kind of statistics
+_STATS_STAGES = [
+    {
+        "$group": {
+            "_id": None,
+            "total_requests": {"$sum": "$requests"},
+            "total_unique_ips": {"$sum": "$unique_ips"},
+            "total_bandwidth": {"$sum": "$bandwidth_bytes"},
+            "hosts_requests": {"$sum": "$formats.hosts"},
+            "plain_requests": {"$sum": "$formats.plain"},
+            "adblock_requests": {"$sum": "$formats.adblock"},
+        }
+    },
+]
+
+_DAILY_STAGES = [
+    {
+        "$group": {
+            "_id": "$date",
+            "requests": {"$sum": "$requests"},
+            "unique_ips": {"$sum": "$unique_ips"},
+            "bandwidth": {"$sum": "$bandwidth_bytes"},
+        }
+    },
+    {"$sort": {"_id": 1}},
+    # Same format as datetime.isoformat() for the midnight dates stored here
+    {
+        "$project": {
+            "_id": 0,
+            "date": {"$dateToString": {"format": "%Y-%m-%dT%H:%M:%S", "date": "$_id"}},
+            "requests": 1,
+            "unique_ips": 1,
+            "bandwidth": 1,
+        }
+    },
+]
+
+# Top 20 countries
+_GEO_STAGES = [
+    {"$project": {"countries": {"$objectToArray": "$geo.countries"}}},
+    {"$unwind": "$countries"},
+    {
+        "$group": {
+            "_id": "$countries.k",
+            "count": {"$sum": "$countries.v"},
+        }
+    },
+    {"$sort": {"count": -1}},
+    {"$limit": 20},
+]
+
+_BUNDLE_STAGES = {
+    "stats": _STATS_STAGES,
+    "daily": _DAILY_STAGES,
+    "geo": _GEO_STAGES,
+}
+
 
 class Analytics:
     """Analytics model for tracking list access statistics."""
 
     COLLECTION = "analytics"
 
+    # One document per IP hash seen for a list on a day, used to count
+    # unique IPs; expired once the day can no longer receive events
+    IPS_COLLECTION = "analytics_ips"
+    IPS_TTL_SECONDS = 2 * 86400
+
+    # counters document holding default list totals for completed days
+    TOTALS_ID = "analytics_default_totals"
+
     # List types
     TYPE_DEFAULT = "default"
     TYPE_USER = "user"
@@ -101,127 +172,230 @@ class Analytics:
         city: str = None,
         referrer: str = None,
         size_bytes: int = 0,
+        timestamp: datetime = None,
     ) -> None:
         """Record a list request."""
-        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        hour = datetime.utcnow().hour
-
-        # Build update operations
-        update = {
-            "$inc": {
-                "requests": 1,
-                f"formats.{format_type}": 1,
-                "bandwidth_bytes": size_bytes,
-                f"hourly_distribution.{hour}": 1,
-            },
-            "$setOnInsert": {
-                "list_type": list_type,
-                "list_name": list_name,
-                "username": username,
-                "date": today,
-                "unique_ips": 0,
-                "ip_hashes": [],
-                "top_referrers": [],
-            },
-        }
-
-        # Track unique IPs
-        if ip_hash:
-            update["$addToSet"] = {"ip_hashes": ip_hash}
-
-        # Track geo data
-        if country:
-            update["$inc"][f"geo.countries.{country}"] = 1
-        if city:
-            update["$inc"][f"geo.cities.{city}"] = 1
-
-        # Upsert the document
-        mongo.db[cls.COLLECTION].update_one(
-            {
-                "list_type": list_type,
-                "list_name": list_name,
-                "username": username,
-                "date": today,
-            },
-            update,
-            upsert=True,
-        )
-
-        # Update unique IP count (separate operation to count array length)
-        if ip_hash:
-            mongo.db[cls.COLLECTION].update_one(
+        cls.record_requests(
+            [
                 {
                     "list_type": list_type,
                     "list_name": list_name,
                     "username": username,
-                    "date": today,
-                },
-                [{"$set": {"unique_ips": {"$size": {"$ifNull": ["$ip_hashes", []]}}}}],
-            )
-
-        # Track referrers (update top 10)
-        if referrer:
-            cls._update_referrer(list_type, list_name, username, today, referrer)
+                    "format_type": format_type,
+                    "ip_hash": ip_hash,
+                    "country": country,
+                    "city": city,
+                    "referrer": referrer,
+                    "size_bytes": size_bytes,
+                    "timestamp": timestamp,
+                }
+            ]
+        )
 
     @classmethod
-    def _update_referrer(
-        cls,
-        list_type: str,
-        list_name: str,
-        username: str,
-        date: datetime,
-        referrer: str,
-    ) -> None:
-        """Update top referrers list."""
-        # Get current document
-        doc = mongo.db[cls.COLLECTION].find_one(
-            {
-                "list_type": list_type,
-                "list_name": list_name,
-                "username": username,
-                "date": date,
+    def record_requests(cls, events: List[Dict[str, Any]]) -> None:
+        """
+        Record a batch of list requests.
+
+        Events for the same list and day are merged into a single upsert, and
+        all upserts are sent in one bulk write. New IP hashes are stored after
+        it and added to unique_ips in a second one.
+
+        Args:
+            events: Dictionaries with the arguments of record_request
+        """
+        groups = {}
+        # A batch almost always falls within one day, so its start is only
+        # recomputed when an event lands outside [day, next_day)
+        day = next_day = None
+        for event in events:
+            timestamp = event.get("timestamp") or datetime.utcnow()
+            if day is None or not day <= timestamp < next_day:
+                day = timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+                next_day = day + timedelta(days=1)
+            key = (event["list_type"], event["list_name"], event.get("username"), day)
+
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = {
+                    "inc": Counter(),
+                    "ip_hashes": set(),
+                    "referrers": Counter(),
+                }
+
+            inc = group["inc"]
+            inc["requests"] += 1
+            inc[f"formats.{event.get('format_type') or 'hosts'}"] += 1
+            inc["bandwidth_bytes"] += event.get("size_bytes") or 0
+            inc[f"hourly_distribution.{timestamp.hour}"] += 1
+
+            # Track geo data
+            if event.get("country"):
+                inc[f"geo.countries.{event['country']}"] += 1
+            if event.get("city"):
+                inc[f"geo.cities.{event['city']}"] += 1
+
+            if event.get("ip_hash"):
+                group["ip_hashes"].add(event["ip_hash"])
+            if event.get("referrer"):
+                group["referrers"][event["referrer"]] += 1
+
+        operations = []
+        for key, group in groups.items():
+            list_type, list_name, username, day = key
+            doc_filter = cls._day_filter(key)
+            update = {
+                "$inc": dict(group["inc"]),
+                "$setOnInsert": {
+                    "list_type": list_type,
+                    "list_name": list_name,
+                    "username": username,
+                    "date": day,
+                    "unique_ips": 0,
+                    "top_referrers": [],
+                },
             }
-        )
+            operations.append(UpdateOne(doc_filter, update, upsert=True))
+
+            # Track referrers (update top 10)
+            if group["referrers"]:
+                operations.append(
+                    UpdateOne(doc_filter, cls._referrers_pipeline(group["referrers"]))
+                )
+
+        if operations:
+            # Ordered, so each referrer update runs after the upsert creating
+            # its document
+            mongo.db[cls.COLLECTION].bulk_write(operations, ordered=True)
+
+        # Only once the counters are written, so a failed write never leaves
+        # hashes marked as seen without their requests counted
+        cls._record_ips(groups)
+
+    @staticmethod
+    def _day_filter(key: Tuple) -> Dict[str, Any]:
+        """Build the document filter for a record_requests group key."""
+        list_type, list_name, username, day = key
+        return {
+            "list_type": list_type,
+            "list_name": list_name,
+            "username": username,
+            "date": day,
+        }
 
-        if not doc:
+    @classmethod
+    def _record_ips(cls, groups: Dict[Tuple, Dict[str, Any]]) -> None:
+        """
+        Store the IP hashes of each batch group and add the ones not seen
+        before to its unique_ips count.
+
+        Args:
+            groups: {(list_type, list_name, username, day): group} from
+                record_requests
+        """
+        docs = []
+        keys = []
+        for key, group in groups.items():
+            list_type, list_name, username, day = key
+            for ip_hash in group["ip_hashes"]:
+                docs.append(
+                    {
+                        "_id": {
+                            "list_type": list_type,
+                            "list_name": list_name,
+                            "username": username,
+                            "date": day,
+                            "ip_hash": ip_hash,
+                        },
+                        "date": day,
+                    }
+                )
+                keys.append(key)
+
+        if not docs:
             return
 
-        referrers = doc.get("top_referrers", [])
-
-        # Find existing referrer
-        found = False
-        for ref in referrers:
-            if ref.get("url") == referrer:
-                ref["count"] += 1
-                found = True
-                break
-
-        if not found:
-            referrers.append({"url": referrer, "count": 1})
+        # Hashes already stored for the day fail on the _id index and are
+        # not counted again; any other error is raised
+        seen = set()
+        try:
+            mongo.db[cls.IPS_COLLECTION].insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if e.details.get("writeConcernErrors") or any(
+                error["code"] != DUPLICATE_KEY_ERROR for error in errors
+            ):
+                raise
+            seen = {error["index"] for error in errors}
+
+        new_ips = Counter(key for i, key in enumerate(keys) if i not in seen)
+        if not new_ips:
+            return
 
-        # Sort and keep top 10
-        referrers.sort(key=lambda x: x["count"], reverse=True)
-        referrers = referrers[:10]
+        operations = [
+            UpdateOne(cls._day_filter(key), {"$inc": {"unique_ips": count}})
+            for key, count in new_ips.items()
+        ]
+        try:
+            mongo.db[cls.COLLECTION].bulk_write(operations, ordered=False)
+        except Exception:
+            # Forget the new hashes, so they count once their IPs are seen again
+            new_ids = [doc["_id"] for i, doc in enumerate(docs) if i not in seen]
+            mongo.db[cls.IPS_COLLECTION].delete_many({"_id": {"$in": new_ids}})
+            raise
+
+    @staticmethod
+    def _referrers_pipeline(counts: Dict[str, int]) -> List[Dict[str, Any]]:
+        """
+        Build an update pipeline adding referrer hit counts and keeping the top 10.
+
+        The merge runs on the server, so concurrent writers never overwrite
+        each other's counts.
+        """
+        pipeline = [
+            {"$set": {"top_referrers": {"$ifNull": ["$top_referrers", []]}}},
+        ]
+        for url, count in counts.items():
+            # Referrers are client-supplied, so never let them parse as paths
+            url = {"$literal": url}
+            bumped = {"url": "$$ref.url", "count": {"$add": ["$$ref.count", count]}}
+            incremented = {
+                "$map": {
+                    "input": "$top_referrers",
+                    "as": "ref",
+                    "in": {"$cond": [{"$eq": ["$$ref.url", url]}, bumped, "$$ref"]},
+                }
+            }
+            appended = {
+                "$concatArrays": ["$top_referrers", [{"url": url, "count": count}]]
+            }
+            pipeline.append(
+                {
+                    "$set": {
+                        "top_referrers": {
+                            "$cond": [
+                                {"$in": [url, "$top_referrers.url"]},
+                                incremented,
+                                appended,
+                            ]
+                        }
+                    }
+                }
+            )
 
-        mongo.db[cls.COLLECTION].update_one(
-            {
-                "list_type": list_type,
-                "list_name": list_name,
-                "username": username,
-                "date": date,
-            },
-            {"$set": {"top_referrers": referrers}},
-        )
+        top = {"$sortArray": {"input": "$top_referrers", "sortBy": {"count": -1}}}
+        pipeline.append({"$set": {"top_referrers": {"$slice": [top, 10]}}})
+        return pipeline
 
     @classmethod
-    def get_stats(
+    def _match(
         cls,
         list_type: str = None,
         list_name: str = None,
         username: str = None,
         days: int = 30,
     ) -> Dict[str, Any]:
-        """Get aggregated statistics for a time period."""
+        """Build the $match filter for a time period and optional list scope."""
         cutoff = datetime.utcnow() - timedelta(days=days)
 
         match = {"date": {"$gte": cutoff}}
@@ -231,24 +405,11 @@ class Analytics:
             match["list_name"] = list_name
         if username:
             match["username"] = username
+        return match
 
-        pipeline = [
-            {"$match": match},
-            {
-                "$group": {
-                    "_id": None,
-                    "total_requests": {"$sum": "$requests"},
-                    "total_unique_ips": {"$sum": "$unique_ips"},
-                    "total_bandwidth": {"$sum": "$bandwidth_bytes"},
-                    "hosts_requests": {"$sum": "$formats.hosts"},
-                    "plain_requests": {"$sum": "$formats.plain"},
-                    "adblock_requests": {"$sum": "$formats.adblock"},
-                }
-            },
-        ]
-
-        result = list(mongo.db[cls.COLLECTION].aggregate(pipeline))
-
+    @staticmethod
+    def _format_stats(result: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Shape the output of _STATS_STAGES."""
         if not result:
             return {
                 "total_requests": 0,
@@ -269,6 +430,31 @@ class Analytics:
             },
         }
 
+    @staticmethod
+    def _format_daily(result: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Shape the output of _DAILY_STAGES (already formatted by the server)."""
+        return result
+
+    @staticmethod
+    def _format_geo(result: List[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+        """Shape the output of _GEO_STAGES."""
+        return {"countries": {item["_id"]: item["count"] for item in result}}
+
+    @classmethod
+    def get_stats(
+        cls,
+        list_type: str = None,
+        list_name: str = None,
+        username: str = None,
+        days: int = 30,
+    ) -> Dict[str, Any]:
+        """Get aggregated statistics for a time period."""
+        pipeline = [
+            {"$match": cls._match(list_type, list_name, username, days)},
+            *_STATS_STAGES,
+        ]
+        return cls._format_stats(list(mongo.db[cls.COLLECTION].aggregate(pipeline)))
+
     @classmethod
     def get_daily_stats(
         cls,
@@ -278,40 +464,11 @@ class Analytics:
         days: int = 30,
     ) -> List[Dict[str, Any]]:
         """Get daily statistics for charting."""
-        cutoff = datetime.utcnow() - timedelta(days=days)
-
-        match = {"date": {"$gte": cutoff}}
-        if list_type:
-            match["list_type"] = list_type
-        if list_name:
-            match["list_name"] = list_name
-        if username:
-            match["username"] = username
-
         pipeline = [
-            {"$match": match},
-            {
-                "$group": {
-                    "_id": "$date",
-                    "requests": {"$sum": "$requests"},
-                    "unique_ips": {"$sum": "$unique_ips"},
-                    "bandwidth": {"$sum": "$bandwidth_bytes"},
-                }
-            },
-            {"$sort": {"_id": 1}},
-        ]
-
-        result = list(mongo.db[cls.COLLECTION].aggregate(pipeline))
-
-        return [
-            {
-                "date": item["_id"].isoformat(),
-                "requests": item["requests"],
-                "unique_ips": item["unique_ips"],
-                "bandwidth": item["bandwidth"],
-            }
-            for item in result
+            {"$match": cls._match(list_type, list_name, username, days)},
+            *_DAILY_STAGES,
         ]
+        return cls._format_daily(list(mongo.db[cls.COLLECTION].aggregate(pipeline)))
 
     @classmethod
     def get_geo_stats(
@@ -322,43 +479,90 @@ class Analytics:
         days: int = 30,
     ) -> Dict[str, Dict[str, int]]:
         """Get geographic distribution statistics."""
-        cutoff = datetime.utcnow() - timedelta(days=days)
+        pipeline = [
+            {"$match": cls._match(list_type, list_name, username, days)},
+            *_GEO_STAGES,
+        ]
+        return cls._format_geo(list(mongo.db[cls.COLLECTION].aggregate(pipeline)))
 
-        match = {"date": {"$gte": cutoff}}
-        if list_type:
-            match["list_type"] = list_type
-        if list_name:
-            match["list_name"] = list_name
-        if username:
-            match["username"] = username
+    @classmethod
+    def get_bundle(
+        cls,
+        facets: Dict[str, Tuple[str, str]],
+        list_name: str = None,
+        username: str = None,
+        days: int = 30,
+    ) -> Dict[str, Any]:
+        """
+        Get several statistics slices with a single aggregation.
+
+        Args:
+            facets: Maps each result key to a (kind, list_type) pair, where
+                kind is "stats", "daily" or "geo" - the same data returned
+                by get_stats, get_daily_stats and get_geo_stats
+            list_name: Optional list name applied to every slice
+            username: Optional username applied to every slice
+            days: Time period in days
+
+        Returns:
+            Dictionary with one entry per facet key
+        """
+        list_types = sorted({list_type for _, list_type in facets.values()})
+        match = cls._match(None, list_name, username, days)
+        match["list_type"] = (
+            list_types[0] if len(list_types) == 1 else {"$in": list_types}
+        )
 
-        # Aggregate country data
         pipeline = [
             {"$match": match},
-            {"$project": {"countries": {"$objectToArray": "$geo.countries"}}},
-            {"$unwind": "$countries"},
             {
-                "$group": {
-                    "_id": "$countries.k",
-                    "count": {"$sum": "$countries.v"},
+                "$facet": {
+                    key: [{"$match": {"list_type": list_type}}, *_BUNDLE_STAGES[kind]]
+                    for key, (kind, list_type) in facets.items()
                 }
             },
-            {"$sort": {"count": -1}},
-            {"$limit": 20},
         ]
 
-        countries = {
-            item["_id"]: item["count"]
-            for item in mongo.db[cls.COLLECTION].aggregate(pipeline)
+        result = next(mongo.db[cls.COLLECTION].aggregate(pipeline), {})
+        return {
+            key: getattr(cls, f"_format_{kind}")(result.get(key, []))
+            for key, (kind, _) in facets.items()
         }
 
-        return {"countries": countries}
+    @classmethod
+    def ensure_indexes(cls):
+        """Create indexes for the collection."""
+        collection = mongo.db[cls.COLLECTION]
+        # Period queries for default lists and the admin overview
+        collection.create_index([("list_type", 1), ("date", -1)])
+        # Period queries for a user's lists
+        collection.create_index([("username", 1), ("date", -1)])
+        mongo.db[cls.IPS_COLLECTION].create_index(
+            "date", expireAfterSeconds=cls.IPS_TTL_SECONDS
+        )
+        # One document per list and day, matching the record_requests upsert
+        # filter; last since it can fail on pre-existing duplicates
+        collection.create_index(
+            [("list_type", 1), ("list_name", 1), ("username", 1), ("date", -1)],
+            unique=True,
+        )
 
     @classmethod
-    def get_default_list_totals(cls) -> Dict[str, Any]:
-        """Get total statistics for all default lists."""
+    def _sum_default_totals(
+        cls, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Dict[str, int]:
+        """Sum default list requests and bandwidth for days in [start, end)."""
+        match = {"list_type": cls.TYPE_DEFAULT}
+        date_range = {}
+        if start:
+            date_range["$gte"] = start
+        if end:
+            date_range["$lt"] = end
+        if date_range:
+            match["date"] = date_range
+
         pipeline = [
-            {"$match": {"list_type": cls.TYPE_DEFAULT}},
+            {"$match": match},
             {
                 "$group": {
                     "_id": None,
@@ -367,13 +571,73 @@ class Analytics:
                 }
             },
         ]
+        result = next(mongo.db[cls.COLLECTION].aggregate(pipeline), {})
+        return {
+            "total_requests": result.get("total_requests", 0),
+            "total_bandwidth": result.get("total_bandwidth", 0),
+        }
 
-        result = list(mongo.db[cls.COLLECTION].aggregate(pipeline))
+    @classmethod
+    def get_default_list_totals(cls) -> Dict[str, Any]:
+        """
+        Get total statistics for all default lists.
 
-        if not result:
-            return {"total_requests": 0, "total_bandwidth": 0}
+        The totals cover the daily documents still stored, which the monthly
+        cleanup limits to the last 90 days (see delete_before).
 
+        Days before yesterday no longer receive events, so their sums are
+        rolled up into a counters document once; each call only aggregates
+        the days after it.
+        """
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        settled = today - timedelta(days=1)
+
+        rollup = mongo.db.counters.find_one({"_id": cls.TOTALS_ID}) or {}
+        through = rollup.get("through")
+        if through is None or through < settled:
+            history = cls._sum_default_totals(through, settled)
+            try:
+                # Matching on through means only one caller adds each range
+                mongo.db.counters.update_one(
+                    {"_id": cls.TOTALS_ID, "through": through},
+                    {"$inc": history, "$set": {"through": settled}},
+                    upsert=True,
+                )
+            except DuplicateKeyError:
+                pass  # Another caller rolled it up first
+            rollup = mongo.db.counters.find_one({"_id": cls.TOTALS_ID})
+
+        recent = cls._sum_default_totals(rollup["through"])
         return {
-            "total_requests": result[0].get("total_requests", 0),
-            "total_bandwidth": result[0].get("total_bandwidth", 0),
+            "total_requests": rollup.get("total_requests", 0)
+            + recent["total_requests"],
+            "total_bandwidth": rollup.get("total_bandwidth", 0)
+            + recent["total_bandwidth"],
         }
+
+    @classmethod
+    def delete_before(cls, cutoff: datetime) -> int:
+        """
+        Delete the daily documents dated before cutoff.
+
+        Deleted default list days already in the totals rollup are subtracted
+        from it, so get_default_list_totals keeps matching the stored days.
+
+        Returns:
+            Number of documents deleted
+        """
+        # The rollup only moves forward, so days before the current "through"
+        # stay in it while they are deleted
+        rollup = mongo.db.counters.find_one({"_id": cls.TOTALS_ID})
+        removed = {}
+        if rollup:
+            removed = cls._sum_default_totals(end=min(cutoff, rollup["through"]))
+
+        result = mongo.db[cls.COLLECTION].delete_many({"date": {"$lt": cutoff}})
+
+        if any(removed.values()):
+            mongo.db.counters.update_one(
+                {"_id": cls.TOTALS_ID},
+                {"$inc": {field: -value for field, value in removed.items()}},
+            )
+        return result.deleted_count
@@ -58,16 +58,21 @@ class Announcement:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for API responses."""
+        # Called for every active announcement: read the document directly
+        data = self._data
+        expires_at = data.get("expires_at")
+        created_at = data.get("created_at")
+        updated_at = data.get("updated_at")
         return {
-            "id": self.id,
-            "title": self.title,
-            "message": self.message,
-            "type": self.type,
-            "is_active": self.is_active,
-            "expires_at": self.expires_at.isoformat() if self.expires_at else None,
-            "created_by": self.created_by,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
+            "id": str(self._id) if self._id else None,
+            "title": data.get("title", ""),
+            "message": data.get("message", ""),
+            "type": data.get("type", "info"),
+            "is_active": data.get("is_active", True),
+            "expires_at": expires_at.isoformat() if expires_at else None,
+            "created_by": data.get("created_by", ""),
+            "created_at": created_at.isoformat() if created_at else None,
+            "updated_at": updated_at.isoformat() if updated_at else None,
         }
 
     def update(self, **kwargs) -> None:
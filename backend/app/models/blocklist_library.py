@@ -6,9 +6,13 @@ Admin-curated library of blocklist sources for the visual config editor.
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from bson import ObjectId
+from pymongo.errors import BulkWriteError
 
 from app.extensions import mongo
 
+# Server error code for a unique index violation
+DUPLICATE_KEY_ERROR = 11000
+
 
 class BlocklistLibrary:
     """Model for blocklist library entries."""
@@ -82,18 +86,22 @@ class BlocklistLibrary:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for API responses."""
+        # Called for every library entry: read the document directly
+        data = self._data
+        created_at = data.get("created_at")
+        updated_at = data.get("updated_at")
         return {
-            "id": self.id,
-            "url": self.url,
-            "name": self.name,
-            "category": self.category,
-            "description": self.description,
-            "recommended": self.recommended,
-            "aggressiveness": self.aggressiveness,
-            "domain_count": self.domain_count,
-            "added_by": self.added_by,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "id": str(self._id) if self._id else None,
+            "url": data.get("url", ""),
+            "name": data.get("name", ""),
+            "category": data.get("category", ""),
+            "description": data.get("description", ""),
+            "recommended": data.get("recommended", False),
+            "aggressiveness": data.get("aggressiveness", 3),
+            "domain_count": data.get("domain_count", 0),
+            "added_by": data.get("added_by", ""),
+            "created_at": created_at.isoformat() if created_at else None,
+            "updated_at": updated_at.isoformat() if updated_at else None,
         }
 
     @classmethod
@@ -133,13 +141,17 @@ class BlocklistLibrary:
     @classmethod
     def get_grouped_by_category(cls) -> Dict[str, List["BlocklistLibrary"]]:
         """Get all entries grouped by category."""
-        entries = cls.get_all()
-        grouped = {}
-        for entry in entries:
-            if entry.category not in grouped:
-                grouped[entry.category] = []
-            grouped[entry.category].append(entry)
-        return grouped
+        # Sorted on the (category, recommended, name) index, so each group
+        # keeps the get_all order
+        pipeline = [
+            {"$sort": {"category": 1, "recommended": -1, "name": 1}},
+            {"$group": {"_id": "$category", "entries": {"$push": "$$ROOT"}}},
+            {"$sort": {"_id": 1}},
+        ]
+        return {
+            group["_id"]: [cls(data) for data in group["entries"]]
+            for group in cls.get_collection().aggregate(pipeline)
+        }
 
     @classmethod
     def create(
@@ -153,7 +165,11 @@ class BlocklistLibrary:
         domain_count: int = 0,
         added_by: str = "",
     ) -> "BlocklistLibrary":
-        """Create a new library entry."""
+        """
+        Create a new library entry.
+
+        Raises DuplicateKeyError if the URL is already in the library.
+        """
         now = datetime.utcnow()
         data = {
             "url": url,
@@ -173,6 +189,51 @@ class BlocklistLibrary:
         data["_id"] = result.inserted_id
         return cls(data)
 
+    @classmethod
+    def create_many(
+        cls, entries: List[Dict[str, Any]], added_by: str = ""
+    ) -> List["BlocklistLibrary"]:
+        """
+        Create library entries in one unordered bulk insert.
+
+        Entries whose URL is already in the library are skipped; the created
+        entries are returned.
+        """
+        now = datetime.utcnow()
+        docs = [
+            {
+                "url": entry["url"],
+                "name": entry["name"],
+                "category": entry["category"],
+                "description": entry.get("description", ""),
+                "recommended": entry.get("recommended", False),
+                "aggressiveness": max(
+                    cls.MIN_AGGRESSIVENESS,
+                    min(cls.MAX_AGGRESSIVENESS, entry.get("aggressiveness", 3)),
+                ),
+                "domain_count": entry.get("domain_count", 0),
+                "added_by": entry.get("added_by", added_by),
+                "created_at": now,
+                "updated_at": now,
+            }
+            for entry in entries
+        ]
+        if not docs:
+            return []
+
+        # Unordered, so one duplicate URL doesn't stop the rest of the batch
+        skipped = set()
+        try:
+            cls.get_collection().insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if e.details.get("writeConcernErrors") or any(
+                error["code"] != DUPLICATE_KEY_ERROR for error in errors
+            ):
+                raise
+            skipped = {error["index"] for error in errors}
+        return [cls(doc) for i, doc in enumerate(docs) if i not in skipped]
+
     def update(
         self,
         url: Optional[str] = None,
@@ -183,7 +244,11 @@ class BlocklistLibrary:
         aggressiveness: Optional[int] = None,
         domain_count: Optional[int] = None,
     ) -> bool:
-        """Update library entry."""
+        """
+        Update library entry.
+
+        Raises DuplicateKeyError if the URL belongs to another entry.
+        """
         update_data = {"updated_at": datetime.utcnow()}
 
         if url is not None:
@@ -206,6 +271,7 @@ class BlocklistLibrary:
         result = self.get_collection().update_one(
             {"_id": self._id}, {"$set": update_data}
         )
+        self._data.update(update_data)
         return result.modified_count > 0
 
     def delete(self) -> bool:
@@ -222,17 +288,6 @@ class BlocklistLibrary:
         except Exception:
             return False
 
-    @classmethod
-    def url_exists(cls, url: str, exclude_id: Optional[str] = None) -> bool:
-        """Check if URL already exists in library."""
-        query = {"url": url}
-        if exclude_id:
-            try:
-                query["_id"] = {"$ne": ObjectId(exclude_id)}
-            except Exception:
-                pass
-        return cls.get_collection().count_documents(query) > 0
-
     @classmethod
     def ensure_indexes(cls):
         """Create indexes for the collection."""
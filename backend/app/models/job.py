@@ -4,12 +4,23 @@ Job model for MongoDB.
 
 import uuid
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 from bson import ObjectId
 from pymongo import ReturnDocument
 
 from app.extensions import mongo
 
+# (date, midnight) for the current UTC day, reused until the date rolls over
+_today_start_cache = [None, None]
+
+
+def _today_start() -> datetime:
+    """Get midnight UTC of the current day."""
+    today = datetime.utcnow().date()
+    if _today_start_cache[0] != today:
+        _today_start_cache[:] = [today, datetime(today.year, today.month, today.day)]
+    return _today_start_cache[1]
+
 
 class Job:
     """Job model representing a blocklist processing job."""
@@ -32,6 +43,22 @@ class Job:
     PRIORITY_HIGH = 1  # Default/admin jobs
     PRIORITY_NORMAL = 2  # User jobs
 
+    # Fields read by serialize
+    SERIALIZE_PROJECTION = {
+        "job_id": 1,
+        "user_id": 1,
+        "username": 1,
+        "type": 1,
+        "status": 1,
+        "priority": 1,
+        "progress": 1,
+        "result": 1,
+        "started_at": 1,
+        "completed_at": 1,
+        "created_at": 1,
+        "worker_id": 1,
+    }
+
     def __init__(self, data: Dict[str, Any]):
         self._data = data
         self._id = data.get("_id")
@@ -204,22 +231,34 @@ class Job:
     # Serialization
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for API responses."""
+        return self.serialize(self._data)
+
+    @classmethod
+    def serialize(cls, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a raw job document to the API dictionary.
+
+        Works on cursor documents directly, so list endpoints don't need to
+        wrap every row in a Job first.
+        """
+        _id = data.get("_id")
+        user_id = data.get("user_id")
+        started_at = data.get("started_at")
+        completed_at = data.get("completed_at")
+        created_at = data.get("created_at") or datetime.utcnow()
         return {
-            "id": self.id,
-            "job_id": self.job_id,
-            "user_id": str(self.user_id) if self.user_id else None,
-            "username": self.username,
-            "type": self.job_type,
-            "status": self.status,
-            "priority": self.priority,
-            "progress": self.progress,
-            "result": self.result,
-            "started_at": self.started_at.isoformat() if self.started_at else None,
-            "completed_at": (
-                self.completed_at.isoformat() if self.completed_at else None
-            ),
-            "created_at": self.created_at.isoformat(),
-            "worker_id": self.worker_id,
+            "id": str(_id) if _id else None,
+            "job_id": data.get("job_id"),
+            "user_id": str(user_id) if user_id else None,
+            "username": data.get("username"),
+            "type": data.get("type", cls.TYPE_MANUAL),
+            "status": data.get("status", cls.STATUS_QUEUED),
+            "priority": data.get("priority", cls.PRIORITY_NORMAL),
+            "progress": data.get("progress", {}),
+            "result": data.get("result"),
+            "started_at": started_at.isoformat() if started_at else None,
+            "completed_at": completed_at.isoformat() if completed_at else None,
+            "created_at": created_at.isoformat(),
+            "worker_id": data.get("worker_id"),
         }
 
     def get_progress_snapshot(self) -> Dict[str, Any]:
@@ -354,6 +393,21 @@ class Job:
         cursor = mongo.db[cls.COLLECTION].find().sort("created_at", -1).limit(limit)
         return [cls(data) for data in cursor]
 
+    @classmethod
+    def iter_recent(cls, limit: int = 50) -> Iterator["Job"]:
+        """Iterate recent jobs lazily from the cursor."""
+        return (cls(data) for data in cls.iter_recent_raw(limit))
+
+    @classmethod
+    def iter_recent_raw(cls, limit: int = 50) -> Iterator[Dict[str, Any]]:
+        """Iterate recent job documents, limited to the fields serialize reads."""
+        return (
+            mongo.db[cls.COLLECTION]
+            .find({}, cls.SERIALIZE_PROJECTION)
+            .sort("created_at", -1)
+            .limit(limit)
+        )
+
     @classmethod
     def get_queued(cls) -> List["Job"]:
         """Get queued jobs."""
@@ -374,8 +428,37 @@ class Job:
     @classmethod
     def count_today(cls) -> int:
         """Count jobs created today."""
-        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        return mongo.db[cls.COLLECTION].count_documents({"created_at": {"$gte": today}})
+        return mongo.db[cls.COLLECTION].count_documents(
+            {"created_at": {"$gte": _today_start()}}
+        )
+
+    @classmethod
+    def aggregate_stats(cls, today_start: datetime = None) -> Dict[str, int]:
+        """Count jobs created today, processing and queued in a single round-trip."""
+        today = today_start or _today_start()
+        pipeline = [
+            {
+                "$facet": {
+                    "today": [
+                        {"$match": {"created_at": {"$gte": today}}},
+                        {"$count": "n"},
+                    ],
+                    "processing": [
+                        {"$match": {"status": cls.STATUS_PROCESSING}},
+                        {"$count": "n"},
+                    ],
+                    "queued": [
+                        {"$match": {"status": cls.STATUS_QUEUED}},
+                        {"$count": "n"},
+                    ],
+                }
+            }
+        ]
+        result = next(mongo.db[cls.COLLECTION].aggregate(pipeline), {})
+        return {
+            facet: (result.get(facet) or [{"n": 0}])[0]["n"]
+            for facet in ("today", "processing", "queued")
+        }
 
     @classmethod
     def has_unread_failures(cls, user_id: ObjectId) -> bool:
@@ -391,6 +474,44 @@ class Job:
             > 0
         )
 
+    @classmethod
+    def get_history_with_unread(
+        cls, user_id: ObjectId, limit: int = 20
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Get a user's recent job documents and whether any failure is unread.
+
+        Both come from one $facet aggregation over the user's jobs. Job
+        documents are limited to the fields serialize reads.
+
+        Returns:
+            (job documents, newest first; has unread failures)
+        """
+        pipeline = [
+            {"$match": {"user_id": user_id}},
+            {
+                "$facet": {
+                    "jobs": [
+                        {"$sort": {"created_at": -1}},
+                        {"$limit": limit},
+                        {"$project": cls.SERIALIZE_PROJECTION},
+                    ],
+                    "unread_failures": [
+                        {
+                            "$match": {
+                                "status": cls.STATUS_FAILED,
+                                "read": {"$ne": True},
+                            }
+                        },
+                        {"$limit": 1},
+                        {"$project": {"_id": 1}},
+                    ],
+                }
+            },
+        ]
+        result = next(mongo.db[cls.COLLECTION].aggregate(pipeline), {})
+        return result.get("jobs", []), bool(result.get("unread_failures"))
+
     @classmethod
     def mark_failures_read(cls, user_id: ObjectId) -> None:
         """Mark all user's failed jobs as read."""
@@ -660,3 +781,67 @@ class Job:
         remaining = cooldown_seconds - elapsed
 
         return max(0, int(remaining))
+
+    @classmethod
+    def get_build_gate(
+        cls, user_id: ObjectId, cooldown_minutes: int = 5
+    ) -> Tuple[bool, int]:
+        """
+        Get what decides whether a user may start a manual build.
+
+        Combines has_active_job_for_user and get_cooldown_remaining into one
+        $facet aggregation over the user's jobs.
+
+        Returns:
+            (has an active job, remaining cooldown in seconds)
+        """
+        pipeline = [
+            {"$match": {"user_id": user_id}},
+            {
+                "$facet": {
+                    "active": [
+                        {
+                            "$match": {
+                                "status": {
+                                    "$in": [cls.STATUS_QUEUED, cls.STATUS_PROCESSING]
+                                }
+                            }
+                        },
+                        {"$limit": 1},
+                        {"$project": {"_id": 1}},
+                    ],
+                    "last_manual": [
+                        {
+                            "$match": {
+                                "status": cls.STATUS_COMPLETED,
+                                "type": cls.TYPE_MANUAL,
+                            }
+                        },
+                        {"$sort": {"completed_at": -1}},
+                        {"$limit": 1},
+                        {"$project": {"_id": 0, "completed_at": 1}},
+                    ],
+                }
+            },
+        ]
+        result = next(mongo.db[cls.COLLECTION].aggregate(pipeline), {})
+
+        has_active = bool(result.get("active"))
+        cooldown_remaining = 0
+        last_manual = result.get("last_manual")
+        if last_manual and last_manual[0].get("completed_at"):
+            elapsed = (
+                datetime.utcnow() - last_manual[0]["completed_at"]
+            ).total_seconds()
+            cooldown_remaining = max(0, int(cooldown_minutes * 60 - elapsed))
+        return has_active, cooldown_remaining
+
+    @classmethod
+    def ensure_indexes(cls):
+        """Create indexes for the collection."""
+        collection = mongo.db[cls.COLLECTION]
+        # Per-day stats read only these two fields, so this index covers them
+        collection.create_index([("created_at", 1), ("status", 1)])
+        collection.create_index([("status", 1), ("created_at", -1)])
+        # Per-user job history and unread failure checks
+        collection.create_index([("user_id", 1), ("created_at", -1)])
@@ -4,7 +4,7 @@ Handles user requests for higher domain limits.
 """
 
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from bson import ObjectId
 
 from app.extensions import mongo
@@ -119,18 +119,15 @@ class LimitRequest:
         final_limit = approved_limit or self.requested_tier
 
         # Update request status
-        mongo.db[self.COLLECTION].update_one(
-            {"_id": self._id},
-            {
-                "$set": {
-                    "status": self.STATUS_APPROVED,
-                    "approved_limit": final_limit,
-                    "admin_response": response,
-                    "reviewed_by": admin_username,
-                    "reviewed_at": datetime.utcnow(),
-                }
-            },
-        )
+        update = {
+            "status": self.STATUS_APPROVED,
+            "approved_limit": final_limit,
+            "admin_response": response,
+            "reviewed_by": admin_username,
+            "reviewed_at": datetime.utcnow(),
+        }
+        mongo.db[self.COLLECTION].update_one({"_id": self._id}, {"$set": update})
+        self._data.update(update)
 
         # Update user's limit
         user = User.get_by_id(self.user_id)
@@ -152,17 +149,14 @@ class LimitRequest:
         from app.models.user import User
 
         # Update request status
-        mongo.db[self.COLLECTION].update_one(
-            {"_id": self._id},
-            {
-                "$set": {
-                    "status": self.STATUS_DENIED,
-                    "admin_response": response,
-                    "reviewed_by": admin_username,
-                    "reviewed_at": datetime.utcnow(),
-                }
-            },
-        )
+        update = {
+            "status": self.STATUS_DENIED,
+            "admin_response": response,
+            "reviewed_by": admin_username,
+            "reviewed_at": datetime.utcnow(),
+        }
+        mongo.db[self.COLLECTION].update_one({"_id": self._id}, {"$set": update})
+        self._data.update(update)
 
         # Add notification to user
         user = User.get_by_id(self.user_id)
@@ -239,6 +233,32 @@ class LimitRequest:
         )
         return [cls(data) for data in cursor]
 
+    @classmethod
+    def get_dashboard(
+        cls, approved_limit: int = 20, denied_limit: int = 20
+    ) -> Tuple[List["LimitRequest"], int]:
+        """
+        Get all pending requests followed by recent approved/denied ones,
+        plus the pending count.
+
+        Each status is its own query on the (status, created_at) index, so
+        only the returned documents are read, never the whole history.
+        """
+        collection = mongo.db[cls.COLLECTION]
+
+        def recent(status: str, limit: int = 0) -> List[Dict[str, Any]]:
+            cursor = collection.find({"status": status}).sort("created_at", -1)
+            return list(cursor.limit(limit))
+
+        pending = recent(cls.STATUS_PENDING)
+        requests = [
+            cls(data)
+            for data in pending
+            + recent(cls.STATUS_APPROVED, approved_limit)
+            + recent(cls.STATUS_DENIED, denied_limit)
+        ]
+        return requests, len(pending)
+
     @classmethod
     def get_by_user(cls, user_id: str) -> List["LimitRequest"]:
         """Get all requests for a user."""
@@ -267,3 +287,11 @@ class LimitRequest:
     def count_pending(cls) -> int:
         """Count pending requests."""
         return mongo.db[cls.COLLECTION].count_documents({"status": cls.STATUS_PENDING})
+
+    @classmethod
+    def ensure_indexes(cls):
+        """Create indexes for the collection."""
+        collection = mongo.db[cls.COLLECTION]
+        collection.create_index([("status", 1), ("created_at", -1)])
+        collection.create_index([("created_at", -1)])
+        collection.create_index([("user_id", 1), ("created_at", -1)])
@@ -5,17 +5,21 @@ Stores default blocklist configuration and whitelist in MongoDB
 instead of filesystem.
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional
 
 from app.extensions import mongo
 
+# Last default config document read: (updated_at, doc)
+_default_config_cache = None
+
 
 class SystemConfig:
     """System configuration stored in MongoDB."""
 
     COLLECTION = "system_config"
     DOC_ID = "default_config"
+    DISK_USAGE_ID = "disk_usage"
 
     @classmethod
     def get_default_blocklists(cls) -> Optional[str]:
@@ -29,6 +33,34 @@ class SystemConfig:
         doc = mongo.db[cls.COLLECTION].find_one({"_id": cls.DOC_ID})
         return doc.get("whitelist") if doc else None
 
+    @classmethod
+    def get_default_config_updated_at(cls) -> Optional[datetime]:
+        """Get when the default config was last updated, without loading it."""
+        doc = mongo.db[cls.COLLECTION].find_one(
+            {"_id": cls.DOC_ID}, {"updated_at": 1, "_id": 0}
+        )
+        return doc.get("updated_at") if doc else None
+
+    @classmethod
+    def get_default_config_doc(cls) -> Optional[dict]:
+        """
+        Get the default config document, or None if there isn't one.
+
+        The document is reloaded only when its updated_at changes, so repeat
+        reads fetch one small field instead of both config files.
+        """
+        global _default_config_cache
+
+        updated_at = cls.get_default_config_updated_at()
+        if updated_at is not None and _default_config_cache is not None:
+            if _default_config_cache[0] == updated_at:
+                return _default_config_cache[1]
+
+        doc = mongo.db[cls.COLLECTION].find_one({"_id": cls.DOC_ID})
+        if doc and doc.get("updated_at") is not None:
+            _default_config_cache = (doc["updated_at"], doc)
+        return doc
+
     @classmethod
     def get_default_config(cls) -> dict:
         """Get both blocklists and whitelist configs."""
@@ -100,3 +132,22 @@ class SystemConfig:
             update,
             upsert=True,
         )
+
+    @classmethod
+    def get_disk_usage(cls, max_age: float) -> Optional[int]:
+        """Get the recorded data directory size if measured within max_age seconds."""
+        doc = mongo.db[cls.COLLECTION].find_one({"_id": cls.DISK_USAGE_ID})
+        if not doc or not doc.get("measured_at"):
+            return None
+        if datetime.utcnow() - doc["measured_at"] > timedelta(seconds=max_age):
+            return None
+        return doc.get("total_bytes")
+
+    @classmethod
+    def set_disk_usage(cls, total_bytes: int) -> None:
+        """Record the current data directory size."""
+        mongo.db[cls.COLLECTION].update_one(
+            {"_id": cls.DISK_USAGE_ID},
+            {"$set": {"total_bytes": total_bytes, "measured_at": datetime.utcnow()}},
+            upsert=True,
+        )
@@ -3,19 +3,71 @@ User model for MongoDB.
 """
 
 import os
+import time
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, Union
 from bson import ObjectId
 from flask import current_app
+from pymongo import ReturnDocument
 
 from app.extensions import mongo
 
+# Recently fetched user documents for get_by_id_cached: {user_id: (expires_at, data)}
+_recent_users: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_RECENT_USERS_MAX = 1024
+
+# Encoded notification responses: {user_id: (notifications_version, body)}
+_notification_bodies: Dict[str, Tuple[int, str]] = {}
+_NOTIFICATION_BODIES_MAX = 1024
+
 
 class User:
     """User model representing a GitHub-authenticated user."""
 
     COLLECTION = "users"
 
+    # Fields read by to_admin_list_dict
+    ADMIN_LIST_PROJECTION = {
+        "username": 1,
+        "name": 1,
+        "email": 1,
+        "avatar_url": 1,
+        "github_id": 1,
+        "is_admin": 1,
+        "is_enabled": 1,
+        "banned_until": 1,
+        "stats": 1,
+        "created_at": 1,
+    }
+
+    # Fields read by the admin IP log endpoint
+    IP_LOG_PROJECTION = {"username": 1, "ip_log": 1}
+
+    # Fields read by admin_required and the admin endpoints it wraps
+    ADMIN_AUTH_PROJECTION = {
+        "username": 1,
+        "is_admin": 1,
+        "is_enabled": 1,
+        "banned_until": 1,
+        "ban_reason": 1,
+    }
+
+    # Fields _authenticate checks for every logged-in request
+    AUTH_PROJECTION = {
+        "username": 1,
+        "is_enabled": 1,
+        "banned_until": 1,
+        "ban_reason": 1,
+    }
+
+    # Fields read by the user lists and notifications endpoints
+    LISTS_PROJECTION = {**AUTH_PROJECTION, "lists": 1, "stats": 1, "limits": 1}
+    NOTIFICATIONS_PROJECTION = {
+        **AUTH_PROJECTION,
+        "notifications": 1,
+        "notifications_version": 1,
+    }
+
     def __init__(self, data: Dict[str, Any]):
         self._data = data
         self._id = data.get("_id")
@@ -87,6 +139,7 @@ class User:
             {"_id": self._id}, {"$set": {"is_admin": value}}
         )
         self._data["is_admin"] = value
+        self.forget_cached()
 
     @property
     def limits(self) -> Dict[str, int]:
@@ -136,6 +189,25 @@ class User:
         """Get IP access log."""
         return self._data.get("ip_log", [])
 
+    def serialize_ip_log(
+        self, start: int = 0, stop: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Serialize a slice of the IP log with ISO-formatted timestamps."""
+        # Entries may lack fields (older or hand-edited documents)
+        return [
+            {
+                "ip_hash": entry.get("ip_hash"),
+                "first_seen": (
+                    entry["first_seen"].isoformat() if entry.get("first_seen") else None
+                ),
+                "last_seen": (
+                    entry["last_seen"].isoformat() if entry.get("last_seen") else None
+                ),
+                "access_count": entry.get("access_count", 0),
+            }
+            for entry in self.ip_log[start:stop]
+        ]
+
     @property
     def created_at(self) -> datetime:
         return self._data.get("created_at", datetime.utcnow())
@@ -241,39 +313,80 @@ class User:
 
         mongo.db[self.COLLECTION].update_one({"_id": self._id}, {"$set": update})
 
-    def can_do_manual_update(self) -> bool:
-        """Check if user can perform a manual update."""
-        # Admins can always do manual updates
-        if self.is_admin:
-            return True
+    def reserve_manual_update(self) -> bool:
+        """
+        Count a manual update if the weekly limit allows it.
 
-        stats = self.stats
-        week_reset = stats.get("week_reset_at", datetime.utcnow() - timedelta(days=8))
+        The limit check, weekly reset and increment happen in one atomic
+        update, so concurrent build requests can't both take the last
+        update of the week.
 
-        # Check if week has reset
-        if datetime.utcnow() - week_reset > timedelta(days=7):
-            # Reset counter
-            mongo.db[self.COLLECTION].update_one(
-                {"_id": self._id},
+        Returns:
+            True if the update was counted, False if the limit is reached
+        """
+        now = datetime.utcnow()
+        week_start = now - timedelta(days=7)
+
+        query = {"_id": self._id}
+        # Admins can always do manual updates
+        if not self.is_admin:
+            query["$or"] = [
+                {"stats.week_reset_at": {"$not": {"$gte": week_start}}},
                 {
-                    "$set": {
-                        "stats.manual_updates_this_week": 0,
-                        "stats.week_reset_at": datetime.utcnow(),
+                    "stats.manual_updates_this_week": {
+                        "$not": {"$gte": self.limits["manual_updates_per_week"]}
                     }
                 },
-            )
-            return True
+            ]
 
-        return (
-            stats.get("manual_updates_this_week", 0)
-            < self.limits["manual_updates_per_week"]
+        # A week since the last reset starts a new count
+        new_week = {"$lt": [{"$ifNull": ["$stats.week_reset_at", None]}, week_start]}
+        data = mongo.db[self.COLLECTION].find_one_and_update(
+            query,
+            [
+                {
+                    "$set": {
+                        "stats.manual_updates_this_week": {
+                            "$cond": [
+                                new_week,
+                                1,
+                                {
+                                    "$add": [
+                                        {
+                                            "$ifNull": [
+                                                "$stats.manual_updates_this_week",
+                                                0,
+                                            ]
+                                        },
+                                        1,
+                                    ]
+                                },
+                            ]
+                        },
+                        "stats.week_reset_at": {
+                            "$cond": [new_week, now, "$stats.week_reset_at"]
+                        },
+                    }
+                }
+            ],
+            projection={"stats": 1},
+            return_document=ReturnDocument.AFTER,
         )
+        if data is None:
+            return False
+        self._data["stats"] = data.get("stats", {})
+        return True
 
-    def increment_manual_updates(self) -> None:
-        """Increment manual update counter."""
-        mongo.db[self.COLLECTION].update_one(
-            {"_id": self._id}, {"$inc": {"stats.manual_updates_this_week": 1}}
+    def release_manual_update(self) -> None:
+        """Give back an update counted by reserve_manual_update that wasn't used."""
+        data = mongo.db[self.COLLECTION].find_one_and_update(
+            {"_id": self._id, "stats.manual_updates_this_week": {"$gt": 0}},
+            {"$inc": {"stats.manual_updates_this_week": -1}},
+            projection={"stats": 1},
+            return_document=ReturnDocument.AFTER,
         )
+        if data is not None:
+            self._data["stats"] = data.get("stats", {})
 
     def get_remaining_manual_updates(self) -> int:
         """Get remaining manual updates for this week."""
@@ -285,40 +398,42 @@ class User:
     # Admin methods
     def set_enabled(self, enabled: bool) -> None:
         """Enable or disable user."""
-        mongo.db[self.COLLECTION].update_one(
-            {"_id": self._id},
-            {"$set": {"is_enabled": enabled, "updated_at": datetime.utcnow()}},
-        )
+        update = {"is_enabled": enabled, "updated_at": datetime.utcnow()}
+        mongo.db[self.COLLECTION].update_one({"_id": self._id}, {"$set": update})
+        self._data.update(update)
+        self.forget_cached()
 
     def set_limits(self, limits: Dict[str, int]) -> None:
         """Set custom limits for user."""
-        mongo.db[self.COLLECTION].update_one(
-            {"_id": self._id},
-            {"$set": {"limits": limits, "updated_at": datetime.utcnow()}},
-        )
+        update = {"limits": limits, "updated_at": datetime.utcnow()}
+        mongo.db[self.COLLECTION].update_one({"_id": self._id}, {"$set": update})
+        self._data.update(update)
 
     def ban(self, until: datetime, reason: str = None) -> None:
         """Ban user until a specific time."""
-        mongo.db[self.COLLECTION].update_one(
-            {"_id": self._id},
-            {
-                "$set": {
-                    "banned_until": until,
-                    "ban_reason": reason,
-                    "updated_at": datetime.utcnow(),
-                }
-            },
-        )
+        update = {
+            "banned_until": until,
+            "ban_reason": reason,
+            "updated_at": datetime.utcnow(),
+        }
+        mongo.db[self.COLLECTION].update_one({"_id": self._id}, {"$set": update})
+        self._data.update(update)
+        self.forget_cached()
 
     def unban(self) -> None:
         """Remove ban from user."""
+        now = datetime.utcnow()
         mongo.db[self.COLLECTION].update_one(
             {"_id": self._id},
             {
                 "$unset": {"banned_until": "", "ban_reason": ""},
-                "$set": {"updated_at": datetime.utcnow()},
+                "$set": {"updated_at": now},
             },
         )
+        self._data.pop("banned_until", None)
+        self._data.pop("ban_reason", None)
+        self._data["updated_at"] = now
+        self.forget_cached()
 
     # Announcement dismissal methods
     @property
@@ -364,6 +479,7 @@ class User:
             {
                 "$push": {"notifications": {"$each": [notification], "$position": 0}},
                 "$set": {"updated_at": datetime.utcnow()},
+                "$inc": {"notifications_version": 1},
             },
         )
         return notification_id
@@ -371,8 +487,18 @@ class User:
     def mark_notification_read(self, notification_id: str) -> bool:
         """Mark a notification as read."""
         result = mongo.db[self.COLLECTION].update_one(
-            {"_id": self._id, "notifications.id": notification_id},
-            {"$set": {"notifications.$.read": True}},
+            # Only match unread notifications so the version is not bumped
+            # for a no-op
+            {
+                "_id": self._id,
+                "notifications": {
+                    "$elemMatch": {"id": notification_id, "read": {"$ne": True}}
+                },
+            },
+            {
+                "$set": {"notifications.$.read": True},
+                "$inc": {"notifications_version": 1},
+            },
         )
         return result.modified_count > 0
 
@@ -384,7 +510,7 @@ class User:
         """Log an IP address access (hashed for privacy)."""
         import hashlib
 
-        # Hash IP for privacy (consistent with analytics)
+        # Hash IP for privacy (SHA-256 so existing entries keep matching)
         ip_hash = hashlib.sha256(ip.encode()).hexdigest()[:16]
         now = datetime.utcnow()
 
@@ -429,8 +555,30 @@ class User:
 
         # Delete from database
         mongo.db[self.COLLECTION].delete_one({"_id": self._id})
+        self.forget_cached()
+
+    def forget_cached(self) -> None:
+        """Drop this user from the get_by_id_cached cache."""
+        _recent_users.pop(self.id, None)
 
     # Serialization
+    def _serialize_stats(self) -> Dict[str, Any]:
+        """Serialize stats with proper datetime formatting."""
+        stats = self.stats
+        return {
+            **stats,
+            "last_build_at": (
+                stats["last_build_at"].isoformat()
+                if stats.get("last_build_at")
+                else None
+            ),
+            "week_reset_at": (
+                stats["week_reset_at"].isoformat()
+                if stats.get("week_reset_at")
+                else None
+            ),
+        }
+
     def _serialize_notifications(
         self, unread_only: bool = False
     ) -> List[Dict[str, Any]]:
@@ -453,6 +601,31 @@ class User:
             for n in notifications
         ]
 
+    def get_notifications_json(self) -> str:
+        """
+        Get the encoded notifications response with its unread count.
+
+        Every notification write increments notifications_version, so the
+        encoded body is reused until the user's notifications change.
+        """
+        user_id = self.id
+        version = self._data.get("notifications_version", 0)
+        entry = _notification_bodies.get(user_id)
+        if entry and entry[0] == version:
+            return entry[1]
+
+        notifications = self._serialize_notifications()
+        body = current_app.json.dumps(
+            {
+                "notifications": notifications,
+                "unread_count": sum(1 for n in notifications if not n["read"]),
+            }
+        )
+        if len(_notification_bodies) >= _NOTIFICATION_BODIES_MAX:
+            _notification_bodies.clear()
+        _notification_bodies[user_id] = (version, body)
+        return body
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for API responses."""
         return {
@@ -465,25 +638,37 @@ class User:
             "is_admin": self.is_admin,
             "is_enabled": self.is_enabled,
             "limits": self.limits,
-            "stats": {
-                **self.stats,
-                "last_build_at": (
-                    self.stats["last_build_at"].isoformat()
-                    if self.stats.get("last_build_at")
-                    else None
-                ),
-                "week_reset_at": (
-                    self.stats["week_reset_at"].isoformat()
-                    if self.stats.get("week_reset_at")
-                    else None
-                ),
-            },
+            "stats": self._serialize_stats(),
             "lists": self.lists,
             "remaining_updates": self.get_remaining_manual_updates(),
             "notifications": self._serialize_notifications(unread_only=True),
             "created_at": self.created_at.isoformat(),
         }
 
+    def to_admin_list_dict(self) -> Dict[str, Any]:
+        """Convert to the summary dictionary used by the admin user list."""
+        # Called for every row of the admin table: read the document directly
+        # and resolve each derived value once
+        data = self._data
+        is_root = self.is_root
+        banned_until = data.get("banned_until")
+        created_at = data.get("created_at")
+        return {
+            "id": str(self._id) if self._id else None,
+            "username": data.get("username"),
+            "name": data.get("name"),
+            "email": data.get("email"),
+            "avatar_url": data.get("avatar_url"),
+            "github_id": data.get("github_id"),
+            "is_root": is_root,
+            "is_admin": is_root or data.get("is_admin", False),
+            "is_enabled": data.get("is_enabled", True),
+            "is_banned": banned_until is not None and banned_until >= datetime.utcnow(),
+            "banned_until": banned_until.isoformat() if banned_until else None,
+            "stats": self._serialize_stats(),
+            "created_at": (created_at or datetime.utcnow()).isoformat(),
+        }
+
     def to_admin_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for admin API responses."""
         base = self.to_dict()
@@ -493,32 +678,51 @@ class User:
             self.banned_until.isoformat() if self.banned_until else None
         )
         base["ban_reason"] = self.ban_reason
-        # Serialize IP log with proper datetime formatting
-        base["ip_log"] = [
-            {
-                "ip_hash": entry.get("ip_hash"),
-                "first_seen": (
-                    entry["first_seen"].isoformat() if entry.get("first_seen") else None
-                ),
-                "last_seen": (
-                    entry["last_seen"].isoformat() if entry.get("last_seen") else None
-                ),
-                "access_count": entry.get("access_count", 0),
-            }
-            for entry in self.ip_log
-        ]
+        base["ip_log"] = self.serialize_ip_log()
         return base
 
     # Class methods
     @classmethod
-    def get_by_id(cls, user_id: str) -> Optional["User"]:
-        """Get user by ID."""
+    def get_by_id(
+        cls, user_id: Union[str, ObjectId], projection: Optional[Dict[str, Any]] = None
+    ) -> Optional["User"]:
+        """Get user by ID (hex string or ObjectId)."""
         try:
-            data = mongo.db[cls.COLLECTION].find_one({"_id": ObjectId(user_id)})
+            data = mongo.db[cls.COLLECTION].find_one(
+                {"_id": ObjectId(user_id)}, projection
+            )
             return cls(data) if data else None
         except Exception:
             return None
 
+    @classmethod
+    def get_by_id_cached(
+        cls,
+        user_id: str,
+        ttl: float = 5.0,
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> Optional["User"]:
+        """
+        Get user by ID, reusing a document fetched within the last ttl seconds.
+        Changes to admin/enabled/ban status evict the entry immediately.
+
+        All callers must pass the same projection, since cached documents
+        only hold the projected fields.
+        """
+        now = time.monotonic()
+        entry = _recent_users.get(user_id)
+        if entry and entry[0] > now:
+            return cls(dict(entry[1]))
+
+        user = cls.get_by_id(user_id, projection=projection)
+        if user:
+            if len(_recent_users) >= _RECENT_USERS_MAX:
+                _recent_users.clear()
+            _recent_users[user_id] = (now + ttl, dict(user._data))
+        else:
+            _recent_users.pop(user_id, None)
+        return user
+
     @classmethod
     def get_by_username(cls, username: str) -> Optional["User"]:
         """Get user by username."""
@@ -589,12 +793,14 @@ class User:
         return cls(user_data)
 
     @classmethod
-    def get_all(cls, page: int = 1, per_page: int = 20) -> List["User"]:
+    def get_all(
+        cls, page: int = 1, per_page: int = 20, projection: Dict[str, int] = None
+    ) -> List["User"]:
         """Get all users with pagination."""
         skip = (page - 1) * per_page
         cursor = (
             mongo.db[cls.COLLECTION]
-            .find()
+            .find({}, projection)
             .sort("created_at", -1)
             .skip(skip)
             .limit(per_page)
@@ -612,6 +818,7 @@ class User:
         show_enabled: bool = True,
         show_disabled: bool = True,
         exclude_user_id: ObjectId = None,
+        projection: Dict[str, int] = None,
     ) -> Tuple[List["User"], int]:
         """Get users with filtering, sorting, and pagination."""
         conditions = []
@@ -676,26 +883,39 @@ class User:
         # Build final query
         query = {"$and": conditions} if conditions else {}
 
-        # Get total count
-        total = mongo.db[cls.COLLECTION].count_documents(query)
+        # With no search and every filter on, the role conditions match the
+        # whole collection, so the metadata count is exact without scanning
+        # (minus the excluded user, who always exists).
+        count_all = (
+            not search
+            and show_admins
+            and show_regular
+            and show_enabled
+            and show_disabled
+        )
 
+        # Page and total in one round-trip
         # Sort: is_root DESC, is_admin DESC, username ASC
-        sort_order = [
-            ("is_root", -1),
-            ("is_admin", -1),
-            ("username", 1),
+        rows = [{"$skip": (page - 1) * per_page}, {"$limit": per_page}]
+        if projection:
+            rows.append({"$project": projection})
+        facets = {"rows": rows}
+        if not count_all:
+            facets["total"] = [{"$count": "n"}]
+
+        pipeline = [
+            {"$match": query},
+            {"$sort": {"is_root": -1, "is_admin": -1, "username": 1}},
+            {"$facet": facets},
         ]
+        result = next(mongo.db[cls.COLLECTION].aggregate(pipeline), {})
 
-        skip = (page - 1) * per_page
-        cursor = (
-            mongo.db[cls.COLLECTION]
-            .find(query)
-            .sort(sort_order)
-            .skip(skip)
-            .limit(per_page)
-        )
+        if count_all:
+            total = cls.estimated_count() - (1 if exclude_user_id else 0)
+        else:
+            total = (result.get("total") or [{"n": 0}])[0]["n"]
 
-        return [cls(data) for data in cursor], total
+        return [cls(data) for data in result.get("rows", [])], total
 
     @classmethod
     def get_all_enabled(cls) -> List["User"]:
@@ -703,6 +923,23 @@ class User:
         cursor = mongo.db[cls.COLLECTION].find({"is_enabled": True})
         return [cls(data) for data in cursor]
 
+    @classmethod
+    def aggregate_stats(cls) -> Dict[str, int]:
+        """Count total and active users in a single round-trip."""
+        pipeline = [
+            {
+                "$facet": {
+                    "total": [{"$count": "n"}],
+                    "active": [{"$match": {"is_enabled": True}}, {"$count": "n"}],
+                }
+            }
+        ]
+        result = next(mongo.db[cls.COLLECTION].aggregate(pipeline), {})
+        return {
+            facet: (result.get(facet) or [{"n": 0}])[0]["n"]
+            for facet in ("total", "active")
+        }
+
     @classmethod
     def count(cls, is_enabled: bool = None) -> int:
         """Count users."""
@@ -710,3 +947,19 @@ class User:
         if is_enabled is not None:
             query["is_enabled"] = is_enabled
         return mongo.db[cls.COLLECTION].count_documents(query)
+
+    @classmethod
+    def estimated_count(cls) -> int:
+        """Count all users from collection metadata without scanning."""
+        return mongo.db[cls.COLLECTION].estimated_document_count()
+
+    @classmethod
+    def ensure_indexes(cls):
+        """Create indexes for the collection."""
+        collection = mongo.db[cls.COLLECTION]
+        collection.create_index([("created_at", -1)])
+        collection.create_index(
+            [("is_enabled", 1)], partialFilterExpression={"is_enabled": True}
+        )
+        # Admin user list ordering
+        collection.create_index([("is_root", -1), ("is_admin", -1), ("username", 1)])
@@ -6,6 +6,7 @@ Tasks:
 - Weekly rebuild of default lists (Sunday 1 AM UTC)
 - Reset weekly manual update counters (Sunday midnight UTC)
 - Daily cache cleanup (3 AM UTC)
+- Data directory size refresh (every 5 minutes)
 """
 
 import logging
@@ -180,19 +181,18 @@ def register_scheduled_tasks(app, scheduler):
         """Aggregate old analytics data monthly (1st of month, 5 AM UTC)."""
         with app.app_context():
             try:
-                from app.extensions import mongo
+                from app.models.analytics import Analytics
                 from datetime import timedelta
 
                 # Keep daily granularity for last 90 days, aggregate older data
                 cutoff = datetime.utcnow() - timedelta(days=90)
 
-                # Remove old daily analytics (we could aggregate first if needed)
-                result = mongo.db.analytics.delete_many({"date": {"$lt": cutoff}})
+                # Remove old daily analytics, keeping the default list totals
+                # in step with what's left
+                deleted_count = Analytics.delete_before(cutoff)
 
-                if result.deleted_count > 0:
-                    logger.info(
-                        f"Cleaned up {result.deleted_count} old analytics records"
-                    )
+                if deleted_count > 0:
+                    logger.info(f"Cleaned up {deleted_count} old analytics records")
 
             except Exception as e:
                 logger.exception(f"Failed analytics aggregation: {e}")
@@ -222,6 +222,24 @@ def register_scheduled_tasks(app, scheduler):
             except Exception as e:
                 logger.exception(f"Failed to reset stale jobs: {e}")
 
+    @scheduler.scheduled_job(
+        "interval",
+        minutes=5,
+        id="refresh_disk_usage",
+        name="Refresh Disk Usage",
+    )
+    def refresh_disk_usage():
+        """Record the data directory size so admin stats never walk the tree."""
+        with app.app_context():
+            try:
+                from app.models.system_config import SystemConfig
+                from app.utils.filesystem import get_directory_size
+
+                SystemConfig.set_disk_usage(get_directory_size(app.config["DATA_DIR"]))
+
+            except Exception as e:
+                logger.exception(f"Failed to refresh disk usage: {e}")
+
     logger.info("Registered scheduled tasks")
 
 
@@ -0,0 +1,112 @@
+"""
+Background writer for list download analytics.
+
+List requests put an event on a bounded in-process queue and return
+immediately. A daemon thread drains the queue and records events in batches
+with Analytics.record_requests, so bursts of downloads cost one bulk write
+instead of several round trips per request.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, List
+
+from app.models.analytics import Analytics
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyticsWriter:
+    """
+    Queues analytics events and writes them in batches.
+
+    Events are dropped (and counted) when the queue is full, so a slow
+    database never backs up list downloads.
+    """
+
+    QUEUE_SIZE = 10000
+    BATCH_SIZE = 500
+    FLUSH_INTERVAL = 1.0  # seconds to gather a batch after its first event
+
+    def __init__(self):
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(self.QUEUE_SIZE)
+        self._lock = threading.Lock()
+        self._thread = None
+        # Events taken off the queue for the batch being gathered; the lock
+        # is also held while writing so the exit flush waits for that write
+        self._batch: List[Dict[str, Any]] = []
+        self._batch_lock = threading.Lock()
+        self.dropped = 0
+
+    def submit(self, event: Dict[str, Any]) -> None:
+        """Queue an event with the arguments of Analytics.record_request."""
+        if self._thread is None:
+            self._start()
+
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(f"Analytics queue full, {self.dropped} events dropped")
+
+    def _start(self) -> None:
+        """Start the writer thread on first use."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="AnalyticsWriter", daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def _run(self) -> None:
+        """Write queued events until the process exits."""
+        while True:
+            self._add(self._queue.get())
+            # Collect whatever else arrives within FLUSH_INTERVAL of the first
+            deadline = time.monotonic() + self.FLUSH_INTERVAL
+            try:
+                while len(self._batch) < self.BATCH_SIZE:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._add(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                pass
+            self._write_batch()
+
+    def _add(self, event: Dict[str, Any]) -> None:
+        with self._batch_lock:
+            self._batch.append(event)
+
+    def _write_batch(self) -> None:
+        """Write the gathered batch plus anything still queued."""
+        with self._batch_lock:
+            batch, self._batch = self._batch, []
+            try:
+                while len(batch) < self.BATCH_SIZE:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            if batch:
+                self._write(batch)
+
+    def flush(self) -> None:
+        """Write the batch being gathered and everything queued (called at exit)."""
+        while self._batch or not self._queue.empty():
+            self._write_batch()
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            Analytics.record_requests(batch)
+        except Exception as e:
+            logger.error(f"Failed to record {len(batch)} analytics events: {e}")
+
+
+# Singleton instance
+analytics_writer = AnalyticsWriter()
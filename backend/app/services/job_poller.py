@@ -13,6 +13,7 @@ import copy
 from typing import Dict, Set, Any
 
 from app.models.job import Job
+from app.services.lists_manifest import lists_manifest
 
 logger = logging.getLogger(__name__)
 
@@ -124,6 +125,13 @@ class JobStatusPoller:
                             job.to_dict(), str(job.user_id) if job.user_id else None
                         )
                         self.completed_emitted.add(job_id)
+
+                        # New default list files were just published
+                        if (
+                            job.status == Job.STATUS_COMPLETED
+                            and job.username == "__default__"
+                        ):
+                            lists_manifest.invalidate()
                         logger.debug(f"Emitted completion for job {job_id[:8]}")
 
                 # Clean up tracking
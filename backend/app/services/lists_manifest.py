@@ -0,0 +1,201 @@
+"""
+Manifest of the default list output files.
+
+Listing the output directory and reading each file's header for its domain
+count is done once per refresh instead of on every request. The manifest is
+rescanned after MANIFEST_TTL seconds, or straight away once a default lists
+job completes.
+"""
+
+import gzip
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+MANIFEST_TTL = 60.0
+
+LIST_FORMATS = frozenset({"hosts", "plain", "adblock"})
+
+
+def _read_domain_count(filepath: str, is_gzip: bool) -> int:
+    """Read the "Total domains:" count from a list file header."""
+    try:
+        if is_gzip:
+            f = gzip.open(filepath, "rt", encoding="utf-8")
+        else:
+            f = open(filepath, "r")
+        with f:
+            for line in f:
+                if "Total domains:" in line:
+                    return int(line.split(":")[-1].strip())
+    except Exception:
+        pass
+    return 0
+
+
+def _read_gzip_size(gz_path: str, compressed_size: int) -> int:
+    """Read the uncompressed size from a gzip footer (files < 4GB)."""
+    try:
+        fd = os.open(gz_path, os.O_RDONLY)
+    except OSError:
+        return compressed_size
+    try:
+        # The size is known from the directory scan, so one pread replaces
+        # seek + read
+        footer = os.pread(fd, 4, compressed_size - 4)
+        if len(footer) != 4:
+            return compressed_size
+        return int.from_bytes(footer, "little")
+    except OSError:
+        return compressed_size
+    finally:
+        os.close(fd)
+
+
+def scan_output_dir(
+    output_dir: str, file_cache: Optional[Dict[str, tuple]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Scan a default list output directory.
+
+    Supports both .txt.gz (current) and .txt (legacy) files, named
+    {name}_{format} or just {name} for the hosts format.
+
+    Args:
+        output_dir: Directory to scan
+        file_cache: {path: (mtime_ns, size, domain_count)} from earlier scans.
+            Files whose mtime is unchanged reuse the cached size and domain
+            count instead of being reopened; the cache is updated in place.
+
+    Returns:
+        {name: {"name", "formats", "size_bytes", "last_updated",
+                "domain_count", "paths": {format: output_path}}}
+        where output_path is the file path without the .gz extension
+    """
+    lists = {}
+    try:
+        # DirEntry caches its stat result, so each file costs one syscall
+        with os.scandir(output_dir) as it:
+            entries = list(it)
+    except OSError:
+        return lists
+
+    for entry in entries:
+        filename = entry.name
+        if filename.endswith(".txt.gz"):
+            base_name = filename[:-7]
+            is_gzip = True
+        elif filename.endswith(".txt"):
+            base_name = filename[:-4]
+            is_gzip = False
+        else:
+            continue
+
+        # Parse filename (name_format)
+        name, _, format_type = base_name.rpartition("_")
+        if not name or format_type not in LIST_FORMATS:
+            name = base_name
+            format_type = "hosts"
+
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+
+        info = lists.get(name)
+        if info is None:
+            info = lists[name] = {
+                "name": name,
+                "formats": [],
+                "size_bytes": 0,
+                "last_updated": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                "paths": {},
+            }
+
+        if format_type not in info["formats"]:
+            info["formats"].append(format_type)
+
+        output_path = entry.path[:-3] if is_gzip else entry.path
+        # Prefer the .gz file when both it and a legacy plain file exist
+        if is_gzip or format_type not in info["paths"]:
+            info["paths"][format_type] = output_path
+
+        cached = file_cache.get(entry.path) if file_cache is not None else None
+        if cached and cached[0] == stat.st_mtime_ns:
+            _, size, domain_count = cached
+        else:
+            size = (
+                _read_gzip_size(entry.path, stat.st_size) if is_gzip else stat.st_size
+            )
+            domain_count = _read_domain_count(entry.path, is_gzip)
+            if file_cache is not None:
+                file_cache[entry.path] = (stat.st_mtime_ns, size, domain_count)
+
+        info["size_bytes"] = max(info["size_bytes"], size)
+        info.setdefault("domain_count", domain_count)
+
+    if file_cache is not None:
+        # Forget files that no longer exist
+        seen = {entry.path for entry in entries}
+        for path in [path for path in file_cache if path not in seen]:
+            del file_cache[path]
+
+    return lists
+
+
+class ListsManifest:
+    """Periodically refreshed view of the default list output directory."""
+
+    def __init__(self, ttl: float = MANIFEST_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._output_dir = None
+        self._expires_at = 0.0
+        self._lists: Dict[str, Dict[str, Any]] = {}
+        # Per-file results carried between rescans
+        self._file_cache: Dict[str, tuple] = {}
+
+    def _get(self, output_dir: str) -> Dict[str, Dict[str, Any]]:
+        """Get the manifest for output_dir, rescanning it if stale."""
+        if output_dir == self._output_dir and self._expires_at > time.monotonic():
+            return self._lists
+
+        with self._lock:
+            if output_dir != self._output_dir or self._expires_at <= time.monotonic():
+                if output_dir != self._output_dir:
+                    self._file_cache = {}
+                self._lists = scan_output_dir(output_dir, self._file_cache)
+                self._output_dir = output_dir
+                self._expires_at = time.monotonic() + self.ttl
+            return self._lists
+
+    def get_lists(self, output_dir: str) -> List[Dict[str, Any]]:
+        """Get metadata for every default list, as returned by /api/lists."""
+        return [
+            {key: value for key, value in info.items() if key != "paths"}
+            for info in self._get(output_dir).values()
+        ]
+
+    def get_list(self, output_dir: str, name: str) -> Optional[Dict[str, Any]]:
+        """Get metadata for a single default list, if it exists."""
+        info = self._get(output_dir).get(name)
+        if info is None:
+            return None
+        return {key: value for key, value in info.items() if key != "paths"}
+
+    def resolve(self, output_dir: str, name: str, format_type: str) -> Optional[str]:
+        """Get the output path (without .gz) for a list format, if known."""
+        info = self._get(output_dir).get(name)
+        if info is None:
+            return None
+        return info["paths"].get(format_type)
+
+    def invalidate(self) -> None:
+        """Force a rescan on the next lookup."""
+        self._expires_at = 0.0
+
+
+# Singleton instance
+lists_manifest = ListsManifest()
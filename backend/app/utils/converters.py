@@ -0,0 +1,21 @@
+"""
+URL converters registered on the Flask app.
+"""
+
+from bson import ObjectId
+from werkzeug.routing import BaseConverter
+
+
+class ObjectIdConverter(BaseConverter):
+    """Match a 24-character hex MongoDB ObjectId and pass it to views parsed.
+
+    Malformed IDs never match the route, so they 404 without reaching a view.
+    """
+
+    regex = "[0-9a-fA-F]{24}"
+
+    def to_python(self, value: str) -> ObjectId:
+        return ObjectId(value)
+
+    def to_url(self, value) -> str:
+        return str(value)
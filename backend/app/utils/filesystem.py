@@ -0,0 +1,33 @@
+"""
+Filesystem helpers.
+"""
+
+import os
+
+
+def get_directory_size(path: str) -> int:
+    """Get total size of a directory.
+
+    Walks the tree with os.scandir so each entry's type and size come from the
+    cached DirEntry data instead of a separate stat() per file.
+    """
+    total = 0
+    stack = [path]
+    try:
+        while stack:
+            try:
+                it = os.scandir(stack.pop())
+            except OSError:
+                continue
+            with it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        pass
+    except Exception:
+        pass
+    return total
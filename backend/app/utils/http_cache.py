@@ -0,0 +1,34 @@
+"""
+Conditional GET helpers for JSON endpoints.
+
+Responses carry an ETag and ``Cache-Control: private, no-cache``, so clients
+revalidate on every request and get an empty 304 while their copy is current.
+"""
+
+from flask import current_app, request
+
+from app.extensions import mongo
+
+
+def collection_version(name: str) -> int:
+    """Get the write version of an admin-managed collection."""
+    doc = mongo.db.counters.find_one({"_id": f"{name}_version"}, {"seq": 1})
+    return doc["seq"] if doc else 0
+
+
+def bump_collection_version(name: str):
+    """Record a write so cached copies of the collection are revalidated."""
+    mongo.db.counters.update_one(
+        {"_id": f"{name}_version"}, {"$inc": {"seq": 1}}, upsert=True
+    )
+
+
+def conditional_response(etag: str, build):
+    """Answer with 304 if the client already has etag, else build the response."""
+    if etag in request.if_none_match:
+        response = current_app.response_class(status=304)
+    else:
+        response = build()
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
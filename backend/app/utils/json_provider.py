@@ -0,0 +1,75 @@
+"""
+Flask JSON provider backed by orjson.
+"""
+
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+import orjson
+from bson import ObjectId
+from flask import Response, current_app, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+
+
+def _default(o: Any) -> Any:
+    """Serialize Mongo ObjectIds as strings; defer anything else to Flask."""
+    if isinstance(o, ObjectId):
+        return str(o)
+    return DefaultJSONProvider.default(o)
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Serialize responses with orjson while keeping Flask's output format.
+
+    Keys stay sorted and datetimes are passed through to Flask's default
+    handler, so payloads are identical to the stdlib provider's.
+    """
+
+    default = staticmethod(_default)
+
+    option = (
+        orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    )
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        option = self.option
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+
+def stream_json_array(
+    key: str,
+    items: Iterable[Any],
+    transform: Callable[[Any], Any],
+    meta: Optional[Dict[str, Any]] = None,
+) -> Iterator[str]:
+    """Yield ``{key: [...], **meta}`` as JSON, encoding one item at a time."""
+    dumps = current_app.json.dumps
+    yield "{" + dumps(key) + ":["
+    for i, item in enumerate(items):
+        if i:
+            yield ","
+        yield dumps(transform(item))
+    yield "]"
+    for name, value in (meta or {}).items():
+        yield "," + dumps(name) + ":" + dumps(value)
+    yield "}"
+
+
+def json_array_response(
+    key: str,
+    items: Iterable[Any],
+    transform: Callable[[Any], Any],
+    meta: Optional[Dict[str, Any]] = None,
+) -> Response:
+    """Stream a JSON object holding a large array without building it in memory.
+
+    ``items`` may be a lazy cursor; it is consumed while the response is sent.
+    """
+    return current_app.response_class(
+        stream_with_context(stream_json_array(key, items, transform, meta)),
+        mimetype="application/json",
+    )
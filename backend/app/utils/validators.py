@@ -10,15 +10,21 @@ from typing import List, Optional, Callable, Any
 from urllib.parse import urlparse
 from dataclasses import dataclass, field
 from enum import Enum
+from http.cookiejar import DefaultCookiePolicy
 
 import requests
 import gevent
 from gevent.pool import Pool
+from requests.adapters import HTTPAdapter
 
 # Constants
 MAX_DOMAIN_LENGTH = 253
 MAX_SOURCE_SIZE_BYTES = 100 * 1024 * 1024  # 100MB max per source
 
+# HEAD requests made by validate_config_urls
+HEAD_CONCURRENCY = 20
+HEAD_TIMEOUT = (5, 15)  # (connect, read) seconds
+
 # Valid categories for blocklist configuration
 VALID_CATEGORIES = frozenset(
     {
@@ -120,14 +126,31 @@ ADBLOCK_PATTERN = re.compile(r"^\|\|(.+?)\^(?:\$.*)?$")
 IP_DOMAIN_PATTERN = re.compile(r"^\s*\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\s+(\S+)$")
 COMMENT_PATTERN = re.compile(r"(#|!).*$")
 
-# Private IP ranges
-PRIVATE_IP_PATTERNS = [
-    re.compile(r"^10\."),
-    re.compile(r"^192\.168\."),
-    re.compile(r"^172\.(1[6-9]|2[0-9]|3[01])\."),
-    re.compile(r"^127\."),
-    re.compile(r"^0\."),
-]
+# Private IP ranges, combined so a host is checked in a single match
+PRIVATE_IP_PATTERN = re.compile(
+    r"^(?:10\.|192\.168\.|172\.(?:1[6-9]|2[0-9]|3[01])\.|127\.|0\.)"
+)
+
+# Hosts and domain suffixes that always point at the local machine/network
+LOCAL_HOSTS = frozenset({"localhost", "127.0.0.1", "0.0.0.0", "::1"})
+LOCAL_HOST_SUFFIXES = (".local", ".localhost")
+
+
+def _create_head_session() -> requests.Session:
+    """Create the session shared by config URL validation."""
+    session = requests.Session()
+    session.headers["User-Agent"] = "BlocklistValidator/1.0 (lists.zachlagden.uk)"
+    # Shared between users, so never keep cookies from validated sites
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    adapter = HTTPAdapter(
+        pool_connections=HEAD_CONCURRENCY, pool_maxsize=HEAD_CONCURRENCY
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_head_session = _create_head_session()
 
 
 @functools.lru_cache(maxsize=10000)
@@ -195,20 +218,12 @@ def validate_url(url: str) -> bool:
         # Extract host (without port)
         host = parsed.netloc.split(":")[0].lower()
 
-        # No localhost
-        if host in ("localhost", "127.0.0.1", "0.0.0.0", "::1"):
-            return False
-
-        # No private IPs
-        for pattern in PRIVATE_IP_PATTERNS:
-            if pattern.match(host):
-                return False
-
-        # No local domains
-        if host.endswith(".local") or host.endswith(".localhost"):
-            return False
-
-        return True
+        # No localhost, private IPs or local domains
+        return not (
+            host in LOCAL_HOSTS
+            or PRIVATE_IP_PATTERN.match(host)
+            or host.endswith(LOCAL_HOST_SUFFIXES)
+        )
 
     except Exception:
         return False
@@ -505,28 +520,15 @@ def validate_config_urls(
         lines_to_validate.append(line)
 
     # Second pass: HEAD requests using gevent pool for concurrency
-    validated_count = [0]  # Use list for mutable reference in closure
     total = len(lines_to_validate)
 
     def validate_url_head(line: ParsedConfigLine) -> Optional[ValidationIssue]:
         """Validate a single URL with HEAD request."""
-        if emit_progress:
-            validated_count[0] += 1
-            emit_progress(
-                {
-                    "current": validated_count[0],
-                    "total": total,
-                    "url": line.url,
-                    "status": "validating",
-                }
-            )
-
         try:
-            resp = requests.head(
+            resp = _head_session.head(
                 line.url,
-                timeout=15,
+                timeout=HEAD_TIMEOUT,
                 allow_redirects=True,
-                headers={"User-Agent": "BlocklistValidator/1.0 (lists.zachlagden.uk)"},
             )
 
             # Check status
@@ -609,14 +611,30 @@ def validate_config_urls(
                 url=line.url,
             )
 
-    # Run HEAD requests concurrently using gevent pool (max 10 concurrent)
-    pool = Pool(10)
-    issues = pool.map(validate_url_head, lines_to_validate)
-
-    # Collect issues
-    for issue in issues:
+    # Run HEAD requests concurrently, reporting each URL as it finishes
+    pool = Pool(HEAD_CONCURRENCY)
+    head_issues = []
+    for validated_count, (line, issue) in enumerate(
+        pool.imap_unordered(
+            lambda line: (line, validate_url_head(line)), lines_to_validate
+        ),
+        1,
+    ):
         if issue:
-            result.issues.append(issue)
+            head_issues.append(issue)
+        if emit_progress:
+            emit_progress(
+                {
+                    "current": validated_count,
+                    "total": total,
+                    "url": line.url,
+                    "status": "validating",
+                }
+            )
+
+    # Collect issues in config order
+    head_issues.sort(key=lambda issue: issue.line)
+    result.issues.extend(head_issues)
 
     result.validated_count = len(lines_to_validate)
 
@@ -4,7 +4,8 @@ Migration script to move file-based storage to MongoDB.
 
 Usage:
   python migrate_to_mongodb.py --dry-run     # Preview changes
-  python migrate_to_mongodb.py --migrate     # Execute migration
+  python migrate_to_mongodb.py --migrate     # Execute migration (also merges
+                                             # duplicate analytics documents)
   python migrate_to_mongodb.py --verify      # Verify migration
 """
 
@@ -12,6 +13,7 @@ import os
 import sys
 import argparse
 import hashlib
+from collections import Counter
 from datetime import datetime
 
 # Add project path
@@ -20,6 +22,59 @@ sys.path.insert(0, "/opt/webapps/zml/lists.zachlagden.uk/backend")
 from bson import Binary
 
 
+# Analytics fields that hold hit counters (numbers, or dicts/lists of them)
+ANALYTICS_COUNTER_FIELDS = (
+    "requests",
+    "bandwidth_bytes",
+    "formats",
+    "geo",
+    "hourly_distribution",
+)
+
+
+def _add_counts(a, b):
+    """Add two counters: numbers, dicts of counters, or lists of numbers."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if isinstance(a, dict) and isinstance(b, dict):
+        return {key: _add_counts(a.get(key), b.get(key)) for key in {**a, **b}}
+    if isinstance(a, list) and isinstance(b, list):
+        length = max(len(a), len(b))
+        a = a + [0] * (length - len(a))
+        b = b + [0] * (length - len(b))
+        return [x + y for x, y in zip(a, b)]
+    return a + b
+
+
+def _merge_analytics_docs(docs):
+    """Merge analytics documents for the same list and day into the first."""
+    merged = dict(docs[0])
+    referrers = Counter()
+    ip_hashes = set()
+    unique_ips = 0
+    for i, doc in enumerate(docs):
+        if i:
+            for field in ANALYTICS_COUNTER_FIELDS:
+                value = _add_counts(merged.get(field), doc.get(field))
+                if value is not None:
+                    merged[field] = value
+        for ref in doc.get("top_referrers", []):
+            referrers[ref["url"]] += ref["count"]
+        ip_hashes.update(doc.get("ip_hashes", []))
+        unique_ips += doc.get("unique_ips", 0)
+
+    merged["top_referrers"] = [
+        {"url": url, "count": count} for url, count in referrers.most_common(10)
+    ]
+    if ip_hashes:
+        merged["ip_hashes"] = sorted(ip_hashes)
+    # Exact when the documents kept their IP hashes, otherwise an upper bound
+    merged["unique_ips"] = len(ip_hashes) or unique_ips
+    return merged
+
+
 class Migrator:
     def __init__(self, dry_run=True):
         self.dry_run = dry_run
@@ -30,6 +85,7 @@ class Migrator:
             "default_migrated": False,
             "cache_entries_migrated": 0,
             "cache_entries_skipped": 0,
+            "analytics_duplicates_merged": 0,
             "errors": [],
         }
         self.app = None
@@ -40,7 +96,7 @@ class Migrator:
         from app import create_app
         from app.extensions import mongo
 
-        self.app = create_app("production")
+        self.app = create_app("production", start_scheduler=False)
         self.mongo = mongo
         return self.app
 
@@ -193,6 +249,57 @@ class Migrator:
                     f"[{'DRY-RUN' if self.dry_run else 'MIGRATED'}] Cache: {url_hash[:16]}... ({size_kb:.1f} KB)"
                 )
 
+    def merge_duplicate_analytics(self):
+        """
+        Merge analytics documents recorded more than once for a list and day.
+
+        Older non-atomic upserts could create these, and they stop the unique
+        (list_type, list_name, username, date) index from building. Counters
+        are summed into the oldest document and the others are deleted; the
+        index is then created.
+        """
+        from app.models.analytics import Analytics
+
+        with self.app.app_context():
+            collection = self.mongo.db[Analytics.COLLECTION]
+            pipeline = [
+                {
+                    "$group": {
+                        "_id": {
+                            "list_type": "$list_type",
+                            "list_name": "$list_name",
+                            "username": "$username",
+                            "date": "$date",
+                        },
+                        "ids": {"$push": "$_id"},
+                        "count": {"$sum": 1},
+                    }
+                },
+                {"$match": {"count": {"$gt": 1}}},
+            ]
+            for group in collection.aggregate(pipeline, allowDiskUse=True):
+                docs = list(
+                    collection.find({"_id": {"$in": group["ids"]}}).sort("_id", 1)
+                )
+                merged = _merge_analytics_docs(docs)
+
+                if not self.dry_run:
+                    collection.replace_one({"_id": docs[0]["_id"]}, merged)
+                    collection.delete_many(
+                        {"_id": {"$in": [doc["_id"] for doc in docs[1:]]}}
+                    )
+
+                self.stats["analytics_duplicates_merged"] += len(docs) - 1
+                key = group["_id"]
+                print(
+                    f"[{'DRY-RUN' if self.dry_run else 'MERGED'}] Analytics: "
+                    f"{key['list_type']}/{key['username'] or '-'}/{key['list_name']} "
+                    f"{key['date']:%Y-%m-%d} ({len(docs)} documents)"
+                )
+
+            if not self.dry_run:
+                Analytics.ensure_indexes()
+
     def verify_migration(self):
         """Verify migration was successful."""
         with self.app.app_context():
@@ -240,6 +347,10 @@ class Migrator:
         print(f"Default config migrated: {self.stats['default_migrated']}")
         print(f"Cache entries migrated: {self.stats['cache_entries_migrated']}")
         print(f"Cache entries skipped: {self.stats['cache_entries_skipped']}")
+        print(
+            "Duplicate analytics documents merged: "
+            f"{self.stats['analytics_duplicates_merged']}"
+        )
         if self.stats["errors"]:
             print(f"Errors: {len(self.stats['errors'])}")
             for err in self.stats["errors"]:
@@ -269,6 +380,8 @@ def main():
         migrator.migrate_default_config()
         print("\n--- Migrating Cache Content ---")
         migrator.migrate_cache_content()
+        print("\n--- Merging Duplicate Analytics ---")
+        migrator.merge_duplicate_analytics()
         migrator.print_stats()
 
         if migrator.dry_run:
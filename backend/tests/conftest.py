@@ -0,0 +1,109 @@
+"""
+Shared fixtures.
+
+Each test gets the app in testing mode backed by a fresh in-memory mongomock
+database, so the suite runs without a MongoDB server.
+
+Set TEST_MONGO_URI to run against a real server instead (its database is
+dropped before every test). Tests marked ``mongo_server`` use aggregation
+features mongomock doesn't implement and are skipped without one.
+"""
+
+import os
+
+import pytest
+from flask import g
+
+from app import create_app
+from app.extensions import mongo
+
+TEST_MONGO_URI = os.environ.get("TEST_MONGO_URI")
+
+if not TEST_MONGO_URI:
+    mongomock = pytest.importorskip("mongomock")
+
+
+def pytest_collection_modifyitems(config, items):
+    if TEST_MONGO_URI:
+        return
+    skip = pytest.mark.skip(reason="needs a MongoDB server (set TEST_MONGO_URI)")
+    for item in items:
+        if "mongo_server" in item.keywords:
+            item.add_marker(skip)
+
+
+def _test_database():
+    if not TEST_MONGO_URI:
+        return mongomock.MongoClient().db
+
+    from pymongo import MongoClient
+
+    client = MongoClient(TEST_MONGO_URI)
+    db = client.get_default_database("zachs_lists_test")
+    client.drop_database(db.name)
+    return db
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app("testing")
+    app.config["USERS_DIR"] = str(tmp_path / "users")
+    mongo.db = _test_database()
+
+    # pytest-flask keeps a request context pushed for the whole test, so test
+    # client requests share its g; drop the per-request user like a fresh
+    # context would
+    @app.teardown_request
+    def forget_current_user(exc):
+        g.pop("current_user", None)
+
+    # Module-level caches would otherwise carry state between tests
+    from app.blueprints import admin
+    from app.models import user
+
+    admin._library_cache.clear()
+    user._recent_users.clear()
+
+    yield app
+
+
+@pytest.fixture
+def admin_client(app):
+    """Test client logged in as an admin."""
+    admin_id = mongo.db.users.insert_one(
+        {
+            "username": "admin",
+            "github_id": 1,
+            "is_enabled": True,
+            "is_admin": True,
+            "stats": {},
+        }
+    ).inserted_id
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = str(admin_id)
+    return client
+
+
+@pytest.fixture
+def user_id(app):
+    """A regular enabled user with a 1 MB config size limit."""
+    return mongo.db.users.insert_one(
+        {
+            "username": "alice",
+            "github_id": 2,
+            "is_enabled": True,
+            "limits": {"max_config_size_mb": 1},
+            "stats": {},
+        }
+    ).inserted_id
+
+
+@pytest.fixture
+def user_client(app, user_id):
+    """Test client logged in as the regular user."""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = str(user_id)
+    return client
@@ -0,0 +1,62 @@
+"""Tests for ETag revalidation of the admin default config and featured lists."""
+
+import time
+
+from app.extensions import mongo
+
+
+def revalidate(client, url, etag):
+    return client.get(url, headers={"If-None-Match": etag})
+
+
+def test_default_config_revalidates_after_update(admin_client):
+    admin_client.put("/api/admin/default/config", json={"config": "first"})
+
+    first = admin_client.get("/api/admin/default/config")
+    etag = first.headers["ETag"]
+    assert first.get_json()["config"] == "first"
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    cached = revalidate(admin_client, "/api/admin/default/config", etag)
+    assert cached.status_code == 304
+    assert cached.data == b""
+
+    # The ETag comes from updated_at, which is stored to the millisecond
+    time.sleep(0.002)
+    admin_client.put("/api/admin/default/config", json={"whitelist": "example.com"})
+
+    fresh = revalidate(admin_client, "/api/admin/default/config", etag)
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != etag
+    assert fresh.get_json() == {"config": "first", "whitelist": "example.com"}
+
+
+def test_default_config_missing_has_no_etag(admin_client):
+    response = admin_client.get("/api/admin/default/config")
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+    assert response.get_json() == {"config": "", "whitelist": ""}
+
+
+def test_featured_revalidates_after_add_and_remove(admin_client):
+    mongo.db.users.insert_one(
+        {"username": "alice", "is_enabled": True, "lists": [{"name": "ads"}]}
+    )
+
+    etag = admin_client.get("/api/admin/featured").headers["ETag"]
+    assert revalidate(admin_client, "/api/admin/featured", etag).status_code == 304
+
+    featured_id = admin_client.post(
+        "/api/admin/featured", json={"username": "alice", "list_name": "ads"}
+    ).get_json()["id"]
+
+    added = revalidate(admin_client, "/api/admin/featured", etag)
+    assert added.status_code == 200
+    assert [f["id"] for f in added.get_json()["featured"]] == [featured_id]
+
+    etag = added.headers["ETag"]
+    admin_client.delete(f"/api/admin/featured/{featured_id}")
+
+    removed = revalidate(admin_client, "/api/admin/featured", etag)
+    assert removed.status_code == 200
+    assert removed.get_json()["featured"] == []
@@ -0,0 +1,103 @@
+"""Tests for the admin blocklist library endpoints."""
+
+import pytest
+
+from app.models.blocklist_library import BlocklistLibrary
+
+ENTRY = {
+    "url": "https://example.com/hosts.txt",
+    "name": "Example",
+    "category": "advertising",
+}
+
+
+@pytest.fixture(autouse=True)
+def library_indexes(app):
+    # Created at startup outside of testing
+    BlocklistLibrary.ensure_indexes()
+
+
+def test_add_duplicate_url_conflicts(admin_client):
+    assert admin_client.post("/api/admin/library", json=ENTRY).status_code == 201
+
+    response = admin_client.post("/api/admin/library", json=ENTRY)
+    assert response.status_code == 409
+    assert response.get_json()["error"] == "URL already exists in library"
+    assert BlocklistLibrary.get_collection().count_documents({}) == 1
+
+
+def test_update_to_duplicate_url_conflicts(admin_client):
+    admin_client.post("/api/admin/library", json=ENTRY)
+    other = admin_client.post(
+        "/api/admin/library",
+        json={**ENTRY, "url": "https://example.org/hosts.txt"},
+    ).get_json()["entry"]
+
+    response = admin_client.put(
+        f"/api/admin/library/{other['id']}", json={"url": ENTRY["url"]}
+    )
+    assert response.status_code == 409
+
+
+def test_library_etag_revalidates_after_write(admin_client):
+    admin_client.post("/api/admin/library", json=ENTRY)
+
+    first = admin_client.get("/api/admin/library")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert len(first.get_json()["library"]) == 1
+
+    cached = admin_client.get("/api/admin/library", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.data == b""
+
+    admin_client.post(
+        "/api/admin/library", json={**ENTRY, "url": "https://example.org/hosts.txt"}
+    )
+
+    fresh = admin_client.get("/api/admin/library", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != etag
+    assert len(fresh.get_json()["library"]) == 2
+
+
+def test_library_etag_is_per_category(admin_client):
+    admin_client.post("/api/admin/library", json=ENTRY)
+
+    etag = admin_client.get("/api/admin/library").headers["ETag"]
+    response = admin_client.get(
+        "/api/admin/library?category=advertising", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert len(response.get_json()["library"]) == 1
+
+
+def test_library_rejects_unknown_category(admin_client):
+    response = admin_client.get("/api/admin/library?category=nope")
+    assert response.status_code == 400
+
+
+def test_create_many_skips_duplicate_urls(app):
+    BlocklistLibrary.create(**ENTRY)
+
+    created = BlocklistLibrary.create_many(
+        [
+            {**ENTRY, "name": "Again"},
+            {**ENTRY, "url": "https://example.org/hosts.txt", "aggressiveness": 9},
+            {**ENTRY, "url": "https://example.net/hosts.txt"},
+            {**ENTRY, "url": "https://example.net/hosts.txt", "name": "Twice"},
+        ],
+        added_by="system",
+    )
+
+    assert [e.url for e in created] == [
+        "https://example.org/hosts.txt",
+        "https://example.net/hosts.txt",
+    ]
+    assert all(e.id and e.added_by == "system" for e in created)
+    assert created[0].aggressiveness == BlocklistLibrary.MAX_AGGRESSIVENESS
+    assert BlocklistLibrary.get_collection().count_documents({}) == 3
+
+
+def test_create_many_empty(app):
+    assert BlocklistLibrary.create_many([]) == []
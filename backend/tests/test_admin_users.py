@@ -0,0 +1,60 @@
+"""Tests for the admin user endpoints."""
+
+from datetime import datetime
+
+from app.extensions import mongo
+
+SEEN = datetime(2026, 5, 6, 7, 8, 9)
+
+
+def test_ip_log_tolerates_missing_fields(admin_client, user_id):
+    mongo.db.users.update_one(
+        {"_id": user_id},
+        {
+            "$set": {
+                "ip_log": [
+                    {
+                        "ip_hash": "a",
+                        "first_seen": SEEN,
+                        "last_seen": SEEN,
+                        "access_count": 3,
+                    },
+                    # Legacy and hand-edited entries
+                    {"ip_hash": "b", "last_seen": SEEN},
+                    {},
+                ]
+            }
+        },
+    )
+
+    response = admin_client.get(f"/api/admin/users/{user_id}/ips")
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["ip_count"] == 3
+    assert body["ip_log"] == [
+        {
+            "ip_hash": "a",
+            "first_seen": "2026-05-06T07:08:09",
+            "last_seen": "2026-05-06T07:08:09",
+            "access_count": 3,
+        },
+        {
+            "ip_hash": "b",
+            "first_seen": None,
+            "last_seen": "2026-05-06T07:08:09",
+            "access_count": 0,
+        },
+        {"ip_hash": None, "first_seen": None, "last_seen": None, "access_count": 0},
+    ]
+
+
+def test_ip_log_pages(admin_client, user_id):
+    mongo.db.users.update_one(
+        {"_id": user_id},
+        {"$set": {"ip_log": [{"ip_hash": str(i)} for i in range(5)]}},
+    )
+
+    response = admin_client.get(f"/api/admin/users/{user_id}/ips?page=2&per_page=2")
+    body = response.get_json()
+    assert body["ip_count"] == 5
+    assert [entry["ip_hash"] for entry in body["ip_log"]] == ["2", "3"]
@@ -0,0 +1,208 @@
+"""Tests for recording and reading list analytics."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo.errors import BulkWriteError, OperationFailure
+
+from app.extensions import mongo
+from app.models.analytics import Analytics
+
+DAY = datetime(2026, 3, 4)
+
+
+def event(ip_hash=None, hour=12, **fields):
+    return {
+        "list_type": Analytics.TYPE_DEFAULT,
+        "list_name": "all_comprehensive",
+        "format_type": "hosts",
+        "ip_hash": ip_hash,
+        "size_bytes": 100,
+        "timestamp": DAY.replace(hour=hour),
+        **fields,
+    }
+
+
+def day_doc(list_name="all_comprehensive"):
+    return mongo.db[Analytics.COLLECTION].find_one({"list_name": list_name})
+
+
+def test_unique_ips_count_each_hash_once_per_day(app):
+    Analytics.record_requests([event("a"), event("b"), event("a")])
+    Analytics.record_requests([event("b"), event("c"), event()])
+
+    doc = day_doc()
+    assert doc["requests"] == 6
+    assert doc["unique_ips"] == 3
+    assert doc["bandwidth_bytes"] == 600
+
+
+def test_unique_ips_are_per_list(app):
+    Analytics.record_requests([event("a"), event("a", list_name="other")])
+
+    assert day_doc()["unique_ips"] == 1
+    assert day_doc("other")["unique_ips"] == 1
+
+
+def test_requests_without_ips_start_at_zero_unique(app):
+    Analytics.record_requests([event()])
+    assert day_doc()["unique_ips"] == 0
+
+
+def fail_write(monkeypatch, collection, method, error, after=0):
+    """Make the next call of a write method on collection raise, after some calls."""
+    original = getattr(type(collection), method)
+    calls = []
+
+    def write(coll, *args, **kwargs):
+        if coll.name == collection.name:
+            calls.append(None)
+            if len(calls) == after + 1:
+                raise error
+        return original(coll, *args, **kwargs)
+
+    monkeypatch.setattr(type(collection), method, write)
+
+
+def test_failed_counter_write_leaves_ips_unseen(app, monkeypatch):
+    fail_write(
+        monkeypatch,
+        mongo.db[Analytics.COLLECTION],
+        "bulk_write",
+        OperationFailure("write failed"),
+    )
+    with pytest.raises(OperationFailure):
+        Analytics.record_requests([event("a")])
+    assert day_doc() is None
+
+    # The batch was dropped, so the retry is the IP's first counted request
+    Analytics.record_requests([event("a")])
+    assert day_doc()["unique_ips"] == 1
+
+
+def test_failed_unique_ips_write_forgets_new_hashes(app, monkeypatch):
+    Analytics.record_requests([event("a")])
+
+    # Let the counters through and fail the unique_ips increment after them
+    fail_write(
+        monkeypatch,
+        mongo.db[Analytics.COLLECTION],
+        "bulk_write",
+        OperationFailure("write failed"),
+        after=1,
+    )
+    with pytest.raises(OperationFailure):
+        Analytics.record_requests([event("a"), event("b")])
+
+    Analytics.record_requests([event("b")])
+    assert day_doc()["unique_ips"] == 2
+
+
+def test_ip_write_errors_other_than_duplicates_are_raised(app, monkeypatch):
+    error = BulkWriteError(
+        {"writeErrors": [{"index": 0, "code": 121, "errmsg": "validation"}]}
+    )
+    fail_write(monkeypatch, mongo.db[Analytics.IPS_COLLECTION], "insert_many", error)
+
+    with pytest.raises(BulkWriteError):
+        Analytics.record_requests([event("a")])
+    assert day_doc()["unique_ips"] == 0
+
+
+def add_day(days_ago, requests, list_type=Analytics.TYPE_DEFAULT, list_name="all"):
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    mongo.db[Analytics.COLLECTION].insert_one(
+        {
+            "list_type": list_type,
+            "list_name": list_name,
+            "username": None,
+            "date": today - timedelta(days=days_ago),
+            "requests": requests,
+            "bandwidth_bytes": requests * 10,
+        }
+    )
+
+
+def stored_default_totals():
+    return Analytics._sum_default_totals()
+
+
+def test_default_totals_sum_stored_days(app):
+    add_day(120, 1)
+    add_day(30, 2)
+    add_day(1, 4)
+    add_day(0, 8)
+    add_day(5, 100, list_type=Analytics.TYPE_USER)
+
+    totals = Analytics.get_default_list_totals()
+    assert totals == {"total_requests": 15, "total_bandwidth": 150}
+
+    # Settled days are rolled up once; later calls add only the recent days
+    rollup = mongo.db.counters.find_one({"_id": Analytics.TOTALS_ID})
+    assert rollup["total_requests"] == 3
+    add_day(0, 16, list_name="other")
+    assert Analytics.get_default_list_totals()["total_requests"] == 31
+
+
+def test_default_totals_follow_cleanup(app):
+    add_day(200, 1)
+    add_day(120, 2)
+    add_day(60, 4)
+    add_day(0, 8)
+    add_day(150, 100, list_type=Analytics.TYPE_USER)
+    assert Analytics.get_default_list_totals()["total_requests"] == 15
+
+    cutoff = datetime.utcnow() - timedelta(days=90)
+    assert Analytics.delete_before(cutoff) == 3
+
+    assert Analytics.get_default_list_totals() == stored_default_totals()
+    assert Analytics.get_default_list_totals()["total_requests"] == 12
+
+
+def test_cleanup_before_first_rollup(app):
+    add_day(120, 2)
+    add_day(3, 4)
+
+    Analytics.delete_before(datetime.utcnow() - timedelta(days=90))
+    assert Analytics.get_default_list_totals()["total_requests"] == 4
+
+
+@pytest.mark.mongo_server
+def test_referrers_merge_across_batches(app):
+    Analytics.record_requests(
+        [event(referrer="https://a.example"), event(referrer="https://b.example")]
+    )
+    Analytics.record_requests(
+        [event(referrer="https://a.example"), event(referrer="https://a.example")]
+    )
+
+    assert day_doc()["top_referrers"] == [
+        {"url": "https://a.example", "count": 3},
+        {"url": "https://b.example", "count": 1},
+    ]
+
+
+@pytest.mark.mongo_server
+def test_referrers_keep_top_ten(app):
+    events = [
+        event(referrer=f"https://{i}.example") for i in range(12) for _ in range(i + 1)
+    ]
+    Analytics.record_requests(events)
+
+    top = day_doc()["top_referrers"]
+    assert [ref["url"] for ref in top] == [
+        f"https://{i}.example" for i in range(11, 1, -1)
+    ]
+    assert top[0]["count"] == 12
+
+
+@pytest.mark.mongo_server
+def test_referrers_are_stored_literally(app):
+    # Client-supplied values that would otherwise parse as field paths
+    Analytics.record_requests(
+        [event(referrer="$requests"), event(referrer="$$ROOT"), event(referrer="$a")]
+    )
+    Analytics.record_requests([event(referrer="$requests")])
+
+    counts = {ref["url"]: ref["count"] for ref in day_doc()["top_referrers"]}
+    assert counts == {"$requests": 2, "$$ROOT": 1, "$a": 1}
@@ -0,0 +1,76 @@
+"""
+Tests for the featured community lists endpoint.
+
+The owner join is a $lookup with both localField and a pipeline, which
+mongomock can't run, so these need a MongoDB 5.0+ server.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app.extensions import mongo
+
+pytestmark = pytest.mark.mongo_server
+
+
+@pytest.fixture
+def client(app):
+    updated = datetime(2026, 1, 2, 3, 4, 5)
+    mongo.db.users.insert_many(
+        [
+            {
+                "username": "alice",
+                "is_enabled": True,
+                "lists": [
+                    {"name": "ads", "domain_count": 10, "last_updated": updated},
+                    {"name": "malware", "domain_count": 20},
+                ],
+            },
+            {"username": "bob", "lists": [{"name": "ads", "domain_count": 30}]},
+            {
+                "username": "carol",
+                "is_enabled": False,
+                "lists": [{"name": "ads", "domain_count": 40}],
+            },
+        ]
+    )
+    mongo.db.featured_lists.insert_many(
+        [
+            {"username": "bob", "list_name": "ads", "order": 2},
+            {
+                "username": "alice",
+                "list_name": "malware",
+                "description": "Malware",
+                "order": 1,
+            },
+            {"username": "alice", "list_name": "ads", "order": 0},
+            # Owner disabled, list removed, owner deleted
+            {"username": "carol", "list_name": "ads", "order": 3},
+            {"username": "alice", "list_name": "gone", "order": 4},
+            {"username": "dave", "list_name": "ads", "order": 5},
+        ]
+    )
+    return app.test_client()
+
+
+def test_featured_lists_join_owners(client):
+    response = client.get("/api/browse/featured")
+    assert response.status_code == 200
+
+    lists = response.get_json()
+    assert [(f["username"], f["list_name"]) for f in lists] == [
+        ("alice", "ads"),
+        ("alice", "malware"),
+        ("bob", "ads"),
+    ]
+    assert [f["display_order"] for f in lists] == [0, 1, 2]
+    assert [f["domain_count"] for f in lists] == [10, 20, 30]
+    assert lists[0]["last_updated"] == "2026-01-02T03:04:05"
+    assert lists[1]["last_updated"] is None
+    assert lists[1]["description"] == "Malware"
+    assert lists[0]["description"] == ""
+
+
+def test_featured_lists_empty(app):
+    assert app.test_client().get("/api/browse/featured").get_json() == []
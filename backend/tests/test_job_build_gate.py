@@ -0,0 +1,80 @@
+"""Tests for Job.get_build_gate against the per-check queries it replaces."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.extensions import mongo
+from app.models.job import Job
+
+
+def add_job(user_id, status, job_type=Job.TYPE_MANUAL, completed_ago=None):
+    doc = {"user_id": user_id, "status": status, "type": job_type}
+    if completed_ago is not None:
+        doc["completed_at"] = datetime.utcnow() - completed_ago
+    mongo.db[Job.COLLECTION].insert_one(doc)
+
+
+def assert_matches_separate_checks(user_id, cooldown_minutes=5):
+    has_active, cooldown = Job.get_build_gate(user_id, cooldown_minutes)
+    assert has_active == Job.has_active_job_for_user(user_id)
+    # Both sides read the clock separately, so allow a one second tick
+    expected = Job.get_cooldown_remaining(user_id, cooldown_minutes)
+    assert abs(cooldown - expected) <= 1
+    return has_active, cooldown
+
+
+def test_no_jobs(app):
+    assert assert_matches_separate_checks(ObjectId()) == (False, 0)
+
+
+def test_recent_manual_build_starts_cooldown(app):
+    user_id = ObjectId()
+    add_job(user_id, Job.STATUS_COMPLETED, completed_ago=timedelta(minutes=2))
+
+    has_active, cooldown = assert_matches_separate_checks(user_id)
+    assert not has_active
+    assert 170 <= cooldown <= 180
+
+
+def test_newest_manual_build_decides_cooldown(app):
+    user_id = ObjectId()
+    add_job(user_id, Job.STATUS_COMPLETED, completed_ago=timedelta(minutes=4))
+    add_job(user_id, Job.STATUS_COMPLETED, completed_ago=timedelta(minutes=1))
+
+    _, cooldown = assert_matches_separate_checks(user_id)
+    assert cooldown >= 230
+
+
+@pytest.mark.parametrize(
+    "status, job_type, completed_ago",
+    [
+        (Job.STATUS_COMPLETED, Job.TYPE_MANUAL, timedelta(minutes=10)),
+        (Job.STATUS_COMPLETED, Job.TYPE_SCHEDULED, timedelta(minutes=1)),
+        (Job.STATUS_FAILED, Job.TYPE_MANUAL, timedelta(minutes=1)),
+    ],
+)
+def test_jobs_without_cooldown(app, status, job_type, completed_ago):
+    user_id = ObjectId()
+    add_job(user_id, status, job_type, completed_ago)
+
+    assert assert_matches_separate_checks(user_id) == (False, 0)
+
+
+@pytest.mark.parametrize("status", [Job.STATUS_QUEUED, Job.STATUS_PROCESSING])
+def test_active_job(app, status):
+    user_id = ObjectId()
+    add_job(user_id, status)
+    add_job(user_id, Job.STATUS_COMPLETED, completed_ago=timedelta(minutes=1))
+
+    has_active, cooldown = assert_matches_separate_checks(user_id)
+    assert has_active
+    assert cooldown > 0
+
+
+def test_other_users_jobs_are_ignored(app):
+    add_job(ObjectId(), Job.STATUS_PROCESSING)
+    add_job(ObjectId(), Job.STATUS_COMPLETED, completed_ago=timedelta(minutes=1))
+
+    assert assert_matches_separate_checks(ObjectId()) == (False, 0)
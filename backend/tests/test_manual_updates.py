@@ -0,0 +1,102 @@
+"""Tests for counting manual builds against the weekly limit."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.extensions import mongo
+from app.models.user import User
+from app.services.job_queue import JobQueue
+
+
+@pytest.fixture
+def limited_user(app, user_id):
+    mongo.db.users.update_one(
+        {"_id": user_id},
+        {
+            "$set": {
+                "limits.manual_updates_per_week": 2,
+                "config.blocklists": "https://example.com/hosts.txt|example|ads",
+            }
+        },
+    )
+    return User.get_by_id(user_id)
+
+
+def stored_stats(user_id):
+    return mongo.db.users.find_one({"_id": user_id})["stats"]
+
+
+def test_reserve_stops_at_weekly_limit(limited_user, user_id):
+    assert limited_user.reserve_manual_update()
+    assert limited_user.reserve_manual_update()
+    assert not limited_user.reserve_manual_update()
+
+    stats = stored_stats(user_id)
+    assert stats["manual_updates_this_week"] == 2
+    assert limited_user.get_remaining_manual_updates() == 0
+
+
+def test_reserve_from_separate_copies_shares_the_limit(limited_user, user_id):
+    # Two requests holding their own copy of the user, as concurrent builds do
+    other = User.get_by_id(user_id)
+    assert limited_user.reserve_manual_update()
+    assert other.reserve_manual_update()
+    assert not limited_user.reserve_manual_update()
+    assert not other.reserve_manual_update()
+
+
+def test_reserve_starts_a_new_week(limited_user, user_id):
+    last_reset = datetime.utcnow() - timedelta(days=8)
+    mongo.db.users.update_one(
+        {"_id": user_id},
+        {
+            "$set": {
+                "stats.manual_updates_this_week": 2,
+                "stats.week_reset_at": last_reset,
+            }
+        },
+    )
+
+    assert limited_user.reserve_manual_update()
+    stats = stored_stats(user_id)
+    assert stats["manual_updates_this_week"] == 1
+    assert stats["week_reset_at"] > last_reset + timedelta(days=7)
+
+
+def test_admins_have_no_weekly_limit(limited_user, user_id):
+    mongo.db.users.update_one({"_id": user_id}, {"$set": {"is_admin": True}})
+    admin = User.get_by_id(user_id)
+
+    assert all(admin.reserve_manual_update() for _ in range(4))
+    assert stored_stats(user_id)["manual_updates_this_week"] == 4
+
+
+def test_release_gives_back_one_update(limited_user, user_id):
+    limited_user.reserve_manual_update()
+    limited_user.release_manual_update()
+    limited_user.release_manual_update()
+
+    assert stored_stats(user_id)["manual_updates_this_week"] == 0
+
+
+def test_build_at_limit_is_refused(user_client, limited_user, user_id):
+    limited_user.reserve_manual_update()
+    limited_user.reserve_manual_update()
+
+    response = user_client.post("/api/user/build")
+    assert response.status_code == 429
+    assert response.get_json()["error"] == "Weekly manual update limit reached"
+
+
+def test_failed_queueing_releases_the_update(
+    user_client, limited_user, user_id, monkeypatch
+):
+    def queue_job(*args, **kwargs):
+        raise RuntimeError("queue unavailable")
+
+    monkeypatch.setattr(JobQueue, "queue_job", queue_job)
+    with pytest.raises(RuntimeError):
+        user_client.post("/api/user/build")
+
+    assert stored_stats(user_id)["manual_updates_this_week"] == 0
@@ -0,0 +1,75 @@
+"""Tests for ETag revalidation of the user config, whitelist, library and categories."""
+
+import pytest
+
+from app.extensions import mongo
+
+
+def revalidate(client, url, etag):
+    return client.get(url, headers={"If-None-Match": etag})
+
+
+@pytest.mark.parametrize(
+    "url, field, key",
+    [
+        ("/api/user/config", "config.blocklists", "config"),
+        ("/api/user/whitelist", "config.whitelist", "whitelist"),
+    ],
+)
+def test_config_revalidates_on_content(user_client, user_id, url, field, key):
+    mongo.db.users.update_one({"_id": user_id}, {"$set": {field: "one"}})
+
+    first = user_client.get(url)
+    etag = first.headers["ETag"]
+    assert first.get_json() == {key: "one"}
+    assert revalidate(user_client, url, etag).status_code == 304
+
+    mongo.db.users.update_one({"_id": user_id}, {"$set": {field: "two"}})
+    fresh = revalidate(user_client, url, etag)
+    assert fresh.status_code == 200
+    assert fresh.get_json() == {key: "two"}
+
+    # Same content, same tag
+    mongo.db.users.update_one({"_id": user_id}, {"$set": {field: "one"}})
+    assert revalidate(user_client, url, etag).status_code == 304
+
+
+def test_whitelist_revalidates_after_save(user_client):
+    etag = user_client.get("/api/user/whitelist").headers["ETag"]
+
+    user_client.put("/api/user/whitelist", json={"whitelist": "example.com"})
+
+    fresh = revalidate(user_client, "/api/user/whitelist", etag)
+    assert fresh.status_code == 200
+    assert fresh.get_json() == {"whitelist": "example.com"}
+
+
+def test_library_revalidates_after_admin_write(user_client, admin_client):
+    etag = user_client.get("/api/user/library").headers["ETag"]
+    assert revalidate(user_client, "/api/user/library", etag).status_code == 304
+
+    admin_client.post(
+        "/api/admin/library",
+        json={
+            "url": "https://example.com/hosts.txt",
+            "name": "Example",
+            "category": "advertising",
+        },
+    )
+
+    fresh = revalidate(user_client, "/api/user/library", etag)
+    assert fresh.status_code == 200
+    assert [e["name"] for e in fresh.get_json()["library"]["advertising"]] == [
+        "Example"
+    ]
+
+
+def test_categories_are_cacheable(user_client):
+    first = user_client.get("/api/user/config/categories")
+    assert "advertising" in first.get_json()["categories"]
+
+    cached = revalidate(
+        user_client, "/api/user/config/categories", first.headers["ETag"]
+    )
+    assert cached.status_code == 304
+    assert cached.headers["Cache-Control"] == "private, no-cache"
@@ -0,0 +1,59 @@
+"""Tests for the size limits on uploaded user config."""
+
+import json
+
+import pytest
+
+from app.extensions import mongo
+
+MAX_SIZE = 1024 * 1024
+
+
+def put_whitelist(client, whitelist):
+    # ensure_ascii, as some clients send it: non-ASCII text escapes to \uXXXX
+    body = json.dumps({"whitelist": whitelist}, ensure_ascii=True)
+    return client.put("/api/user/whitelist", data=body, content_type="application/json")
+
+
+def saved_whitelist(user_id):
+    doc = mongo.db.users.find_one({"_id": user_id})
+    return doc.get("config", {}).get("whitelist")
+
+
+@pytest.mark.parametrize(
+    "char",
+    [
+        "\x01",  # Control character: 1 byte, escaped as 6
+        "é",  # 2 bytes, escaped as 6
+        "\U0001f600",  # 4 bytes, escaped as a 12 byte surrogate pair
+        "a",
+    ],
+)
+def test_whitelist_at_limit_is_saved(user_client, user_id, char):
+    whitelist = "#" + char * ((MAX_SIZE - 1) // len(char.encode("utf-8")))
+    assert len(whitelist.encode("utf-8")) <= MAX_SIZE
+
+    response = put_whitelist(user_client, whitelist)
+    assert response.status_code == 200, response.get_json()
+    assert saved_whitelist(user_id) == whitelist
+
+
+@pytest.mark.parametrize("char", ["é", "a"])
+def test_whitelist_over_limit_is_rejected(user_client, user_id, char):
+    whitelist = "#" + char * (MAX_SIZE // len(char.encode("utf-8")))
+    assert len(whitelist.encode("utf-8")) > MAX_SIZE
+
+    response = put_whitelist(user_client, whitelist)
+    assert response.status_code == 400
+    assert "too large" in response.get_json()["error"]
+    assert saved_whitelist(user_id) is None
+
+
+def test_body_past_worst_case_escaping_is_rejected_unparsed(user_client, user_id):
+    response = user_client.put(
+        "/api/user/whitelist",
+        data=b"{" + b" " * (6 * MAX_SIZE + 2048) + b"}",
+        content_type="application/json",
+    )
+    assert response.status_code == 400
+    assert "too large" in response.get_json()["error"]
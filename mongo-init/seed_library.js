@@ -142,7 +142,18 @@ if (db.blocklist_library.countDocuments({}) === 0) {
         return list;
     });
 
-    db.blocklist_library.insertMany(formattedDocs);
+    // Same unique url index the app creates at startup; the unordered insert
+    // skips any duplicate URL instead of stopping the seed at it
+    db.blocklist_library.createIndex({ url: 1 }, { unique: true });
+    try {
+        db.blocklist_library.insertMany(formattedDocs, { ordered: false });
+    } catch (e) {
+        var writeErrors = e.writeErrors || [];
+        if (writeErrors.length === 0 || writeErrors.some(function(err) { return err.code !== 11000; })) {
+            throw e;
+        }
+        print("Skipped " + writeErrors.length + " duplicate library URLs.");
+    }
     print("Successfully seeded database with default Blocklist Library.");
 } else {
     print("Blocklist Library already populated. Skipping seed.");